@@ -133,6 +133,7 @@ class ActionService:
             .where(MediaIndex.account_id == self.account.id, MediaIndex.media_key.in_(media_keys[: max(limit * 8, 1)]))
             .limit(limit)
         ).scalars().all()
+        self.explorer.fill_media_info(list(rows))
         return rows
 
     def _build_job_params(self, preview: PreviewAction) -> tuple[str, str, dict[str, Any]]:
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from typing import Any
 
 ProgressFn = Callable[[float, str], None]
+# Awaited by run_async so the job bookkeeping behind it can leave the event loop.
+AsyncProgressFn = Callable[[float, str], Awaitable[None]]
 AdapterResult = dict[str, Any]
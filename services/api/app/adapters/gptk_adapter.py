@@ -1,12 +1,320 @@
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Optional
 
-from .common import AdapterResult, ProgressFn
-from .gptk_methods import resolve_method
+from .common import AdapterResult, AsyncProgressFn, ProgressFn
+from .gptk_methods import GptkMethodDef, resolve_method
 from ..config import settings
-from ..gphotos_rpc import GPhotosRpcClient
-from ..gptk_parser import parse_response
+from ..gphotos_rpc import GPhotosRpcClient, client_registry
+from ..gphotos_rpc_async import async_client_registry
+from ..gptk_ops import execute_operation_async
+from ..gptk_parser import check_fields, parse_response
+from ..result_cache import result_cache
+
+
+def _chunk_plan(method: Optional[GptkMethodDef], params: dict[str, Any]) -> Optional[list[list[Any]]]:
+    if method is None or not method.chunk_param:
+        return None
+    values = params.get(method.chunk_param)
+    # Naming a new album would make every chunk create its own album, so those requests stay whole.
+    if not isinstance(values, list) or params.get("albumName"):
+        return None
+    size = max(int(params.get("chunkSize") or settings.rpc_chunk_size), 1)
+    if len(values) <= size:
+        return None
+    return [values[idx : idx + size] for idx in range(0, len(values), size)]
+
+
+def _hedgeable(method: Optional[GptkMethodDef]) -> bool:
+    # Same rule as gptk_ops: only catalogued read-only methods; rpc_execute and rpc_batch can send anything.
+    return settings.rpc_hedge_enabled and method is not None and method.read_only
+
+
+def _parse(rpcid: str, raw: Any, params: dict[str, Any]) -> Any:
+    return parse_response(
+        rpcid,
+        raw,
+        params.get("fields"),
+        lazy=bool(params.get("lazy")),
+        columnar=bool(params.get("columnar")),
+    )
+
+
+def _run_chunks(
+    client: GPhotosRpcClient,
+    method: GptkMethodDef,
+    params: dict[str, Any],
+    chunks: list[list[Any]],
+    session_state: dict[str, Any],
+    source_path: str,
+    progress: ProgressFn,
+) -> AdapterResult:
+    def send(chunk: list[Any]) -> dict[str, Any]:
+        request_data = method.request_builder({**params, method.chunk_param: chunk})
+        return client.execute_rpc(
+            session_state=session_state,
+            rpcid=method.rpcid,
+            request_data=request_data,
+            source_path=source_path,
+            hedge=_hedgeable(method),
+        )
+
+    # Every chunk still goes through the client's per-account rate limiter and circuit breaker.
+    outcomes: list[Optional[dict[str, Any]]] = [None] * len(chunks)
+    errors: list[Optional[str]] = [None] * len(chunks)
+    workers = max(1, min(settings.rpc_chunk_concurrency, len(chunks)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rpc-chunk")
+    try:
+        futures = {executor.submit(send, chunk): idx for idx, chunk in enumerate(chunks)}
+        for finished, future in enumerate(as_completed(futures), start=1):
+            idx = futures[future]
+            try:
+                outcomes[idx] = future.result()
+                status = "done"
+            except Exception as exc:  # noqa: BLE001
+                errors[idx] = str(exc)
+                status = "failed"
+            # Progress runs on this thread only: it touches the job's DB session and raises on cancellation.
+            progress(0.55 + 0.4 * finished / len(chunks), f"Chunk {idx + 1}/{len(chunks)} {status} ({finished}/{len(chunks)})")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    succeeded = [idx for idx, outcome in enumerate(outcomes) if outcome is not None]
+    if not succeeded:
+        raise RuntimeError(f"All {len(chunks)} chunks of gptk.{method.operation} failed: {errors[0]}")
+
+    failed = [idx for idx, error in enumerate(errors) if error is not None]
+    progress(1.0, f"GPTK RPC completed: {len(succeeded)}/{len(chunks)} chunks succeeded")
+    raw_by_chunk = [outcome.get("data") if outcome is not None else None for outcome in outcomes]
+    return {
+        "operation": method.operation,
+        "rpcid": method.rpcid,
+        "data": [_parse(method.rpcid, raw, params) for raw in raw_by_chunk],
+        "raw_data": raw_by_chunk,
+        "session_state": outcomes[succeeded[-1]].get("session") or session_state,
+        "chunks": [
+            {"index": idx, "size": len(chunk), "status": "failed" if errors[idx] else "succeeded", "error": errors[idx]}
+            for idx, chunk in enumerate(chunks)
+        ],
+        "succeeded_chunks": len(succeeded),
+        "failed_chunks": len(failed),
+        "failed_items": [item for idx in failed for item in chunks[idx]],
+    }
+
+
+def _client(cookie_jar: list[dict[str, Any]] | None, account_id: str | None) -> GPhotosRpcClient:
+    if not cookie_jar:
+        raise RuntimeError("GPTK cookie jar is missing for this account")
+    if account_id:
+        return client_registry.get(account_id, cookie_jar)
+    return GPhotosRpcClient(
+        cookie_jar=cookie_jar,
+        max_retries=settings.rpc_max_retries,
+        retry_base_delay_ms=settings.rpc_retry_base_delay_ms,
+    )
+
+
+def _bootstrap(
+    client: GPhotosRpcClient,
+    params: dict[str, Any],
+    session_state: dict[str, Any] | None,
+    source_path: str,
+    progress: ProgressFn,
+) -> dict[str, Any]:
+    current_session = dict(session_state or {})
+    if params.get("forceBootstrap") or not current_session.get("fSid"):
+        progress(0.2, "Bootstrapping GPTK session")
+        current_session = client.refresh_session_state(
+            source_path, stale_state=current_session, force=bool(params.get("forceBootstrap"))
+        )
+    return current_session
+
+
+def _batch_entries(params: dict[str, Any]) -> list[tuple[str, Any, str]]:
+    calls = params.get("calls")
+    if not isinstance(calls, list) or not calls:
+        raise ValueError("gptk.rpc_batch requires a non-empty params.calls list")
+    entries: list[tuple[str, Any, str]] = []
+    for idx, call in enumerate(calls):
+        if not isinstance(call, dict) or not call.get("rpcid"):
+            raise ValueError(f"gptk.rpc_batch requires params.calls[{idx}].rpcid")
+        if call.get("requestData") is None:
+            raise ValueError(f"gptk.rpc_batch requires params.calls[{idx}].requestData")
+        entries.append((str(call["rpcid"]), call["requestData"], str(call.get("sourcePath") or "/")))
+    return entries
+
+
+def _batch_packs(entries: list[tuple[str, Any, str]], pack_size: int) -> list[list[int]]:
+    # One batchexecute request carries a single source-path, so only entries sharing one are packed together.
+    by_path: dict[str, list[int]] = {}
+    for idx, (_, _, source_path) in enumerate(entries):
+        by_path.setdefault(source_path, []).append(idx)
+    return [indexes[start : start + pack_size] for indexes in by_path.values() for start in range(0, len(indexes), pack_size)]
+
+
+def _batch_result(
+    results: list[Optional[dict[str, Any]]], requests_sent: int, session_state: dict[str, Any]
+) -> AdapterResult:
+    finished = [result for result in results if result is not None]
+    return {
+        "operation": "rpc_batch",
+        "entries": finished,
+        "total": len(results),
+        "finished": len(finished),
+        "succeeded": sum(1 for result in finished if result["status"] == "succeeded"),
+        "failed": sum(1 for result in finished if result["status"] == "failed"),
+        "requests": requests_sent,
+        "session_state": session_state,
+    }
+
+
+def run_batch(
+    params: dict[str, Any],
+    cookie_jar: list[dict[str, Any]] | None,
+    session_state: dict[str, Any] | None,
+    dry_run: bool,
+    progress: ProgressFn,
+    account_id: str | None = None,
+    publish: Optional[Callable[[AdapterResult], None]] = None,
+) -> AdapterResult:
+    entries = _batch_entries(params)
+    packs = _batch_packs(entries, max(int(params.get("packSize") or settings.rpc_batch_pack_size), 1))
+    if dry_run:
+        return {
+            "operation": "rpc_batch",
+            "total": len(entries),
+            "requests": [[entries[idx][0] for idx in pack] for pack in packs],
+        }
+
+    client = _client(cookie_jar, account_id)
+    current_session = _bootstrap(client, params, session_state, entries[0][2], progress)
+    if account_id:
+        result_cache.note_operation(account_id, "rpc_batch")
+
+    def send(pack: list[int]) -> dict[str, Any]:
+        return client.execute_batch(
+            session_state=current_session,
+            calls=[(entries[idx][0], entries[idx][1]) for idx in pack],
+            source_path=entries[pack[0]][2],
+            # Entries are arbitrary RPCs: one rejected call must not re-send (or fail) the others in its pack.
+            allow_missing=True,
+        )
+
+    results: list[Optional[dict[str, Any]]] = [None] * len(entries)
+    latest_session = current_session
+    # A job may ask for fewer requests in flight than the server-wide chunk concurrency, never more.
+    concurrency = min(int(params.get("concurrency") or settings.rpc_chunk_concurrency), settings.rpc_chunk_concurrency)
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(packs))), thread_name_prefix="rpc-batch")
+    progress(0.55, f"Executing {len(entries)} GPTK RPCs in {len(packs)} requests")
+    try:
+        futures = {executor.submit(send, pack): pack for pack in packs}
+        finished = 0
+        for future in as_completed(futures):
+            pack = futures[future]
+            try:
+                outcome = future.result()
+                latest_session = outcome.get("session") or latest_session
+                for idx, raw in zip(pack, outcome.get("data") or []):
+                    rpcid = entries[idx][0]
+                    # A call the server rejected comes back without a wrb.fr frame for its envelope.
+                    if raw is None:
+                        results[idx] = {"index": idx, "rpcid": rpcid, "status": "failed", "data": None, "raw_data": None, "error": "Missing payload in wrb.fr envelope"}
+                        continue
+                    results[idx] = {"index": idx, "rpcid": rpcid, "status": "succeeded", "data": parse_response(rpcid, raw), "raw_data": raw, "error": None}
+            except Exception as exc:  # noqa: BLE001
+                for idx in pack:
+                    results[idx] = {"index": idx, "rpcid": entries[idx][0], "status": "failed", "data": None, "raw_data": None, "error": str(exc)}
+            finished += len(pack)
+            # Both callbacks run on this thread only: they touch the job's DB session.
+            if publish is not None:
+                publish(_batch_result(results, len(packs), latest_session))
+            progress(0.55 + 0.4 * finished / len(entries), f"GPTK RPC batch: {finished}/{len(entries)} entries finished")
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    if account_id:
+        result_cache.note_operation(account_id, "rpc_batch")
+    result = _batch_result(results, len(packs), latest_session)
+    if not result["succeeded"]:
+        raise RuntimeError(f"All {len(entries)} gptk.rpc_batch entries failed: {result['entries'][0]['error']}")
+    progress(1.0, f"GPTK RPC batch completed: {result['succeeded']}/{len(entries)} entries succeeded")
+    return result
+
+
+def _cached_result(
+    op: str,
+    resolved_operation: str,
+    rpcid: str,
+    params: dict[str, Any],
+    session_state: dict[str, Any] | None,
+    progress: ProgressFn,
+    account_id: str | None,
+) -> Optional[AdapterResult]:
+    cached = result_cache.get(account_id, op, params) if account_id else None
+    if cached is None:
+        return None
+    progress(1.0, "GPTK RPC served from cache")
+    return {
+        "operation": resolved_operation,
+        "rpcid": rpcid,
+        "data": _parse(rpcid, cached, params),
+        "raw_data": cached,
+        "session_state": dict(session_state or {}),
+        "cached": True,
+    }
+
+
+def runs_async(operation: str, params: dict[str, Any], dry_run: bool) -> bool:
+    # Single-RPC jobs can await on the worker's event loop; previews, chunked runs and rpc_batch keep a thread.
+    op = operation.replace("gptk.", "").strip()
+    if dry_run or op == "rpc_batch":
+        return False
+    if op == "rpc_execute":
+        return True
+    try:
+        return _chunk_plan(resolve_method(op), params) is None
+    except ValueError:
+        return False
+
+
+async def run_async(
+    operation: str,
+    params: dict[str, Any],
+    cookie_jar: list[dict[str, Any]] | None,
+    session_state: dict[str, Any] | None,
+    progress: AsyncProgressFn,
+    account_id: str,
+) -> AdapterResult:
+    op = operation.replace("gptk.", "").strip()
+    method = None if op == "rpc_execute" else resolve_method(op)
+    rpcid = method.rpcid if method is not None else str(params.get("rpcid") or "")
+    resolved_operation = method.operation if method is not None else op
+    check_fields(rpcid, params.get("fields"))
+
+    cached = _cached_result(op, resolved_operation, rpcid, params, session_state, lambda _value, _message: None, account_id)
+    if cached is not None:
+        await progress(1.0, "GPTK RPC served from cache")
+        return cached
+
+    if not cookie_jar:
+        raise RuntimeError("GPTK cookie jar is missing for this account")
+    client = async_client_registry.get(account_id, cookie_jar)
+    result_cache.note_operation(account_id, op)
+    await progress(0.55, f"Executing GPTK RPC {rpcid}")
+    outcome = await execute_operation_async(client, operation, params, dict(session_state or {}))
+    result_cache.note_operation(account_id, op)
+    result_cache.put(account_id, op, params, outcome["raw_data"])
+
+    await progress(1.0, "GPTK RPC completed")
+    return {
+        "operation": resolved_operation,
+        "rpcid": outcome["rpcid"],
+        "data": outcome["data"],
+        "raw_data": outcome["raw_data"],
+        "session_state": outcome["session_state"],
+    }
 
 
 def run(
@@ -17,11 +325,13 @@ def run(
     _sidecar_base_url: str | None,
     dry_run: bool,
     progress: ProgressFn,
+    account_id: str | None = None,
 ) -> AdapterResult:
     op = operation.replace("gptk.", "")
 
     source_path = params.get("sourcePath", "/")
     resolved_operation = op
+    method: Optional[GptkMethodDef] = None
 
     if op == "rpc_execute":
         rpcid = params.get("rpcid")
@@ -36,28 +346,36 @@ def run(
         request_data = method.request_builder(params)
         source_path = params.get("sourcePath", method.source_path_hint)
         resolved_operation = method.operation
+    # Checked before anything is sent, so a bad projection fails the job instead of returning the raw payload.
+    check_fields(str(rpcid), params.get("fields"))
 
+    chunks = _chunk_plan(method, params)
     if dry_run:
-        return {
+        preview: AdapterResult = {
             "operation": resolved_operation,
             "rpcid": rpcid,
             "sourcePath": source_path,
             "request_preview": request_data,
         }
+        if chunks:
+            preview["chunks"] = [len(chunk) for chunk in chunks]
+        return preview
 
-    if not cookie_jar:
-        raise RuntimeError("GPTK cookie jar is missing for this account")
+    cached = _cached_result(op, resolved_operation, rpcid, params, session_state, progress, account_id)
+    if cached is not None:
+        return cached
 
-    client = GPhotosRpcClient(
-        cookie_jar=cookie_jar,
-        max_retries=settings.rpc_max_retries,
-        retry_base_delay_ms=settings.rpc_retry_base_delay_ms,
-    )
+    client = _client(cookie_jar, account_id)
+    if account_id:
+        result_cache.note_operation(account_id, op)
+    current_session = _bootstrap(client, params, session_state, source_path, progress)
 
-    current_session = dict(session_state or {})
-    if params.get("forceBootstrap") or not current_session.get("fSid"):
-        progress(0.2, "Bootstrapping GPTK session")
-        current_session = client.bootstrap_session(source_path)
+    if chunks and method is not None:
+        progress(0.55, f"Executing GPTK RPC {rpcid} in {len(chunks)} chunks")
+        chunked = _run_chunks(client, method, params, chunks, current_session, source_path, progress)
+        if account_id:
+            result_cache.note_operation(account_id, op)
+        return chunked
 
     progress(0.55, f"Executing GPTK RPC {rpcid}")
     rpc_result = client.execute_rpc(
@@ -65,8 +383,13 @@ def run(
         rpcid=rpcid,
         request_data=request_data,
         source_path=source_path,
+        hedge=_hedgeable(method),
     )
-    parsed_data = parse_response(rpcid, rpc_result.get("data"))
+    parsed_data = _parse(rpcid, rpc_result.get("data"), params)
+    if account_id:
+        # Writes invalidate on both sides: a read that overlapped the RPC may have cached the pre-write state.
+        result_cache.note_operation(account_id, op)
+        result_cache.put(account_id, op, params, rpc_result.get("data"))
 
     progress(1.0, "GPTK RPC completed")
 
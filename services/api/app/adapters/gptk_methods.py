@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 
 
 RequestBuilder = Callable[[dict[str, Any]], list[Any]]
@@ -16,6 +16,12 @@ class GptkMethodDef:
     request_builder: RequestBuilder
     destructive: bool = False
     source_path_hint: str = "/"
+    # Safe to send twice: no server-side effect, so the RPC client may hedge it.
+    read_only: bool = False
+    # List param the executor may split across several RPCs when it is larger than one chunk.
+    chunk_param: Optional[str] = None
+    # Seconds a response may be served from the per-account result cache; 0 never caches it.
+    cache_ttl_seconds: float = 0.0
 
 
 # Request builders mirror the original Google-Photos-Toolkit api.ts method payloads.
@@ -33,6 +39,7 @@ _register(
         description="List media by taken date timeline.",
         params_template={"timestamp": None, "source": None, "pageId": None, "pageSize": 500},
         request_builder=lambda p: [p.get("pageId"), p.get("timestamp"), int(p.get("pageSize", 500)), None, 1, {"library": 1, "archive": 2}.get(p.get("source"), 3)],
+        read_only=True,
     )
 )
 
@@ -43,6 +50,7 @@ _register(
         description="List media by upload date.",
         params_template={"pageId": None},
         request_builder=lambda p: ["", [[4, "ra", 0, 0]], p.get("pageId")],
+        read_only=True,
     )
 )
 
@@ -53,6 +61,7 @@ _register(
         description="Search media library.",
         params_template={"searchQuery": "cats", "pageId": None},
         request_builder=lambda p: [p.get("searchQuery", ""), None, p.get("pageId")],
+        read_only=True,
     )
 )
 
@@ -63,6 +72,7 @@ _register(
         description="Find remote items by hash list.",
         params_template={"hashArray": []},
         request_builder=lambda p: [p.get("hashArray", []), None, 3, 0],
+        read_only=True,
     )
 )
 
@@ -73,6 +83,7 @@ _register(
         description="List favorite items.",
         params_template={"pageId": None},
         request_builder=lambda p: ["Favorites", [[5, "8", 0, 9]], p.get("pageId")],
+        read_only=True,
     )
 )
 
@@ -83,6 +94,7 @@ _register(
         description="List trash items.",
         params_template={"pageId": None},
         request_builder=lambda p: [p.get("pageId")],
+        read_only=True,
     )
 )
 
@@ -94,6 +106,7 @@ _register(
         params_template={"pageId": None, "sourcePath": "/u/0/photos/lockedfolder"},
         request_builder=lambda p: [p.get("pageId")],
         source_path_hint="/u/0/photos/lockedfolder",
+        read_only=True,
     )
 )
 
@@ -105,6 +118,7 @@ _register(
         params_template={"dedupKeyArray": []},
         request_builder=lambda p: [None, 1, p.get("dedupKeyArray", []), 3],
         destructive=True,
+        chunk_param="dedupKeyArray",
     )
 )
 
@@ -115,6 +129,7 @@ _register(
         description="Restore trashed items by dedup keys.",
         params_template={"dedupKeyArray": []},
         request_builder=lambda p: [None, 3, p.get("dedupKeyArray", []), 2],
+        chunk_param="dedupKeyArray",
     )
 )
 
@@ -125,6 +140,8 @@ _register(
         description="List shared links.",
         params_template={"pageId": None},
         request_builder=lambda p: [p.get("pageId"), None, 2, None, 3],
+        read_only=True,
+        cache_ttl_seconds=60,
     )
 )
 
@@ -135,6 +152,7 @@ _register(
         description="List albums.",
         params_template={"pageId": None, "pageSize": 100},
         request_builder=lambda p: [p.get("pageId"), None, None, None, 1, None, None, int(p.get("pageSize", 100)), [2], 5],
+        read_only=True,
     )
 )
 
@@ -145,6 +163,8 @@ _register(
         description="List album or shared-link page.",
         params_template={"albumMediaKey": "", "pageId": None, "authKey": None},
         request_builder=lambda p: [p.get("albumMediaKey"), p.get("pageId"), None, p.get("authKey")],
+        read_only=True,
+        cache_ttl_seconds=60,
     )
 )
 
@@ -156,6 +176,7 @@ _register(
         params_template={"itemAlbumMediaKeyArray": []},
         request_builder=lambda p: [p.get("itemAlbumMediaKeyArray", [])],
         destructive=True,
+        chunk_param="itemAlbumMediaKeyArray",
     )
 )
 
@@ -176,6 +197,7 @@ _register(
         description="Add items to an album or create one by name.",
         params_template={"mediaKeyArray": [], "albumMediaKey": None, "albumName": None},
         request_builder=lambda p: ([p.get("mediaKeyArray", []), None, p.get("albumName")] if p.get("albumName") else [p.get("mediaKeyArray", []), p.get("albumMediaKey")]),
+        chunk_param="mediaKeyArray",
     )
 )
 
@@ -186,6 +208,7 @@ _register(
         description="Add items to shared album.",
         params_template={"mediaKeyArray": [], "albumMediaKey": None, "albumName": None},
         request_builder=lambda p: ([p.get("mediaKeyArray", []), None, p.get("albumName")] if p.get("albumName") else [p.get("albumMediaKey"), [2, None, [ [[id]] for id in p.get("mediaKeyArray", []) ], None, None, None, [1]]]),
+        chunk_param="mediaKeyArray",
     )
 )
 
@@ -212,6 +235,7 @@ _register(
         params_template={"dedupKeyArray": [], "action": True},
         request_builder=lambda p: [[ [None, item] for item in p.get("dedupKeyArray", []) ], [1 if p.get("action", True) else 2]],
         destructive=True,
+        chunk_param="dedupKeyArray",
     )
 )
 
@@ -223,6 +247,7 @@ _register(
         params_template={"dedupKeyArray": [], "action": True},
         request_builder=lambda p: [[ [None, [1 if p.get("action", True) else 2], [None, item]] for item in p.get("dedupKeyArray", []) ], None, 1],
         destructive=True,
+        chunk_param="dedupKeyArray",
     )
 )
 
@@ -235,6 +260,7 @@ _register(
         request_builder=lambda p: [p.get("dedupKeyArray", []), []],
         destructive=True,
         source_path_hint="/u/0/photos/lockedfolder",
+        chunk_param="dedupKeyArray",
     )
 )
 
@@ -247,6 +273,7 @@ _register(
         request_builder=lambda p: [p.get("dedupKeyArray", [])],
         destructive=True,
         source_path_hint="/u/0/photos/lockedfolder",
+        chunk_param="dedupKeyArray",
     )
 )
 
@@ -257,6 +284,8 @@ _register(
         description="Get account storage quota.",
         params_template={},
         request_builder=lambda _p: [],
+        read_only=True,
+        cache_ttl_seconds=60,
     )
 )
 
@@ -267,6 +296,7 @@ _register(
         description="Get download URLs for media keys.",
         params_template={"mediaKeyArray": [], "authKey": None},
         request_builder=lambda p: [p.get("mediaKeyArray", []), None, p.get("authKey")],
+        read_only=True,
     )
 )
 
@@ -287,6 +317,7 @@ _register(
         description="Poll download token status.",
         params_template={"dlToken": ""},
         request_builder=lambda p: [[p.get("dlToken")]],
+        read_only=True,
     )
 )
 
@@ -298,6 +329,7 @@ _register(
         params_template={"albumMediaKey": "", "mediaKeyArray": []},
         request_builder=lambda p: [[p.get("albumMediaKey")], [p.get("mediaKeyArray", [])], [[None, None, None, [None, [], []], None, None, None, None, None, None, None, None, None, []]]],
         destructive=True,
+        chunk_param="mediaKeyArray",
     )
 )
 
@@ -308,6 +340,7 @@ _register(
         description="Save shared-album media to own library.",
         params_template={"albumMediaKey": "", "mediaKeyArray": []},
         request_builder=lambda p: [p.get("mediaKeyArray", []), None, p.get("albumMediaKey")],
+        chunk_param="mediaKeyArray",
     )
 )
 
@@ -318,6 +351,7 @@ _register(
         description="Save partner-shared media to own library.",
         params_template={"mediaKeyArray": []},
         request_builder=lambda p: [[[id] for id in p.get("mediaKeyArray", [])]],
+        chunk_param="mediaKeyArray",
     )
 )
 
@@ -328,6 +362,7 @@ _register(
         description="Get partner shared media page.",
         params_template={"partnerActorId": "", "gaiaId": "", "pageId": None},
         request_builder=lambda p: [p.get("pageId"), None, [None, [[[2, 1]]], [p.get("partnerActorId")], [None, p.get("gaiaId")], 1]],
+        read_only=True,
     )
 )
 
@@ -346,6 +381,7 @@ _register(
         },
         request_builder=lambda p: [[ [None, key] for key in p.get("dedupKeyArray", []) ], [2, p.get("center", [0, 0]), [p.get("visible1", [0, 0]), p.get("visible2", [0, 0])], [None, None, p.get("scale", 10)], p.get("gMapsPlaceId", "")]],
         destructive=True,
+        chunk_param="dedupKeyArray",
     )
 )
 
@@ -357,6 +393,7 @@ _register(
         params_template={"dedupKeyArray": []},
         request_builder=lambda p: [[ [None, key] for key in p.get("dedupKeyArray", []) ], [1]],
         destructive=True,
+        chunk_param="dedupKeyArray",
     )
 )
 
@@ -368,6 +405,7 @@ _register(
         params_template={"items": [{"dedupKey": "", "timestampSec": 0, "timezoneSec": 0}]},
         request_builder=lambda p: [[ [item.get("dedupKey"), item.get("timestampSec"), item.get("timezoneSec")] for item in p.get("items", []) ]],
         destructive=True,
+        chunk_param="items",
     )
 )
 
@@ -389,6 +427,8 @@ _register(
         description="Get item basic info.",
         params_template={"mediaKey": "", "albumMediaKey": None, "authKey": None},
         request_builder=lambda p: [p.get("mediaKey"), None, p.get("authKey"), None, p.get("albumMediaKey")],
+        read_only=True,
+        cache_ttl_seconds=300,
     )
 )
 
@@ -399,6 +439,8 @@ _register(
         description="Get item extended info.",
         params_template={"mediaKey": "", "authKey": None},
         request_builder=lambda p: [p.get("mediaKey"), 1, p.get("authKey"), None, 1],
+        read_only=True,
+        cache_ttl_seconds=300,
     )
 )
 
@@ -409,6 +451,7 @@ _register(
         description="Get batch media info for media keys.",
         params_template={"mediaKeyArray": []},
         request_builder=lambda p: [[[ [[id] for id in p.get("mediaKeyArray", [])] ], [[None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, [], None, None, None, None, None, None, None, None, None, None, []]]]],
+        read_only=True,
     )
 )
 
@@ -431,6 +474,7 @@ def catalog_entries() -> list[dict[str, Any]]:
                 "description": method.description,
                 "params_template": method.params_template,
                 "destructive": method.destructive,
+                "read_only": method.read_only,
                 "notes": [
                     "Returns raw RPC payload.",
                     f"rpcid={method.rpcid}",
@@ -3,9 +3,13 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any, Optional
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from .circuit_breaker import circuit_breakers
+from .credential_cache import credential_cache
 from .models import Account, CredentialCookies, CredentialGpmc, GPhotosSessionState
+from .session_cache import session_cache
 
 
 def utc_now() -> datetime:
@@ -41,6 +45,20 @@ def get_cookie_jar(session: Session, account: Account) -> list[dict[str, Any]]:
     return []
 
 
+def cached_cookie_jar(session: Session, account: Account) -> list[dict[str, Any]]:
+    def load_stamp() -> Optional[float]:
+        updated_at = session.execute(
+            select(CredentialCookies.updated_at).where(CredentialCookies.account_id == account.id)
+        ).scalar_one_or_none()
+        if updated_at is None:
+            return None
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        return updated_at.timestamp()
+
+    return credential_cache.cookie_jar(account.id, load_stamp, lambda: get_cookie_jar(session, account))
+
+
 def set_cookie_jar(session: Session, account: Account, cookie_jar: list[dict[str, Any]]) -> None:
     cred = session.query(CredentialCookies).filter(CredentialCookies.account_id == account.id).one_or_none()
     if cred is None:
@@ -52,6 +70,9 @@ def set_cookie_jar(session: Session, account: Account, cookie_jar: list[dict[str
 
     account.gptk_cookie_jar = cookie_jar
     account.updated_at = utc_now()
+    credential_cache.invalidate(account.id)
+    session_cache.invalidate(account.id)
+    circuit_breakers.reset(account.id)
 
 
 def get_session_state(session: Session, account: Account) -> dict[str, Any]:
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Optional
+
+from .config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, account_key: str, reason: str, retry_in: float) -> None:
+        self.account_key = account_key
+        self.reason = reason
+        self.retry_in = retry_in
+        super().__init__(f"RPC circuit open for account after repeated {reason} failures; retry in {retry_in:.0f}s")
+
+
+def failure_kind(status: int) -> Optional[str]:
+    if status in {401, 403}:
+        return "auth"
+    if status == 429 or status >= 500:
+        return "throttle"
+    return None
+
+
+class CircuitBreaker:
+    # Opens after `failure_threshold` consecutive auth/throttle failures; after the cooldown one probe call is let
+    # through (half-open) and its outcome either closes the circuit or re-opens it with a doubled cooldown.
+    def __init__(self, account_key: str, failure_threshold: int, reset_seconds: float, max_reset_seconds: float) -> None:
+        self.account_key = account_key
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.max_reset_seconds = max(max_reset_seconds, reset_seconds)
+        self.state = CLOSED
+        self.reason: Optional[str] = None
+        self._cooldown = reset_seconds
+        self._open_until = 0.0
+        self._failures = 0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+
+    def _error(self, now: float) -> CircuitOpenError:
+        self.rejected += 1
+        return CircuitOpenError(self.account_key, self.reason or "rpc", max(self._open_until - now, 0.0))
+
+    def check(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now < self._open_until:
+                raise self._error(now)
+
+    def before_call(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now < self._open_until:
+                    raise self._error(now)
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN:
+                # A probe that never reported back (cancelled task, killed thread) must not wedge the circuit.
+                if self._probe_in_flight and now - self._probe_started < self.reset_seconds:
+                    raise self._error(now)
+                self._probe_in_flight = True
+                self._probe_started = now
+
+    def blocks(self, reason: str) -> bool:
+        with self._lock:
+            return self.state == OPEN and self.reason == reason and time.monotonic() < self._open_until
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.reason = None
+            self._failures = 0
+            self._cooldown = self.reset_seconds
+            self._probe_in_flight = False
+
+    def record_failure(self, reason: str) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN:
+                self._cooldown = min(self._cooldown * 2, self.max_reset_seconds)
+            elif self._failures < self.failure_threshold or self.state == OPEN:
+                return
+            self.state = OPEN
+            self.reason = reason
+            self._open_until = time.monotonic() + self._cooldown
+            self._probe_in_flight = False
+            self.opened += 1
+
+    def record_neutral(self) -> None:
+        # The probe failed for a reason unrelated to auth/throttling; let the next caller probe instead.
+        with self._lock:
+            self._probe_in_flight = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "state": self.state,
+                "reason": self.reason,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": round(max(self._open_until - now, 0.0), 1) if self.state == OPEN else 0.0,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class CircuitBreakerRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def get(self, account_key: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(account_key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    account_key,
+                    failure_threshold=settings.rpc_breaker_failure_threshold,
+                    reset_seconds=settings.rpc_breaker_reset_seconds,
+                    max_reset_seconds=settings.rpc_breaker_max_reset_seconds,
+                )
+                self._breakers[account_key] = breaker
+            return breaker
+
+    def reset(self, account_key: str) -> None:
+        with self._lock:
+            breaker = self._breakers.get(account_key)
+        if breaker is not None:
+            breaker.reset()
+
+    def snapshot(self, account_key: str) -> dict[str, Any]:
+        return self.get(account_key).snapshot()
+
+
+circuit_breakers = CircuitBreakerRegistry()
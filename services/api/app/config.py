@@ -10,8 +10,43 @@ class Settings:
     db_path: str = os.getenv("LM_DB_PATH", str(Path(__file__).resolve().parents[1] / "lintasmemori.db"))
     poll_interval_seconds: float = float(os.getenv("LM_POLL_INTERVAL_SECONDS", "1.0"))
     preview_ttl_minutes: int = int(os.getenv("LM_PREVIEW_TTL_MINUTES", "30"))
+    json_backend: str = os.getenv("LM_JSON_BACKEND", "auto").lower()
     rpc_max_retries: int = int(os.getenv("LM_RPC_MAX_RETRIES", "3"))
     rpc_retry_base_delay_ms: int = int(os.getenv("LM_RPC_RETRY_BASE_DELAY_MS", "1500"))
+    rpc_pool_maxsize: int = int(os.getenv("LM_RPC_POOL_MAXSIZE", "10"))
+    rpc_rate_initial: float = float(os.getenv("LM_RPC_RATE_INITIAL", "4"))
+    rpc_rate_min: float = float(os.getenv("LM_RPC_RATE_MIN", "0.5"))
+    rpc_rate_max: float = float(os.getenv("LM_RPC_RATE_MAX", "20"))
+    rpc_rate_burst: float = float(os.getenv("LM_RPC_RATE_BURST", "4"))
+    rpc_rate_increase_step: float = float(os.getenv("LM_RPC_RATE_INCREASE_STEP", "0.2"))
+    rpc_rate_decrease_factor: float = float(os.getenv("LM_RPC_RATE_DECREASE_FACTOR", "0.5"))
+    rpc_backoff_max_ms: int = int(os.getenv("LM_RPC_BACKOFF_MAX_MS", "30000"))
+    rpc_rate_share_seconds: float = float(os.getenv("LM_RPC_RATE_SHARE_SECONDS", "1"))
+    rpc_breaker_failure_threshold: int = int(os.getenv("LM_RPC_BREAKER_FAILURE_THRESHOLD", "5"))
+    rpc_breaker_reset_seconds: float = float(os.getenv("LM_RPC_BREAKER_RESET_SECONDS", "60"))
+    rpc_breaker_max_reset_seconds: float = float(os.getenv("LM_RPC_BREAKER_MAX_RESET_SECONDS", "900"))
+    rpc_hedge_enabled: bool = os.getenv("LM_RPC_HEDGE_ENABLED", "0").lower() in {"1", "true", "yes"}
+    rpc_hedge_percentile: float = float(os.getenv("LM_RPC_HEDGE_PERCENTILE", "95"))
+    rpc_hedge_min_samples: int = int(os.getenv("LM_RPC_HEDGE_MIN_SAMPLES", "20"))
+    rpc_hedge_min_delay_ms: int = int(os.getenv("LM_RPC_HEDGE_MIN_DELAY_MS", "100"))
+    rpc_hedge_window: int = int(os.getenv("LM_RPC_HEDGE_WINDOW", "200"))
+    rpc_async_max_concurrency: int = int(os.getenv("LM_RPC_ASYNC_MAX_CONCURRENCY", "4"))
+    rpc_chunk_size: int = int(os.getenv("LM_RPC_CHUNK_SIZE", "250"))
+    rpc_chunk_concurrency: int = int(os.getenv("LM_RPC_CHUNK_CONCURRENCY", "3"))
+    rpc_batch_pack_size: int = int(os.getenv("LM_RPC_BATCH_PACK_SIZE", "10"))
+    result_cache_max_bytes: int = int(os.getenv("LM_RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    media_info_window_ms: int = int(os.getenv("LM_MEDIA_INFO_WINDOW_MS", "10"))
+    media_info_batch_size: int = int(os.getenv("LM_MEDIA_INFO_BATCH_SIZE", "120"))
+    media_info_batches_per_request: int = int(os.getenv("LM_MEDIA_INFO_BATCHES_PER_REQUEST", "4"))
+    credential_recheck_seconds: float = float(os.getenv("LM_CREDENTIAL_RECHECK_SECONDS", "5"))
+    index_full_resync_hours: float = float(os.getenv("LM_INDEX_FULL_RESYNC_HOURS", "168"))
+    index_write_queue_size: int = int(os.getenv("LM_INDEX_WRITE_QUEUE_SIZE", "64"))
+    index_commit_rows: int = int(os.getenv("LM_INDEX_COMMIT_ROWS", "5000"))
+    index_enrich_concurrency: int = int(os.getenv("LM_INDEX_ENRICH_CONCURRENCY", "3"))
+    index_enrich_retries: int = int(os.getenv("LM_INDEX_ENRICH_RETRIES", "2"))
+    index_album_concurrency: int = int(os.getenv("LM_INDEX_ALBUM_CONCURRENCY", "3"))
+    session_warm_interval_seconds: float = float(os.getenv("LM_SESSION_WARM_INTERVAL_SECONDS", "300"))
+    session_max_age_seconds: float = float(os.getenv("LM_SESSION_MAX_AGE_SECONDS", "3600"))
     static_dir: str = os.getenv("LM_STATIC_DIR", str(Path(__file__).resolve().parents[2] / ".." / "apps" / "web" / "dist"))
 
 
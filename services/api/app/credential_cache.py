@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from .config import settings
+
+# Returns the credentials row's updated_at (epoch seconds, None when there is no row) for an account.
+StampLoader = Callable[[], Optional[float]]
+# Reads and decodes the cookie jar for an account.
+JarLoader = Callable[[], list[dict[str, Any]]]
+
+
+@dataclass
+class _CredentialEntry:
+    cookie_jar: list[dict[str, Any]]
+    stamp: Optional[float]
+    checked_at: float
+
+
+class CredentialCache:
+    # Keeps each account's decoded cookie jar in memory. Within recheck_seconds of the last check the jar is served
+    # without touching the database; after that a single updated_at lookup decides whether it is reloaded. Writes
+    # in this process invalidate directly, so the recheck only matters for jars changed by another process.
+    def __init__(self, recheck_seconds: float) -> None:
+        self.recheck_seconds = recheck_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[str, _CredentialEntry] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def _count(self, key: str, name: str) -> None:
+        counters = self._counters.setdefault(key, {"hits": 0, "checks": 0, "loads": 0})
+        counters[name] += 1
+
+    def cookie_jar(self, key: str, load_stamp: StampLoader, load_jar: JarLoader) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.checked_at < self.recheck_seconds:
+                self._count(key, "hits")
+                return entry.cookie_jar
+
+        stamp = load_stamp()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and stamp is not None and entry.stamp == stamp:
+                entry.checked_at = now
+                self._count(key, "checks")
+                return entry.cookie_jar
+
+        cookie_jar = load_jar()
+        with self._lock:
+            # Jars without a credentials row (legacy account column) have no stamp to watch, so they are re-read.
+            if stamp is not None and cookie_jar:
+                self._entries[key] = _CredentialEntry(cookie_jar=cookie_jar, stamp=stamp, checked_at=now)
+            self._count(key, "loads")
+        return cookie_jar
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self, key: str) -> dict[str, Any]:
+        with self._lock:
+            return {**self._counters.get(key, {"hits": 0, "checks": 0, "loads": 0}), "cached": key in self._entries}
+
+
+credential_cache = CredentialCache(recheck_seconds=settings.credential_recheck_seconds)
@@ -6,10 +6,17 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 
+from . import jsoncodec
 from .config import settings
 
 
-engine = create_engine(f"sqlite:///{settings.db_path}", connect_args={"check_same_thread": False}, future=True)
+engine = create_engine(
+    f"sqlite:///{settings.db_path}",
+    connect_args={"check_same_thread": False},
+    future=True,
+    json_serializer=jsoncodec.dumps,
+    json_deserializer=jsoncodec.loads,
+)
 
 
 def _table_exists(connection: Connection, name: str) -> bool:
@@ -47,6 +54,11 @@ def _run_sqlite_migrations() -> None:
             _ensure_column(connection, "jobs", "progress", "FLOAT NOT NULL DEFAULT 0")
             _ensure_column(connection, "jobs", "status", "VARCHAR(40) NOT NULL DEFAULT 'queued'")
 
+        if _table_exists(connection, "album_index"):
+            _ensure_column(connection, "album_index", "members_modified_timestamp", "INTEGER")
+            _ensure_column(connection, "album_index", "members_item_count", "INTEGER")
+            _ensure_column(connection, "album_index", "members_synced_at", "DATETIME")
+
 
 def initialize_database() -> None:
     from .models import Base
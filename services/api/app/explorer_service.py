@@ -1,14 +1,34 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any, Callable, Iterable, Optional
-
-from sqlalchemy import and_, delete, func, or_, select, text
+import hashlib
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import repeat
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, text, update
 from sqlalchemy.orm import Session
 
-from .gptk_service import GptkService
-from .models import Account, AlbumIndex, MediaIndex
+from . import jsoncodec
+from .config import settings
+from .gphotos_rpc import client_registry
+from .gptk_service import DetachedGptk, GptkService
+from .index_writer import (
+    add_album_members,
+    album_member_keys,
+    apply_media_info,
+    remove_album_members,
+    upsert_albums,
+    MEDIA_FIELDS,
+    upsert_media_columns,
+)
+from .media_enrichment import MediaEnricher
+from .rate_limit import rate_limiters
+from .models import Account, AlbumIndex, IndexSyncState, MediaIndex
+from .paginator import paginate
+from .refresh_pipeline import Emit, WritePipeline
 from .schemas import ExplorerItem, ExplorerItemDetail, ExplorerItemsResponse, ExplorerQuery, ExplorerSourceOut
 
 ProgressFn = Callable[[float, str], None]
@@ -47,23 +67,92 @@ def _chunks(values: list[str], size: int) -> Iterable[list[str]]:
         yield values[idx : idx + size]
 
 
-def _media_type_from_payload(file_name: Optional[str], duration: Any) -> Optional[str]:
-    if duration:
-        return "video"
-    if not file_name:
-        return None
-    lower = file_name.lower()
-    if lower.endswith((".mp4", ".mov", ".mkv", ".avi", ".webm")):
-        return "video"
-    if lower.endswith((".jpg", ".jpeg", ".png", ".webp", ".heic", ".gif")):
-        return "image"
-    return None
+def _column_keys(values: Iterable[Any]) -> list[str]:
+    return [str(value) for value in values if value]
+
+
+def _take_columns(columns: dict[str, Any], indexes: Iterable[int]) -> dict[str, list[Any]]:
+    rows = list(indexes)
+    return {name: [values[idx] for idx in rows] for name, values in columns.items()}
+
+
+_KEY_PAGE_FIELDS = ("items.mediaKey", "nextPageId")
+# Library pages are decoded straight into the columns upsert_media_columns writes.
+_LIBRARY_PAGE_FIELDS = (*(f"items.{name}" for name in MEDIA_FIELDS), "nextPageId")
+_ALBUM_PAGE_FIELDS = (
+    "items.mediaKey",
+    "items.title",
+    "items.ownerActorId",
+    "items.itemCount",
+    "items.creationTimestamp",
+    "items.modifiedTimestamp",
+    "items.isShared",
+    "items.thumb",
+    "nextPageId",
+)
 
 
 @dataclass
 class _PageResult:
     items: list[dict[str, Any]]
     next_page_id: Optional[str]
+    columns: Optional[dict[str, Any]] = None
+
+    @property
+    def size(self) -> int:
+        if self.columns is not None:
+            return len(next(iter(self.columns.values()), ()))
+        return len(self.items)
+
+
+def _fingerprint(page: _PageResult, names: tuple[str, ...]) -> str:
+    if page.columns is not None:
+        rows: list[Any] = [list(values) for values in zip(*(page.columns.get(name, ()) for name in names))]
+    else:
+        rows = [[item.get(name) for name in names] for item in page.items]
+    return hashlib.sha1(jsoncodec.dumps([rows, bool(page.next_page_id)]).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _PagedSource:
+    operation: str
+    max_items: int
+    # Parser projection: only these (dotted) fields are extracted from each page.
+    fields: Optional[tuple[str, ...]] = None
+    # Columnar sources accumulate one list per field in columns instead of item dicts in items.
+    columnar: bool = False
+    # Item fields hashed into the change-probe fingerprint; volatile ones such as thumb URLs stay out.
+    fingerprint_fields: tuple[str, ...] = ("mediaKey",)
+    # Stop paging after a page that reaches items uploaded before this creationTimestamp.
+    watermark: Optional[int] = None
+    items: list[dict[str, Any]] = field(default_factory=list)
+    columns: dict[str, list[Any]] = field(default_factory=dict)
+    size: int = 0
+    page_id: Optional[str] = None
+    done: bool = False
+
+    def accept(self, page: _PageResult) -> None:
+        if not page.size:
+            self.done = True
+            return
+        if page.columns is not None:
+            for name, values in page.columns.items():
+                self.columns.setdefault(name, []).extend(values)
+        else:
+            self.items.extend(page.items)
+        self.size += page.size
+        self.page_id = page.next_page_id
+        if not self.page_id or self.size >= self.max_items or self._passed_watermark(page):
+            self.done = True
+
+    def _passed_watermark(self, page: _PageResult) -> bool:
+        if self.watermark is None:
+            return False
+        if page.columns is not None:
+            uploaded: Iterable[Any] = page.columns.get("creationTimestamp", ())
+        else:
+            uploaded = (item.get("creationTimestamp") for item in page.items)
+        return any((timestamp or self.watermark) < self.watermark for timestamp in uploaded)
 
 
 class ExplorerService:
@@ -85,8 +174,23 @@ class ExplorerService:
         row = self.session.get(MediaIndex, {"account_id": self.account.id, "media_key": media_key})
         if row is None:
             return None
+        self.fill_media_info([row])
         return self._to_item_detail(row)
 
+    def fill_media_info(self, rows: list[MediaIndex]) -> None:
+        # Detail pages and action previews fill in rows enrichment hasn't reached yet. They go through the account's
+        # media-info loader, so concurrent requests share get_batch_media_info batches instead of sending their own.
+        missing = [row.media_key for row in rows if row.file_name is None or row.size is None]
+        if not missing:
+            return
+        try:
+            info_by_key = self.gptk.media_info(missing)
+        except Exception:  # noqa: BLE001 - the indexed row is still worth serving without it
+            return
+        if apply_media_info(self.session, self.account.id, info_by_key):
+            # Commit expires the loaded rows, so they re-read the updated columns on next access.
+            self.session.commit()
+
     def query_items(self, query: ExplorerQuery) -> ExplorerItemsResponse:
         offset = _decode_cursor(query.page_cursor)
         page_size = query.page_size
@@ -152,6 +256,7 @@ class ExplorerService:
         max_items: int = 3000,
         include_album_members: bool = False,
         force_full: bool = False,
+        incremental: bool = True,
         progress: Optional[ProgressFn] = None,
     ) -> dict[str, Any]:
         progress = progress or (lambda _v, _m: None)
@@ -160,209 +265,464 @@ class ExplorerService:
         if force_full:
             self.session.execute(delete(MediaIndex).where(MediaIndex.account_id == self.account.id))
             self.session.execute(delete(AlbumIndex).where(AlbumIndex.account_id == self.account.id))
+            self.session.execute(delete(IndexSyncState).where(IndexSyncState.account_id == self.account.id))
             self.session.commit()
 
-        library_items = self._collect_library_items(max_items=max_items, progress=progress)
-        media_keys: list[str] = []
-        for item in library_items:
-            media_key = str(item.get("mediaKey") or "")
-            if not media_key:
-                continue
-            media_keys.append(media_key)
-            self._upsert_media(item=item, source="library", is_trashed=False)
-        self.session.commit()
+        state = self._sync_state()
+        delta = incremental and self._delta_ready(state)
+        watermark = state.library_watermark if delta else None
 
-        progress(0.42, "Syncing favorites and trash flags")
-        favorite_keys = set(self._collect_simple_keys("gptk.get_favorite_items", max_items=max_items))
-        trash_keys = set(self._collect_simple_keys("gptk.get_trash_items", max_items=max_items))
-
-        existing_rows = self.session.execute(select(MediaIndex).where(MediaIndex.account_id == self.account.id)).scalars().all()
-        for row in existing_rows:
-            row.is_favorite = row.media_key in favorite_keys
-            row.is_trashed = row.media_key in trash_keys
-            row.source = "trash" if row.is_trashed else "library"
-            row.updated_at = utc_now()
-        self.session.commit()
-
-        progress(0.55, "Syncing albums")
-        albums = self._collect_albums(max_items=1000)
-        album_keys = set()
-        for album in albums:
-            media_key = str(album.get("mediaKey") or "")
-            if not media_key:
-                continue
-            album_keys.add(media_key)
-            row = self.session.get(AlbumIndex, {"account_id": self.account.id, "media_key": media_key})
-            if row is None:
-                row = AlbumIndex(account_id=self.account.id, media_key=media_key)
-                self.session.add(row)
-            row.title = album.get("title")
-            row.owner_actor_id = album.get("ownerActorId")
-            row.item_count = album.get("itemCount")
-            row.creation_timestamp = album.get("creationTimestamp")
-            row.modified_timestamp = album.get("modifiedTimestamp")
-            row.is_shared = bool(album.get("isShared"))
-            row.thumb = album.get("thumb")
-            row.updated_at = utc_now()
-
-        if album_keys:
-            self.session.execute(
-                delete(AlbumIndex).where(
-                    and_(AlbumIndex.account_id == self.account.id, AlbumIndex.media_key.not_in(list(album_keys)))
-                )
+        library = _PagedSource(
+            "gptk.get_items_by_uploaded_date", max_items=max_items, fields=_LIBRARY_PAGE_FIELDS, columnar=True, watermark=watermark
+        )
+        # Favorites and trash only contribute flags, so their pages are decoded down to media keys.
+        favorites = _PagedSource("gptk.get_favorite_items", max_items=max_items, fields=_KEY_PAGE_FIELDS, columnar=True)
+        trash = _PagedSource("gptk.get_trash_items", max_items=max_items, fields=_KEY_PAGE_FIELDS, columnar=True)
+        album_source = _PagedSource(
+            "gptk.get_albums",
+            max_items=1000,
+            fields=_ALBUM_PAGE_FIELDS,
+            fingerprint_fields=("mediaKey", "title", "itemCount", "modifiedTimestamp"),
+        )
+        sources = {"library": library, "favorites": favorites, "trash": trash, "albums": album_source}
+
+        # The first page of every source arrives in one batchexecute; if the library and albums didn't move since
+        # the last refresh there is nothing new to list. Favorites and trash are paged either way: a flag change
+        # deep in either list never shows on its first page, and their key-only pages are cheap.
+        fingerprints = self._probe_sources(sources)
+        previous = state.fingerprints or {}
+        members_current = not include_album_members or not self._albums_to_sync(album_source.items)
+        unchanged = delta and all(fingerprints[name] == previous.get(name) for name in ("library", "albums")) and members_current
+        # Rows an earlier refresh could not enrich (failed requests, or a refresh that stopped early) are retried
+        # on every run, since neither the watermark nor an unchanged probe will list them again.
+        backlog = self._keys_without_media_info(limit=max_items)
+
+        # Listing keeps its four sources in one batchexecute per round; metadata enrichment and album members page
+        # on their own threads. Only this thread writes, through the pipeline's handlers.
+        detached = self.gptk.detached()
+        pipeline = WritePipeline(settings.index_write_queue_size, settings.index_commit_rows)
+        enrich_keys: queue.Queue[Optional[list[str]]] = queue.Queue()
+        if backlog:
+            enrich_keys.put(backlog)
+        queued = set(backlog)
+        enricher = MediaEnricher(
+            lambda chunks: [
+                result.data for result in detached.call_batch([("gptk.get_batch_media_info", {"mediaKeyArray": chunk}) for chunk in chunks])
+            ],
+            concurrency=settings.index_enrich_concurrency,
+            retries=settings.index_enrich_retries,
+            batch_size=settings.media_info_batch_size,
+            batches_per_request=settings.media_info_batches_per_request,
+        )
+        media_keys: list[str] = []
+        album_keys: list[str] = []
+
+        def emit_flags(emit: Emit) -> None:
+            emit(
+                "flags",
+                (
+                    set(_column_keys(favorites.columns.get("mediaKey", [])[:max_items])),
+                    set(_column_keys(trash.columns.get("mediaKey", [])[:max_items])),
+                ),
             )
-        self.session.commit()
 
-        progress(0.7, "Pulling metadata batch")
-        for chunk in _chunks(media_keys, 120):
-            try:
-                info_rows = self.gptk.call("gptk.get_batch_media_info", {"mediaKeyArray": chunk}).data
-            except Exception:
-                info_rows = []
-            if not isinstance(info_rows, list):
-                continue
-            for info in info_rows:
-                media_key = str(info.get("mediaKey") or "")
-                if not media_key:
-                    continue
-                row = self.session.get(MediaIndex, {"account_id": self.account.id, "media_key": media_key})
-                if row is None:
+        def list_sources(emit: Emit) -> None:
+            emitted = 0
+            albums_emitted = False
+
+            def on_round() -> None:
+                nonlocal emitted, albums_emitted
+                listed = min(library.size, max_items)
+                rows = range(emitted, listed)
+                emitted = listed
+                if watermark is not None:
+                    # Uploads sharing the watermark's timestamp may be new or already indexed; upserting them again is harmless.
+                    uploaded = library.columns.get("creationTimestamp", ())
+                    rows = [idx for idx in rows if (uploaded[idx] or watermark) >= watermark]
+                if rows:
+                    columns = _take_columns(library.columns, rows)
+                    emit("library", columns)
+                    media_keys.extend(_column_keys(columns.get("mediaKey", [])))
+                if album_source.done and not albums_emitted:
+                    albums_emitted = True
+                    albums = album_source.items[:1000]
+                    album_keys.extend(str(album.get("mediaKey")) for album in albums if album.get("mediaKey"))
+                    emit("albums", albums)
+
+            self._collect_sources(list(sources.values()), detached.call_batch, on_round)
+            emit("library_end", None)
+            emit_flags(emit)
+
+        def list_flags(emit: Emit) -> None:
+            self._collect_sources([favorites, trash], detached.call_batch, lambda: None)
+            emit_flags(emit)
+
+        def enrich_batches() -> Iterator[list[str]]:
+            while True:
+                try:
+                    keys = enrich_keys.get(timeout=0.1)
+                except queue.Empty:
+                    if pipeline.stopped:
+                        return
                     continue
-                row.file_name = info.get("fileName") or row.file_name
-                row.size = info.get("size") if info.get("size") is not None else row.size
-                row.timestamp_uploaded = info.get("creationTimestamp") or row.timestamp_uploaded
-                row.timestamp_taken = info.get("timestamp") or row.timestamp_taken
-                row.space_flags = {
-                    "takes_up_space": info.get("takesUpSpace"),
-                    "space_taken": info.get("spaceTaken"),
-                    "original_quality": info.get("isOriginalQuality"),
-                }
-                row.media_type = _media_type_from_payload(row.file_name, row.raw_item.get("duration"))
-                row.updated_at = utc_now()
+                if keys is None:
+                    return
+                yield keys
+
+        counts = {
+            "flag_changes": 0,
+            "favorite_items": 0,
+            "trash_items": 0,
+            "indexed": 0,
+            "albums_synced": 0,
+            "albums_skipped": 0,
+            "albums_failed": 0,
+            "album_members_added": 0,
+            "album_members_removed": 0,
+        }
+        stage = {"progress": 0.04}
+
+        def write_library(columns: dict[str, list[Any]]) -> int:
+            # Decided here rather than on the listing thread because it reads the rows this upsert is about to touch.
+            listed = {
+                str(media_key): dedup_key
+                for media_key, dedup_key in zip(columns.get("mediaKey", []), columns.get("dedupKey") or repeat(None))
+                if media_key
+            }
+            stale = self._keys_missing_media_info(listed)
+            enricher.note_skipped(len(listed) - len(stale))
+            stale = [media_key for media_key in stale if media_key not in queued]
+            written = upsert_media_columns(self.session, self.account.id, columns, source="library", is_trashed=False)
+            # Queued only after the upsert, so enrichment updates always reach the writer behind their rows.
+            if stale:
+                enrich_keys.put(stale)
+            counts["indexed"] += written
+            stage["progress"] = min(0.8, 0.04 + (counts["indexed"] / max(max_items, 1)) * 0.76)
+            progress(stage["progress"], f"Indexed {counts['indexed']} library items")
+            return written
+
+        def write_media_info(info_by_key: dict[str, Any]) -> int:
+            written = apply_media_info(self.session, self.account.id, info_by_key)
+            progress(stage["progress"], enricher.summary())
+            return written
+
+        def write_flags(flags: tuple[set[str], set[str]]) -> int:
+            favorite_keys, trash_keys = flags
+            counts["favorite_items"], counts["trash_items"] = len(favorite_keys), len(trash_keys)
+            counts["flag_changes"] = self._sync_flags(favorite_keys, trash_keys)
+            return counts["flag_changes"]
+
+        def write_albums(albums: list[dict[str, Any]]) -> int:
+            # Sync state is read before the upsert and the delete below touch the rows it lives on.
+            changed = self._albums_to_sync(albums)
+            written = upsert_albums(self.session, self.account.id, albums)
+            keys = [str(album.get("mediaKey")) for album in albums if album.get("mediaKey")]
+            if keys:
+                gone = self.session.execute(
+                    select(AlbumIndex.media_key).where(AlbumIndex.account_id == self.account.id, AlbumIndex.media_key.not_in(keys))
+                ).scalars().all()
+                for album_key in gone:
+                    written += remove_album_members(
+                        self.session, self.account.id, album_key, album_member_keys(self.session, self.account.id, album_key)
+                    )
+                self.session.execute(
+                    delete(AlbumIndex).where(and_(AlbumIndex.account_id == self.account.id, AlbumIndex.media_key.not_in(keys)))
+                )
+            if include_album_members:
+                counts["albums_skipped"] = len(keys) - len(changed)
+                if changed:
+                    pipeline.start("album-members", lambda emit: self._page_album_members(detached, changed, emit))
+            return written
+
+        # Per album being synced: (keys that listed it before this refresh, keys listed by pages so far).
+        album_members: dict[str, tuple[set[str], set[str]]] = {}
+
+        def members_of(album_key: str) -> tuple[set[str], set[str]]:
+            if album_key not in album_members:
+                album_members[album_key] = (album_member_keys(self.session, self.account.id, album_key), set())
+            return album_members[album_key]
+
+        def write_album_page(payload: tuple[str, list[Any]]) -> int:
+            album_key, items = payload
+            current, listed = members_of(album_key)
+            new_items = []
+            for item in items:
+                key = str(item.get("mediaKey") or "")
+                if key and key not in current and key not in listed:
+                    new_items.append(item)
+                listed.add(key)
+            added = add_album_members(self.session, self.account.id, album_key, new_items)
+            counts["album_members_added"] += added
+            return added
+
+        def write_album_synced(album: dict[str, Any]) -> int:
+            # Only a fully paged album can tell which members left it, so removals and the sync state wait for this.
+            current, listed = members_of(str(album["mediaKey"]))
+            album_members.pop(str(album["mediaKey"]))
+            removed = self._finish_album_sync(album, current - listed)
+            counts["albums_synced"] += 1
+            counts["album_members_removed"] += removed
+            progress(stage["progress"], f"Synced members of album {album.get('title') or album.get('mediaKey')}")
+            return removed + 1
+
+        def write_album_failed(payload: tuple[dict[str, Any], str]) -> int:
+            # Members added from pages that did arrive stay; the album keeps its old sync state and is retried next time.
+            album, error = payload
+            album_members.pop(str(album["mediaKey"]), None)
+            counts["albums_failed"] += 1
+            progress(stage["progress"], f"Album {album.get('title') or album.get('mediaKey')} not synced: {error}")
+            return 0
+
+        def end_library(_payload: None) -> int:
+            enrich_keys.put(None)
+            return 0
+
+        def commit() -> None:
+            self.session.commit()
+            self.gptk.store_session_state(None)
+
+        if unchanged:
+            stage["progress"] = 0.5
+            progress(stage["progress"], "Library unchanged; syncing favorites and trash")
+            if backlog:
+                progress(stage["progress"], f"Pulling metadata for {len(backlog)} items left without it")
+            enrich_keys.put(None)
+            pipeline.start("flags", list_flags)
+            pipeline.start("media-info", lambda emit: enricher.run(enrich_batches(), emit))
+            pipeline.drain({"flags": write_flags, "media_info": write_media_info}, commit)
+            state.fingerprints = fingerprints
+            state.last_delta_at = utc_now()
             self.session.commit()
+            progress(0.95, enricher.summary())
+            progress(1.0, "Explorer library unchanged since last refresh")
+            return {
+                **self._refresh_result(
+                    "unchanged",
+                    new_items=0,
+                    favorite_items=counts["favorite_items"],
+                    trash_items=counts["trash_items"],
+                    albums=0,
+                    flag_changes=counts["flag_changes"],
+                ),
+                "pipeline": pipeline.stats(),
+                "enrichment": {**enricher.stats(), "backlog_keys": len(backlog)},
+            }
+
+        progress(0.04, "Fetching library, favorites, trash and albums")
+        pipeline.start("listing", list_sources)
+        pipeline.start("media-info", lambda emit: enricher.run(enrich_batches(), emit))
+        pipeline.drain(
+            {
+                "library": write_library,
+                "flags": write_flags,
+                "albums": write_albums,
+                "library_end": end_library,
+                "media_info": write_media_info,
+                "album_page": write_album_page,
+                "album_synced": write_album_synced,
+                "album_failed": write_album_failed,
+            },
+            commit,
+        )
 
-        if include_album_members:
-            progress(0.82, "Indexing album members")
-            self._sync_album_memberships(list(album_keys), max_items_per_album=3000)
+        uploaded = [timestamp for timestamp in library.columns.get("creationTimestamp", [])[:max_items] if timestamp]
+        if uploaded:
+            state.library_watermark = max([*uploaded, state.library_watermark or 0])
+        state.fingerprints = fingerprints
+        if delta:
+            state.last_delta_at = utc_now()
+        else:
+            state.last_full_at = utc_now()
+        self.session.commit()
 
+        progress(0.95, enricher.summary())
         progress(1.0, "Explorer index refresh complete")
         return {
-            "library_items": len(media_keys),
-            "favorite_items": len(favorite_keys),
-            "trash_items": len(trash_keys),
-            "albums": len(album_keys),
+            **self._refresh_result(
+                "delta" if delta else "full",
+                new_items=len(media_keys),
+                favorite_items=counts["favorite_items"],
+                trash_items=counts["trash_items"],
+                albums=len(album_keys),
+                flag_changes=counts["flag_changes"],
+            ),
+            "pipeline": pipeline.stats(),
+            "enrichment": {**enricher.stats(), "backlog_keys": len(backlog)},
+            "album_members": {
+                name: counts[name]
+                for name in ("albums_synced", "albums_skipped", "albums_failed", "album_members_added", "album_members_removed")
+            },
+        }
+
+    def _refresh_result(
+        self, mode: str, *, new_items: int, favorite_items: int, trash_items: int, albums: int, flag_changes: int
+    ) -> dict[str, Any]:
+        return {
+            "mode": mode,
+            "library_items": new_items,
+            "favorite_items": favorite_items,
+            "trash_items": trash_items,
+            "albums": albums,
+            "flag_changes": flag_changes,
             "account_id": self.account.id,
+            "connections": client_registry.stats(self.account.id),
+            "rate_limit": rate_limiters.snapshot(self.account.id),
         }
 
-    def _collect_library_items(self, max_items: int, progress: ProgressFn) -> list[dict[str, Any]]:
-        items: list[dict[str, Any]] = []
-        page_id: Optional[str] = None
-        while len(items) < max_items:
-            response = self.gptk.call("gptk.get_items_by_uploaded_date", {"pageId": page_id}).data
-            page = self._parse_page(response)
-            if not page.items:
-                break
-            items.extend(page.items)
-            progress(min(0.35, 0.04 + (len(items) / max(max_items, 1)) * 0.31), f"Fetched {len(items)} library items")
-            page_id = page.next_page_id
-            if not page_id:
-                break
-        return items[:max_items]
-
-    def _collect_simple_keys(self, operation: str, max_items: int) -> list[str]:
-        keys: list[str] = []
-        page_id: Optional[str] = None
-        while len(keys) < max_items:
-            response = self.gptk.call(operation, {"pageId": page_id}).data
-            page = self._parse_page(response)
-            if not page.items:
-                break
-            for item in page.items:
-                media_key = item.get("mediaKey")
-                if media_key:
-                    keys.append(str(media_key))
-            page_id = page.next_page_id
-            if not page_id:
-                break
-        return keys[:max_items]
-
-    def _collect_albums(self, max_items: int) -> list[dict[str, Any]]:
-        items: list[dict[str, Any]] = []
-        page_id: Optional[str] = None
-        while len(items) < max_items:
-            response = self.gptk.call("gptk.get_albums", {"pageId": page_id}).data
-            page = self._parse_page(response)
-            if not page.items:
-                break
-            items.extend(page.items)
-            page_id = page.next_page_id
-            if not page_id:
+    def _sync_state(self) -> IndexSyncState:
+        state = self.session.get(IndexSyncState, self.account.id)
+        if state is None:
+            state = IndexSyncState(account_id=self.account.id, fingerprints={})
+            self.session.add(state)
+        return state
+
+    @staticmethod
+    def _delta_ready(state: IndexSyncState) -> bool:
+        # Deltas only see new uploads at the head of the library, so a periodic full pass picks up anything else.
+        if state.library_watermark is None or state.last_full_at is None:
+            return False
+        last_full_at = state.last_full_at if state.last_full_at.tzinfo else state.last_full_at.replace(tzinfo=timezone.utc)
+        return utc_now() - last_full_at < timedelta(hours=settings.index_full_resync_hours)
+
+    def _probe_sources(self, sources: dict[str, _PagedSource]) -> dict[str, str]:
+        results = self.gptk.call_batch(
+            [(source.operation, {"fields": source.fields, "columnar": source.columnar}) for source in sources.values()]
+        )
+        fingerprints: dict[str, str] = {}
+        for (name, source), result in zip(sources.items(), results):
+            page = self._parse_page(source.operation, result.data)
+            fingerprints[name] = _fingerprint(page, source.fingerprint_fields)
+            source.accept(page)
+        return fingerprints
+
+    def _sync_flags(self, favorite_keys: set[str], trash_keys: set[str]) -> int:
+        # Reads three columns for every row but only writes rows whose flags actually moved.
+        rows = self.session.execute(
+            select(MediaIndex.media_key, MediaIndex.is_favorite, MediaIndex.is_trashed).where(MediaIndex.account_id == self.account.id)
+        ).all()
+        changes: dict[tuple[bool, bool], list[str]] = {}
+        for media_key, is_favorite, is_trashed in rows:
+            flags = (media_key in favorite_keys, media_key in trash_keys)
+            if flags != (is_favorite, is_trashed):
+                changes.setdefault(flags, []).append(media_key)
+        now = utc_now()
+        for (is_favorite, is_trashed), keys in changes.items():
+            for chunk in _chunks(keys, 500):
+                self.session.execute(
+                    update(MediaIndex)
+                    .where(MediaIndex.account_id == self.account.id, MediaIndex.media_key.in_(chunk))
+                    .values(is_favorite=is_favorite, is_trashed=is_trashed, source="trash" if is_trashed else "library", updated_at=now)
+                )
+        return sum(len(keys) for keys in changes.values())
+
+    def _collect_sources(
+        self, sources: list[_PagedSource], call_batch: Callable[[list[tuple[str, dict[str, Any]]]], list[Any]], on_round: Callable[[], None]
+    ) -> None:
+        # on_round runs first for the pages the probe already accepted, then after every batchexecute round.
+        on_round()
+        while True:
+            active = [source for source in sources if not source.done]
+            if not active:
                 break
-        return items[:max_items]
+            results = call_batch(
+                [
+                    (source.operation, {"pageId": source.page_id, "fields": source.fields, "columnar": source.columnar})
+                    for source in active
+                ]
+            )
+            for source, result in zip(active, results):
+                source.accept(self._parse_page(source.operation, result.data))
+            on_round()
 
-    def _sync_album_memberships(self, album_keys: list[str], max_items_per_album: int) -> None:
-        rows = self.session.execute(select(MediaIndex).where(MediaIndex.account_id == self.account.id)).scalars().all()
-        for row in rows:
-            row.album_ids = []
-            row.updated_at = utc_now()
-        self.session.commit()
+    @staticmethod
+    def _page_album_members(detached: DetachedGptk, albums: list[dict[str, Any]], emit: Emit, max_items_per_album: int = 3000) -> None:
+        def sync(album: dict[str, Any]) -> None:
+            def fetch(page_id: Optional[str]) -> Any:
+                return detached.call("gptk.get_album_page", {"albumMediaKey": album["mediaKey"], "pageId": page_id, "lazy": True})
 
-        for album_key in album_keys:
-            page_id: Optional[str] = None
-            count = 0
-            while count < max_items_per_album:
-                response = self.gptk.call("gptk.get_album_page", {"albumMediaKey": album_key, "pageId": page_id}).data
-                page = self._parse_page(response)
-                if not page.items:
-                    break
-                for item in page.items:
-                    media_key = str(item.get("mediaKey") or "")
-                    if not media_key:
-                        continue
-                    row = self.session.get(MediaIndex, {"account_id": self.account.id, "media_key": media_key})
-                    if row is None:
-                        row = MediaIndex(account_id=self.account.id, media_key=media_key, source="library", raw_item=item)
-                        self.session.add(row)
-                    albums = list(row.album_ids or [])
-                    if album_key not in albums:
-                        albums.append(album_key)
-                    row.album_ids = albums
-                    row.updated_at = utc_now()
-                    count += 1
-                self.session.commit()
-                page_id = page.next_page_id
-                if not page_id:
-                    break
+            # Pages go to the writer one at a time, so item views over the raw page beat building dicts; each
+            # album fetches its next page in the background while the current one is queued.
+            try:
+                for page in paginate(fetch, max_items=max_items_per_album):
+                    emit("album_page", (str(album["mediaKey"]), page.items))
+            except Exception as exc:  # noqa: BLE001 - one album's failure must not end the others
+                emit("album_failed", (album, str(exc)))
+                return
+            emit("album_synced", album)
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(settings.index_album_concurrency, len(albums))), thread_name_prefix="album-members")
+        try:
+            for future in as_completed([executor.submit(sync, album) for album in albums]):
+                future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _keys_without_media_info(self, limit: int) -> list[str]:
+        rows = self.session.execute(
+            select(MediaIndex.media_key)
+            .where(MediaIndex.account_id == self.account.id, or_(MediaIndex.file_name.is_(None), MediaIndex.size.is_(None)))
+            .order_by(MediaIndex.timestamp_uploaded.desc())
+            .limit(limit)
+        )
+        return [str(media_key) for media_key in rows.scalars()]
+
+    def _keys_missing_media_info(self, listed: dict[str, Optional[str]]) -> list[str]:
+        # Rows that already carry a file name and size keep them unless the listing reports different content.
+        # listed maps each listed media key to its dedupKey.
+        known: set[str] = set()
+        for chunk in _chunks(list(listed), 500):
+            rows = self.session.execute(
+                select(MediaIndex.media_key, MediaIndex.dedup_key).where(
+                    MediaIndex.account_id == self.account.id,
+                    MediaIndex.media_key.in_(chunk),
+                    MediaIndex.file_name.is_not(None),
+                    MediaIndex.size.is_not(None),
+                )
+            ).all()
+            known.update(media_key for media_key, dedup_key in rows if listed[media_key] in (None, dedup_key))
+        return [media_key for media_key in listed if media_key not in known]
+
+    def _albums_to_sync(self, albums: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        synced = {
+            media_key: (modified_timestamp, item_count)
+            for media_key, modified_timestamp, item_count in self.session.execute(
+                select(AlbumIndex.media_key, AlbumIndex.members_modified_timestamp, AlbumIndex.members_item_count).where(
+                    AlbumIndex.account_id == self.account.id, AlbumIndex.members_synced_at.is_not(None)
+                )
+            ).all()
+        }
+        return [
+            album
+            for album in albums
+            if album.get("mediaKey")
+            and synced.get(str(album["mediaKey"])) != (album.get("modifiedTimestamp"), album.get("itemCount"))
+        ]
+
+    def _finish_album_sync(self, album: dict[str, Any], departed: set[str]) -> int:
+        album_key = str(album["mediaKey"])
+        removed = remove_album_members(self.session, self.account.id, album_key, departed)
+        self.session.execute(
+            update(AlbumIndex)
+            .where(AlbumIndex.account_id == self.account.id, AlbumIndex.media_key == album_key)
+            .values(
+                members_modified_timestamp=album.get("modifiedTimestamp"),
+                members_item_count=album.get("itemCount"),
+                members_synced_at=utc_now(),
+            )
+        )
+        return removed
 
     @staticmethod
-    def _parse_page(payload: Any) -> _PageResult:
-        if isinstance(payload, dict):
-            items = payload.get("items")
-            next_page_id = payload.get("nextPageId")
-            return _PageResult(items=items if isinstance(items, list) else [], next_page_id=next_page_id)
-        return _PageResult(items=[], next_page_id=None)
-
-    def _upsert_media(self, item: dict[str, Any], source: str, is_trashed: bool) -> None:
-        media_key = str(item.get("mediaKey") or "")
-        if not media_key:
-            return
-        row = self.session.get(MediaIndex, {"account_id": self.account.id, "media_key": media_key})
-        if row is None:
-            row = MediaIndex(account_id=self.account.id, media_key=media_key)
-            self.session.add(row)
-
-        row.dedup_key = item.get("dedupKey") or row.dedup_key
-        row.timestamp_taken = item.get("timestamp") or row.timestamp_taken
-        row.timestamp_uploaded = item.get("creationTimestamp") or row.timestamp_uploaded
-        row.timezone_offset = item.get("timezoneOffset") or row.timezone_offset
-        row.thumb_url = item.get("thumb") or row.thumb_url
-        row.is_archived = bool(item.get("isArchived") or False)
-        row.is_favorite = bool(item.get("isFavorite") or row.is_favorite)
-        row.is_trashed = is_trashed
-        row.source = source
-        row.media_type = _media_type_from_payload(row.file_name, item.get("duration"))
-        row.raw_item = item
-        row.updated_at = utc_now()
+    def _parse_page(operation: str, payload: Any) -> _PageResult:
+        # A missing or undecodable page must fail the refresh: read as an empty last page it would end the source
+        # early, and a short favorites or trash list clears those flags across the whole index.
+        if not isinstance(payload, dict):
+            raise RuntimeError(f"{operation} returned no decodable page")
+        items = payload.get("items")
+        next_page_id = payload.get("nextPageId")
+        if isinstance(items, dict):
+            return _PageResult(items=[], next_page_id=next_page_id, columns=items)
+        return _PageResult(items=items if isinstance(items, list) else [], next_page_id=next_page_id)
 
     @staticmethod
     def _to_item(row: MediaIndex) -> ExplorerItem:
@@ -1,12 +1,26 @@
 from __future__ import annotations
 
-import json
 import re
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from . import jsoncodec
+from .circuit_breaker import circuit_breakers, failure_kind
+from .config import settings
+from .hedging import HedgeCancelled, LatencyWindow, call_key, latency_windows
+from .rate_limit import is_throttle_status, parse_retry_after, rate_limiters, throttle_backoff_seconds
+from .session_cache import session_cache
+
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 @dataclass
@@ -29,17 +43,215 @@ class RpcSession:
         }
 
 
+@dataclass
+class ConnectionStats:
+    requests: int = 0
+    new_connections: int = 0
+    cookie_header_builds: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_new_connection(self) -> None:
+        with self._lock:
+            self.new_connections += 1
+
+    def record_cookie_header_build(self) -> None:
+        with self._lock:
+            self.cookie_header_builds += 1
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(self.requests - self.new_connections, 0),
+                "cookie_header_builds": self.cookie_header_builds,
+            }
+
+
 def cookie_header(cookie_jar: list[dict[str, Any]]) -> str:
     return "; ".join([f"{item.get('name')}={item.get('value')}" for item in cookie_jar if item.get("name")])
 
 
-def _extract_wiz_value(html: str, key: str) -> Optional[str]:
-    escaped = re.escape(key)
-    match = re.search(rf'"{escaped}":"([^\"]+)"', html)
-    if not match:
-        return None
-    value = match.group(1)
-    return value.replace("\\u003d", "=").replace("\\u0026", "&").replace("\\/", "/")
+def _cookie_jar_version(cookie_jar: list[dict[str, Any]]) -> tuple[tuple[Any, Any], ...]:
+    return tuple((item.get("name"), item.get("value")) for item in cookie_jar if item.get("name"))
+
+
+class _PooledAdapter(HTTPAdapter):
+    def __init__(self, stats: ConnectionStats, pool_maxsize: int) -> None:
+        self.stats = stats
+        super().__init__(pool_connections=2, pool_maxsize=pool_maxsize, max_retries=0)
+
+    def init_poolmanager(self, connections: int, maxsize: int, block: bool = False, **pool_kwargs: Any) -> None:
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        stats = self.stats
+
+        class _CountingHTTPConnectionPool(HTTPConnectionPool):
+            def _new_conn(self):  # type: ignore[no-untyped-def]
+                stats.record_new_connection()
+                return super()._new_conn()
+
+        class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            def _new_conn(self):  # type: ignore[no-untyped-def]
+                stats.record_new_connection()
+                return super()._new_conn()
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        self.stats.record_request()
+        return super().send(request, **kwargs)
+
+
+def _pooled_http_session(stats: ConnectionStats, pool_maxsize: int) -> requests.Session:
+    http = requests.Session()
+    # Cookies come from the stored jar only; never let Set-Cookie responses leak into later requests.
+    http.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    http.headers.update({"Accept-Encoding": "gzip, deflate"})
+    adapter = _PooledAdapter(stats, pool_maxsize=pool_maxsize)
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+    return http
+
+
+_WIZ_FIELDS = {
+    b"oPEP7c": "account",
+    b"FdrFJe": "f_sid",
+    b"cfb2h": "bl",
+    b"eptZe": "path",
+    b"SNlM0e": "at",
+    b"Dbw5Ud": "rapt",
+}
+_WIZ_REQUIRED = frozenset({"f_sid", "bl", "at"})
+_WIZ_PATTERN = re.compile(rb'"(' + b"|".join(_WIZ_FIELDS) + rb')":"([^"]+)"')
+_WIZ_SCRIPT_START = b"WIZ_global_data"
+_WIZ_SCRIPT_END = b"</script>"
+# Bytes carried between chunks so a key/value pair split across a chunk boundary is still matched.
+_WIZ_CARRY_BYTES = 4096
+
+
+def _unescape_wiz_value(value: bytes) -> str:
+    return value.decode("utf-8", "replace").replace("\\u003d", "=").replace("\\u0026", "&").replace("\\/", "/")
+
+
+class WizValueScanner:
+    # Single-pass scan for the WIZ_global_data session fields over a streamed bootstrap page.
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.bytes_scanned = 0
+        self._carry = b""
+        self._in_wiz = False
+        self._wiz_closed = False
+
+    @property
+    def done(self) -> bool:
+        # Every WIZ key lives in the one WIZ_global_data script; once it closes nothing further can turn up.
+        return len(self.values) == len(_WIZ_FIELDS) or (self._wiz_closed and _WIZ_REQUIRED <= self.values.keys())
+
+    def feed(self, chunk: bytes) -> bool:
+        self.bytes_scanned += len(chunk)
+        buffer = self._carry + chunk
+        for match in _WIZ_PATTERN.finditer(buffer):
+            field_name = _WIZ_FIELDS[match.group(1)]
+            if field_name not in self.values:
+                self.values[field_name] = _unescape_wiz_value(match.group(2))
+
+        if not self._in_wiz:
+            start = buffer.find(_WIZ_SCRIPT_START)
+            if start >= 0:
+                self._in_wiz = True
+                buffer = buffer[start:]
+        if self._in_wiz and not self._wiz_closed and buffer.find(_WIZ_SCRIPT_END) >= 0:
+            self._wiz_closed = True
+
+        self._carry = buffer[-_WIZ_CARRY_BYTES:]
+        return self.done
+
+    def session(self) -> dict[str, Any]:
+        values = self.values
+        session = RpcSession(
+            account=values.get("account"),
+            f_sid=values.get("f_sid") or "",
+            bl=values.get("bl") or "",
+            path=values.get("path") or "/_/PhotosUi/",
+            at=values.get("at") or "",
+            rapt=values.get("rapt"),
+        )
+
+        if not session.f_sid or not session.bl or not session.at:
+            raise RuntimeError("Unable to extract required session fields (f.sid/bl/at)")
+
+        return session.as_dict()
+
+
+def session_from_html(html: str) -> dict[str, Any]:
+    scanner = WizValueScanner()
+    scanner.feed(html.encode("utf-8"))
+    return scanner.session()
+
+
+def session_from_chunks(chunks: Iterable[bytes]) -> dict[str, Any]:
+    scanner = WizValueScanner()
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    return scanner.session()
+
+
+def single_envelope(rpcid: str, request_data: Any) -> list[list[Any]]:
+    return [[rpcid, jsoncodec.dumps(request_data), None, "generic"]]
+
+
+def batch_envelopes(calls: list[tuple[str, Any]]) -> list[list[Any]]:
+    return [[rpcid, jsoncodec.dumps(request_data), None, str(index)] for index, (rpcid, request_data) in enumerate(calls, start=1)]
+
+
+def build_batchexecute_request(
+    session_state: dict[str, Any],
+    envelopes: list[list[Any]],
+    source_path: str,
+) -> tuple[str, str]:
+    f_sid = session_state.get("fSid")
+    bl = session_state.get("bl")
+    path = session_state.get("path")
+    at = session_state.get("at")
+    rapt = session_state.get("rapt")
+
+    if not all([f_sid, bl, path, at]):
+        raise RuntimeError("session state missing fSid/bl/path/at")
+
+    wrapped_data = [envelopes]
+    body = f"f.req={requests.utils.quote(jsoncodec.dumps(wrapped_data))}&at={requests.utils.quote(str(at))}&"
+
+    params: dict[str, str] = {
+        "rpcids": ",".join(dict.fromkeys(str(envelope[0]) for envelope in envelopes)),
+        "source-path": source_path,
+        "f.sid": str(f_sid),
+        "bl": str(bl),
+        "pageId": "none",
+        "rt": "c",
+    }
+    if rapt:
+        params["rapt"] = str(rapt)
+
+    query = "&".join([f"{k}={requests.utils.quote(v)}" for k, v in params.items()])
+    return f"https://photos.google.com{path}data/batchexecute?{query}", body
+
+
+def batch_results(frames: dict[str, Any], count: int, allow_missing: bool = False) -> list[Any]:
+    # Like single_result, a call without a payload fails the request (and so gets retried) instead of reading as empty.
+    # With allow_missing, calls the server rejected ("er" or empty frames) come back as None and the rest are kept.
+    results = [frames.get(str(index)) for index in range(1, count + 1)]
+    missing = [str(index) for index, payload in enumerate(results, start=1) if payload is None]
+    if missing and not allow_missing:
+        raise RuntimeError(f"Missing payload in wrb.fr envelope {', '.join(missing)} of {count}")
+    return results
 
 
 def parse_wrb_payload(response_body: str) -> Any:
@@ -53,11 +265,87 @@ def parse_wrb_payload(response_body: str) -> Any:
     if not json_line:
         raise RuntimeError("No wrb.fr envelope found")
 
-    parsed = json.loads(json_line)
+    parsed = jsoncodec.loads(json_line)
     payload = parsed[0][2] if parsed and parsed[0] and len(parsed[0]) > 2 else None
     if not payload:
         raise RuntimeError("Missing payload in wrb.fr envelope")
-    return json.loads(payload)
+    return jsoncodec.loads(payload)
+
+
+def _decode_wrb_line(line: bytes | bytearray) -> list[tuple[str, Any]]:
+    if line.find(b"wrb.fr", 0, 64) < 0:
+        return []
+    frames: list[tuple[str, Any]] = []
+    for entry in jsoncodec.loads(line):
+        if not isinstance(entry, list) or not entry or entry[0] != "wrb.fr":
+            continue
+        identifier = str(entry[6]) if len(entry) > 6 and entry[6] is not None else "generic"
+        payload = entry[2] if len(entry) > 2 else None
+        frames.append((identifier, jsoncodec.loads(payload) if payload else None))
+    return frames
+
+
+class WrbFrameDecoder:
+    # rt=c bodies are ")]}'" followed by "<length>\n<json chunk>\n" records. Lengths count UTF-16 units,
+    # so records are split on newlines (JSON chunks never contain raw newlines) instead of byte offsets.
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self.bytes_received = 0
+
+    def feed(self, chunk: bytes) -> list[tuple[str, Any]]:
+        self.bytes_received += len(chunk)
+        self._buffer += chunk
+        frames: list[tuple[str, Any]] = []
+        start = 0
+        while True:
+            end = self._buffer.find(b"\n", start)
+            if end < 0:
+                break
+            if end > start:
+                frames.extend(_decode_wrb_line(self._buffer[start:end]))
+            start = end + 1
+        if start:
+            del self._buffer[:start]
+        return frames
+
+    def close(self) -> list[tuple[str, Any]]:
+        remainder = self._buffer
+        self._buffer = bytearray()
+        return _decode_wrb_line(remainder) if remainder.strip() else []
+
+    def finish(self, frames: dict[str, Any]) -> dict[str, Any]:
+        frames.update(self.close())
+        if not self.bytes_received:
+            raise RuntimeError("Empty response body")
+        if not frames:
+            raise RuntimeError("No wrb.fr envelope found")
+        return frames
+
+
+def iter_wrb_frames(chunks: Iterable[bytes]) -> Iterator[tuple[str, Any]]:
+    decoder = WrbFrameDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
+
+
+def collect_wrb_frames(chunks: Iterable[bytes]) -> dict[str, Any]:
+    decoder = WrbFrameDecoder()
+    frames: dict[str, Any] = {}
+    for chunk in chunks:
+        frames.update(decoder.feed(chunk))
+    return decoder.finish(frames)
+
+
+def single_result(frames: dict[str, Any]) -> Any:
+    payload = frames.get("generic")
+    if payload is None:
+        raise RuntimeError("Missing payload in wrb.fr envelope")
+    return payload
+
+
+def parse_wrb_frames(response_body: str) -> dict[str, Any]:
+    return collect_wrb_frames([response_body.encode("utf-8")])
 
 
 class GPhotosRpcClient:
@@ -67,38 +355,87 @@ class GPhotosRpcClient:
         max_retries: int = 3,
         retry_base_delay_ms: int = 1500,
         timeout_seconds: int = 120,
+        pool_maxsize: int = 10,
+        account_key: Optional[str] = None,
     ) -> None:
-        self.cookie_jar = cookie_jar
         self.max_retries = max_retries
         self.retry_base_delay_ms = retry_base_delay_ms
         self.timeout_seconds = timeout_seconds
+        self.account_key = account_key
+        self.limiter = rate_limiters.get(account_key) if account_key else None
+        self.breaker = circuit_breakers.get(account_key) if account_key else None
+        self.stats = ConnectionStats()
+        self.http = _pooled_http_session(self.stats, pool_maxsize=pool_maxsize)
+        self.pool_maxsize = pool_maxsize
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_lock = threading.Lock()
+        self.cookie_jar: list[dict[str, Any]] = []
+        self._cookie_version: Optional[tuple[tuple[Any, Any], ...]] = None
+        self._cookie_header = ""
+        self.set_cookie_jar(cookie_jar)
+
+    def set_cookie_jar(self, cookie_jar: list[dict[str, Any]]) -> None:
+        # Callers served from the credential cache hand back the very same list, which needs no re-check.
+        if cookie_jar is self.cookie_jar:
+            return
+        version = _cookie_jar_version(cookie_jar)
+        self.cookie_jar = cookie_jar
+        if version == self._cookie_version:
+            return
+        self._cookie_version = version
+        self._cookie_header = cookie_header(cookie_jar)
+        self.stats.record_cookie_header_build()
+
+    def close(self) -> None:
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False, cancel_futures=True)
+        self.http.close()
 
     def bootstrap_session(self, source_path: str = "/") -> dict[str, Any]:
         if not self.cookie_jar:
             raise RuntimeError("cookie jar is empty")
 
-        response = requests.get(
+        # Stop reading as soon as the session fields are in; the rest of the page is never downloaded.
+        with self.http.get(
             f"https://photos.google.com{source_path}",
-            headers={"Cookie": cookie_header(self.cookie_jar)},
+            headers={"Cookie": self._cookie_header},
             timeout=60,
             allow_redirects=True,
-        )
-        response.raise_for_status()
-        html = response.text
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            return session_from_chunks(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
 
-        session = RpcSession(
-            account=_extract_wiz_value(html, "oPEP7c"),
-            f_sid=_extract_wiz_value(html, "FdrFJe") or "",
-            bl=_extract_wiz_value(html, "cfb2h") or "",
-            path=_extract_wiz_value(html, "eptZe") or "/_/PhotosUi/",
-            at=_extract_wiz_value(html, "SNlM0e") or "",
-            rapt=_extract_wiz_value(html, "Dbw5Ud"),
+    def refresh_session_state(
+        self,
+        source_path: str = "/",
+        stale_state: Optional[dict[str, Any]] = None,
+        force: bool = False,
+    ) -> dict[str, Any]:
+        if not self.account_key:
+            return self.bootstrap_session(source_path)
+        if self.breaker is not None:
+            self.breaker.check()
+        return session_cache.bootstrap(
+            self.account_key,
+            lambda: self._guarded_bootstrap(source_path),
+            stale_state=stale_state,
+            force=force,
         )
 
-        if not session.f_sid or not session.bl or not session.at:
-            raise RuntimeError("Unable to extract required session fields (f.sid/bl/at)")
-
-        return session.as_dict()
+    def _guarded_bootstrap(self, source_path: str) -> dict[str, Any]:
+        try:
+            return self.bootstrap_session(source_path)
+        except requests.HTTPError as exc:
+            kind = failure_kind(exc.response.status_code) if exc.response is not None else None
+            if self.breaker is not None and kind:
+                self.breaker.record_failure(kind)
+            raise
+        except RuntimeError:
+            # No session fields in the page means the cookies were bounced to the sign-in page.
+            if self.breaker is not None:
+                self.breaker.record_failure("auth")
+            raise
 
     def execute_rpc(
         self,
@@ -106,75 +443,232 @@ class GPhotosRpcClient:
         rpcid: str,
         request_data: Any,
         source_path: str = "/",
+        hedge: bool = False,
     ) -> dict[str, Any]:
         if not rpcid:
             raise ValueError("rpcid is required")
+        return self._with_retries(
+            session_state,
+            source_path,
+            lambda current_session, cancel: self._execute_once(current_session, rpcid, request_data, source_path, cancel),
+            window=self._latency_window([rpcid]) if hedge else None,
+        )
+
+    def execute_batch(
+        self,
+        session_state: dict[str, Any],
+        calls: list[tuple[str, Any]],
+        source_path: str = "/",
+        hedge: bool = False,
+        allow_missing: bool = False,
+    ) -> dict[str, Any]:
+        if not calls:
+            raise ValueError("calls must not be empty")
+        if not all(rpcid for rpcid, _ in calls):
+            raise ValueError("rpcid is required for every batched call")
+        return self._with_retries(
+            session_state,
+            source_path,
+            lambda current_session, cancel: self._execute_batch_once(current_session, calls, source_path, cancel, allow_missing),
+            window=self._latency_window([rpcid for rpcid, _ in calls]) if hedge else None,
+        )
 
+    def _latency_window(self, rpcids: list[str]) -> LatencyWindow:
+        return latency_windows.get(self.account_key or "", call_key(rpcids))
+
+    def _with_retries(
+        self,
+        session_state: dict[str, Any],
+        source_path: str,
+        send: Callable[[dict[str, Any], Optional[threading.Event]], Any],
+        window: Optional[LatencyWindow] = None,
+    ) -> dict[str, Any]:
         current_session = dict(session_state)
+        if self.breaker is not None:
+            self.breaker.before_call()
 
         for attempt in range(1, self.max_retries + 1):
+            delay = (self.retry_base_delay_ms * attempt) / 1000.0
+            if self.limiter is not None:
+                self.limiter.acquire()
             try:
-                data = self._execute_once(current_session, rpcid, request_data, source_path)
+                data = self._send(send, current_session, window)
+                if self.limiter is not None:
+                    self.limiter.on_success()
+                if self.breaker is not None:
+                    self.breaker.record_success()
                 return {"data": data, "session": current_session}
             except requests.HTTPError as exc:
                 status = exc.response.status_code if exc.response is not None else 0
+                kind = failure_kind(status)
+                if self.breaker is not None and kind:
+                    self.breaker.record_failure(kind)
+                if is_throttle_status(status):
+                    retry_after = parse_retry_after(exc.response.headers.get("Retry-After")) if exc.response is not None else None
+                    if self.limiter is not None:
+                        self.limiter.on_throttle(retry_after)
+                    delay = throttle_backoff_seconds(attempt, self.retry_base_delay_ms, retry_after)
+                if self.breaker is not None:
+                    # Stop retrying as soon as this account's circuit opens instead of sleeping through the loop.
+                    self.breaker.check()
                 if status in {401, 403}:
-                    current_session = self.bootstrap_session(source_path)
+                    current_session = self.refresh_session_state(source_path, stale_state=current_session)
                 if attempt >= self.max_retries:
+                    if self.breaker is not None:
+                        self.breaker.record_neutral()
                     raise
             except Exception:
                 if attempt >= self.max_retries:
+                    if self.breaker is not None:
+                        self.breaker.record_neutral()
                     raise
 
-            time.sleep((self.retry_base_delay_ms * attempt) / 1000.0)
+            time.sleep(delay)
 
         raise RuntimeError("RPC failed after retries")
 
+    def _send(
+        self,
+        send: Callable[[dict[str, Any], Optional[threading.Event]], Any],
+        current_session: dict[str, Any],
+        window: Optional[LatencyWindow],
+    ) -> Any:
+        if window is None:
+            return send(current_session, None)
+        started = time.perf_counter()
+        delay = window.hedge_delay()
+        if delay is None:
+            data = send(current_session, None)
+        else:
+            data = self._send_hedged(send, current_session, delay, window)
+        window.record(time.perf_counter() - started)
+        return data
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=self.pool_maxsize, thread_name_prefix="rpc-hedge")
+            return self._hedge_executor
+
+    def _send_hedged(
+        self,
+        send: Callable[[dict[str, Any], Optional[threading.Event]], Any],
+        current_session: dict[str, Any],
+        delay: float,
+        window: LatencyWindow,
+    ) -> Any:
+        pool = self._hedge_pool()
+        primary_cancel = threading.Event()
+        primary = pool.submit(send, current_session, primary_cancel)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+
+        # The duplicate only goes out if the rate budget has a spare token right now; never queue for one.
+        if self.limiter is not None and not self.limiter.try_acquire():
+            return primary.result()
+
+        hedge_cancel = threading.Event()
+        hedge = pool.submit(send, current_session, hedge_cancel)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    (hedge_cancel if future is primary else primary_cancel).set()
+                    window.record_hedge(won=future is hedge)
+                    return future.result()
+        window.record_hedge(won=False)
+        return primary.result()
+
     def _execute_once(
         self,
         session_state: dict[str, Any],
         rpcid: str,
         request_data: Any,
         source_path: str,
+        cancel: Optional[threading.Event] = None,
     ) -> Any:
-        f_sid = session_state.get("fSid")
-        bl = session_state.get("bl")
-        path = session_state.get("path")
-        at = session_state.get("at")
-        rapt = session_state.get("rapt")
-
-        if not all([f_sid, bl, path, at]):
-            raise RuntimeError("session state missing fSid/bl/path/at")
-
-        wrapped_data = [[[rpcid, json.dumps(request_data), None, "generic"]]]
-        body = f"f.req={requests.utils.quote(json.dumps(wrapped_data))}&at={requests.utils.quote(str(at))}&"
-
-        params: dict[str, str] = {
-            "rpcids": rpcid,
-            "source-path": source_path,
-            "f.sid": str(f_sid),
-            "bl": str(bl),
-            "pageId": "none",
-            "rt": "c",
-        }
-        if rapt:
-            params["rapt"] = str(rapt)
+        return single_result(self._post_envelopes(session_state, single_envelope(rpcid, request_data), source_path, cancel))
 
-        query = "&".join([f"{k}={requests.utils.quote(v)}" for k, v in params.items()])
-        url = f"https://photos.google.com{path}data/batchexecute?{query}"
+    def _execute_batch_once(
+        self,
+        session_state: dict[str, Any],
+        calls: list[tuple[str, Any]],
+        source_path: str,
+        cancel: Optional[threading.Event] = None,
+        allow_missing: bool = False,
+    ) -> list[Any]:
+        frames = self._post_envelopes(session_state, batch_envelopes(calls), source_path, cancel)
+        return batch_results(frames, len(calls), allow_missing)
 
-        response = requests.post(
+    def _post_envelopes(
+        self,
+        session_state: dict[str, Any],
+        envelopes: list[list[Any]],
+        source_path: str,
+        cancel: Optional[threading.Event] = None,
+    ) -> dict[str, Any]:
+        url, body = build_batchexecute_request(session_state, envelopes, source_path)
+        with self.http.post(
             url,
             headers={
                 "content-type": "application/x-www-form-urlencoded;charset=UTF-8",
-                "Cookie": cookie_header(self.cookie_jar),
+                "Cookie": self._cookie_header,
             },
             data=body,
             timeout=self.timeout_seconds,
-        )
-        response.raise_for_status()
-
-        if not response.text:
-            raise RuntimeError("Empty response body")
-
-        return parse_wrb_payload(response.text)
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            if cancel is not None:
+                chunks = _until_cancelled(chunks, cancel)
+            return collect_wrb_frames(chunks)
+
+
+def _until_cancelled(chunks: Iterable[bytes], cancel: threading.Event) -> Iterator[bytes]:
+    # Leaving the response context drops the connection, so a losing hedge stops downloading mid-body.
+    for chunk in chunks:
+        if cancel.is_set():
+            raise HedgeCancelled()
+        yield chunk
+
+
+class RpcClientRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients: dict[str, GPhotosRpcClient] = {}
+
+    def get(self, account_key: str, cookie_jar: list[dict[str, Any]]) -> GPhotosRpcClient:
+        with self._lock:
+            client = self._clients.get(account_key)
+            if client is None:
+                client = GPhotosRpcClient(
+                    cookie_jar=cookie_jar,
+                    max_retries=settings.rpc_max_retries,
+                    retry_base_delay_ms=settings.rpc_retry_base_delay_ms,
+                    pool_maxsize=settings.rpc_pool_maxsize,
+                    account_key=account_key,
+                )
+                self._clients[account_key] = client
+            else:
+                client.set_cookie_jar(cookie_jar)
+            return client
+
+    def discard(self, account_key: str) -> None:
+        with self._lock:
+            client = self._clients.pop(account_key, None)
+        if client is not None:
+            client.close()
+
+    def stats(self, account_key: str) -> dict[str, int]:
+        with self._lock:
+            client = self._clients.get(account_key)
+        if client is None:
+            return ConnectionStats().as_dict()
+        return client.stats.as_dict()
+
+
+client_registry = RpcClientRegistry()
@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+from .config import settings
+from .gphotos_rpc import (
+    WizValueScanner,
+    client_registry,
+    WrbFrameDecoder,
+    batch_envelopes,
+    batch_results,
+    build_batchexecute_request,
+    cookie_header,
+    single_envelope,
+    single_result,
+)
+from .circuit_breaker import circuit_breakers, failure_kind
+from .hedging import LatencyWindow, call_key, latency_windows
+from .rate_limit import is_throttle_status, parse_retry_after, rate_limiters, throttle_backoff_seconds
+
+
+class AsyncGPhotosRpcClient:
+    def __init__(
+        self,
+        cookie_jar: list[dict[str, Any]],
+        max_retries: int = 3,
+        retry_base_delay_ms: int = 1500,
+        timeout_seconds: int = 120,
+        max_concurrency: int = 4,
+        pool_maxsize: int = 10,
+        account_key: Optional[str] = None,
+    ) -> None:
+        self.cookie_jar = cookie_jar
+        self.max_retries = max_retries
+        self.retry_base_delay_ms = retry_base_delay_ms
+        self.timeout_seconds = timeout_seconds
+        self.max_concurrency = max(max_concurrency, 1)
+        self.pool_maxsize = pool_maxsize
+        self.account_key = account_key
+        self.limiter = rate_limiters.get(account_key) if account_key else None
+        self.breaker = circuit_breakers.get(account_key) if account_key else None
+        self._cookie_header = cookie_header(cookie_jar)
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def set_cookie_jar(self, cookie_jar: list[dict[str, Any]]) -> None:
+        if cookie_jar == self.cookie_jar:
+            return
+        self.cookie_jar = cookie_jar
+        self._cookie_header = cookie_header(cookie_jar)
+
+    async def __aenter__(self) -> AsyncGPhotosRpcClient:
+        return self
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                headers={"Accept-Encoding": "gzip, deflate"},
+                limits=httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize),
+                follow_redirects=True,
+            )
+            # Cookies come from the stored jar only; never let Set-Cookie responses leak into later requests.
+            self._http.cookies.jar.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        return self._http
+
+    def _slots(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def bootstrap_session(self, source_path: str = "/") -> dict[str, Any]:
+        if not self.cookie_jar:
+            raise RuntimeError("cookie jar is empty")
+
+        scanner = WizValueScanner()
+        async with self._slots():
+            async with self._client().stream(
+                "GET",
+                f"https://photos.google.com{source_path}",
+                headers={"Cookie": self._cookie_header},
+                timeout=60,
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    if scanner.feed(chunk):
+                        break
+        return scanner.session()
+
+    async def refresh_session_state(
+        self,
+        source_path: str = "/",
+        stale_state: Optional[dict[str, Any]] = None,
+        force: bool = False,
+    ) -> dict[str, Any]:
+        if not self.account_key:
+            return await self.bootstrap_session(source_path)
+        # Runs the account's pooled sync client on a helper thread, so async and sync callers share one single-flight
+        # bootstrap in session_cache and adopt persisted state. The fetch must not need this loop: the loop's thread
+        # may itself be waiting on the same cache entry's lock.
+        sync_client = client_registry.get(self.account_key, self.cookie_jar)
+        return await asyncio.to_thread(sync_client.refresh_session_state, source_path, stale_state, force)
+
+    async def execute_rpc(
+        self,
+        session_state: dict[str, Any],
+        rpcid: str,
+        request_data: Any,
+        source_path: str = "/",
+        hedge: bool = False,
+    ) -> dict[str, Any]:
+        if not rpcid:
+            raise ValueError("rpcid is required")
+
+        async def send(current_session: dict[str, Any]) -> Any:
+            frames = await self._post_envelopes(current_session, single_envelope(rpcid, request_data), source_path)
+            return single_result(frames)
+
+        window = latency_windows.get(self.account_key or "", call_key([rpcid])) if hedge else None
+        return await self._with_retries(session_state, source_path, send, window)
+
+    async def execute_batch(
+        self,
+        session_state: dict[str, Any],
+        calls: list[tuple[str, Any]],
+        source_path: str = "/",
+        hedge: bool = False,
+        allow_missing: bool = False,
+    ) -> dict[str, Any]:
+        if not calls:
+            raise ValueError("calls must not be empty")
+        if not all(rpcid for rpcid, _ in calls):
+            raise ValueError("rpcid is required for every batched call")
+
+        async def send(current_session: dict[str, Any]) -> list[Any]:
+            frames = await self._post_envelopes(current_session, batch_envelopes(calls), source_path)
+            return batch_results(frames, len(calls), allow_missing)
+
+        window = latency_windows.get(self.account_key or "", call_key([rpcid for rpcid, _ in calls])) if hedge else None
+        return await self._with_retries(session_state, source_path, send, window)
+
+    async def _with_retries(
+        self,
+        session_state: dict[str, Any],
+        source_path: str,
+        send: Callable[[dict[str, Any]], Awaitable[Any]],
+        window: Optional[LatencyWindow] = None,
+    ) -> dict[str, Any]:
+        current_session = dict(session_state)
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+        for attempt in range(1, self.max_retries + 1):
+            delay = (self.retry_base_delay_ms * attempt) / 1000.0
+            if self.limiter is not None:
+                await self.limiter.acquire_async()
+            try:
+                data = await self._send(send, current_session, window)
+                if self.limiter is not None:
+                    self.limiter.on_success()
+                if self.breaker is not None:
+                    self.breaker.record_success()
+                return {"data": data, "session": current_session}
+            except httpx.HTTPStatusError as exc:
+                status = exc.response.status_code
+                kind = failure_kind(status)
+                if self.breaker is not None and kind:
+                    self.breaker.record_failure(kind)
+                if is_throttle_status(status):
+                    retry_after = parse_retry_after(exc.response.headers.get("Retry-After"))
+                    if self.limiter is not None:
+                        self.limiter.on_throttle(retry_after)
+                    delay = throttle_backoff_seconds(attempt, self.retry_base_delay_ms, retry_after)
+                if self.breaker is not None:
+                    self.breaker.check()
+                if status in {401, 403}:
+                    current_session = await self.refresh_session_state(source_path, stale_state=current_session)
+                if attempt >= self.max_retries:
+                    if self.breaker is not None:
+                        self.breaker.record_neutral()
+                    raise
+            except Exception:
+                if attempt >= self.max_retries:
+                    if self.breaker is not None:
+                        self.breaker.record_neutral()
+                    raise
+
+            await asyncio.sleep(delay)
+
+        raise RuntimeError("RPC failed after retries")
+
+    async def _send(
+        self,
+        send: Callable[[dict[str, Any]], Awaitable[Any]],
+        current_session: dict[str, Any],
+        window: Optional[LatencyWindow],
+    ) -> Any:
+        if window is None:
+            return await send(current_session)
+        started = time.perf_counter()
+        delay = window.hedge_delay()
+        if delay is None:
+            data = await send(current_session)
+        else:
+            data = await self._send_hedged(send, current_session, delay, window)
+        window.record(time.perf_counter() - started)
+        return data
+
+    async def _send_hedged(
+        self,
+        send: Callable[[dict[str, Any]], Awaitable[Any]],
+        current_session: dict[str, Any],
+        delay: float,
+        window: LatencyWindow,
+    ) -> Any:
+        primary = asyncio.ensure_future(send(current_session))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or (self.limiter is not None and not self.limiter.try_acquire()):
+            return await primary
+
+        hedge = asyncio.ensure_future(send(current_session))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        window.record_hedge(won=task is hedge)
+                        return task.result()
+            window.record_hedge(won=False)
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # mark a losing leg's error as retrieved
+
+    async def _post_envelopes(
+        self,
+        session_state: dict[str, Any],
+        envelopes: list[list[Any]],
+        source_path: str,
+    ) -> dict[str, Any]:
+        url, body = build_batchexecute_request(session_state, envelopes, source_path)
+        decoder = WrbFrameDecoder()
+        frames: dict[str, Any] = {}
+        async with self._slots():
+            async with self._client().stream(
+                "POST",
+                url,
+                headers={
+                    "content-type": "application/x-www-form-urlencoded;charset=UTF-8",
+                    "Cookie": self._cookie_header,
+                },
+                content=body,
+                timeout=self.timeout_seconds,
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    frames.update(decoder.feed(chunk))
+        return decoder.finish(frames)
+
+
+class AsyncRpcClientRegistry:
+    # One client per account, so max_concurrency caps that account's in-flight requests across every job. Clients
+    # hold asyncio primitives and must only be used from the event loop that runs async jobs.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients: dict[str, AsyncGPhotosRpcClient] = {}
+
+    def get(self, account_key: str, cookie_jar: list[dict[str, Any]]) -> AsyncGPhotosRpcClient:
+        with self._lock:
+            client = self._clients.get(account_key)
+            if client is None:
+                client = AsyncGPhotosRpcClient(
+                    cookie_jar=cookie_jar,
+                    max_retries=settings.rpc_max_retries,
+                    retry_base_delay_ms=settings.rpc_retry_base_delay_ms,
+                    max_concurrency=settings.rpc_async_max_concurrency,
+                    pool_maxsize=settings.rpc_pool_maxsize,
+                    account_key=account_key,
+                )
+                self._clients[account_key] = client
+            else:
+                client.set_cookie_jar(cookie_jar)
+            return client
+
+    async def aclose(self) -> None:
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+async_client_registry = AsyncRpcClientRegistry()
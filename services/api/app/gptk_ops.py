@@ -3,20 +3,17 @@ from __future__ import annotations
 from typing import Any
 
 from .adapters.gptk_methods import METHODS, resolve_method
+from .config import settings
 from .gphotos_rpc import GPhotosRpcClient
-from .gptk_parser import parse_response
+from .gphotos_rpc_async import AsyncGPhotosRpcClient
+from .gptk_parser import check_fields, parse_response
 
 
 def list_operations() -> list[str]:
     return sorted([f"gptk.{name}" for name in METHODS])
 
 
-def execute_operation(
-    client: GPhotosRpcClient,
-    operation: str,
-    params: dict[str, Any],
-    session_state: dict[str, Any],
-) -> dict[str, Any]:
+def _resolve_request(operation: str, params: dict[str, Any]) -> tuple[str, Any, str]:
     normalized = operation.replace("gptk.", "")
 
     if normalized == "rpc_execute":
@@ -27,26 +24,115 @@ def execute_operation(
             raise ValueError("rpcid is required for gptk.rpc_execute")
         if request_data is None:
             raise ValueError("requestData is required for gptk.rpc_execute")
-    else:
-        method = resolve_method(normalized)
-        rpcid = method.rpcid
-        request_data = method.request_builder(params)
-        source_path = params.get("sourcePath", method.source_path_hint)
+        check_fields(str(rpcid), params.get("fields"))
+        return str(rpcid), request_data, source_path
+
+    method = resolve_method(normalized)
+    check_fields(method.rpcid, params.get("fields"))
+    return method.rpcid, method.request_builder(params), params.get("sourcePath", method.source_path_hint)
+
+
+def parse_result(rpcid: str, raw: Any, params: dict[str, Any]) -> Any:
+    return parse_response(
+        rpcid, raw, params.get("fields"), lazy=bool(params.get("lazy")), columnar=bool(params.get("columnar"))
+    )
+
+
+def _hedgeable(operation: str) -> bool:
+    normalized = operation.replace("gptk.", "")
+    if not settings.rpc_hedge_enabled or normalized == "rpc_execute":
+        return False
+    return resolve_method(normalized).read_only
+
+
+def execute_operation(
+    client: GPhotosRpcClient,
+    operation: str,
+    params: dict[str, Any],
+    session_state: dict[str, Any],
+) -> dict[str, Any]:
+    rpcid, request_data, source_path = _resolve_request(operation, params)
 
     current_session = dict(session_state)
     if params.get("forceBootstrap") or not current_session.get("fSid"):
-        current_session = client.bootstrap_session(source_path)
+        current_session = client.refresh_session_state(
+            source_path, stale_state=current_session, force=bool(params.get("forceBootstrap"))
+        )
 
     rpc_result = client.execute_rpc(
         session_state=current_session,
         rpcid=rpcid,
         request_data=request_data,
         source_path=source_path,
+        hedge=_hedgeable(operation),
+    )
+
+    return {
+        "rpcid": rpcid,
+        "data": parse_result(rpcid, rpc_result.get("data"), params),
+        "raw_data": rpc_result.get("data"),
+        "session_state": rpc_result.get("session") or current_session,
+    }
+
+
+def execute_operations_batch(
+    client: GPhotosRpcClient,
+    calls: list[tuple[str, dict[str, Any]]],
+    session_state: dict[str, Any],
+) -> dict[str, Any]:
+    resolved = [_resolve_request(operation, params) for operation, params in calls]
+    source_paths = {source_path for _, _, source_path in resolved}
+    if len(source_paths) > 1:
+        raise ValueError("Batched operations must share the same sourcePath")
+    source_path = source_paths.pop()
+
+    current_session = dict(session_state)
+    force_bootstrap = any(params.get("forceBootstrap") for _, params in calls)
+    if force_bootstrap or not current_session.get("fSid"):
+        current_session = client.refresh_session_state(source_path, stale_state=current_session, force=force_bootstrap)
+
+    rpc_result = client.execute_batch(
+        session_state=current_session,
+        calls=[(rpcid, request_data) for rpcid, request_data, _ in resolved],
+        source_path=source_path,
+        hedge=all(_hedgeable(operation) for operation, _ in calls),
+    )
+
+    results = []
+    for (rpcid, _, _), (_, params), raw in zip(resolved, calls, rpc_result.get("data") or []):
+        results.append({"rpcid": rpcid, "data": parse_result(rpcid, raw, params), "raw_data": raw})
+
+    return {
+        "results": results,
+        "session_state": rpc_result.get("session") or current_session,
+    }
+
+
+async def execute_operation_async(
+    client: AsyncGPhotosRpcClient,
+    operation: str,
+    params: dict[str, Any],
+    session_state: dict[str, Any],
+) -> dict[str, Any]:
+    rpcid, request_data, source_path = _resolve_request(operation, params)
+
+    current_session = dict(session_state)
+    if params.get("forceBootstrap") or not current_session.get("fSid"):
+        current_session = await client.refresh_session_state(
+            source_path, stale_state=current_session, force=bool(params.get("forceBootstrap"))
+        )
+
+    rpc_result = await client.execute_rpc(
+        session_state=current_session,
+        rpcid=rpcid,
+        request_data=request_data,
+        source_path=source_path,
+        hedge=_hedgeable(operation),
     )
 
     return {
         "rpcid": rpcid,
-        "data": parse_response(rpcid, rpc_result.get("data")),
+        "data": parse_result(rpcid, rpc_result.get("data"), params),
         "raw_data": rpc_result.get("data"),
         "session_state": rpc_result.get("session") or current_session,
     }
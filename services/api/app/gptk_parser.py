@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Optional
+from array import array
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
 
 
 def _key(obj: Any, key: Any, default: Any = None) -> Any:
@@ -31,296 +35,495 @@ def _map(items: Any, fn: Callable[[Any], Any]) -> list[Any]:
     return [fn(item) for item in items]
 
 
-def _actor_parse(data: Any) -> dict[str, Any]:
-    return {
-        "actorId": _key(data, 0),
-        "gaiaId": _key(data, 1),
-        "name": _key(_key(data, 11), 0),
-        "gender": _key(_key(data, 11), 2),
-        "profilePhotoUrl": _key(_key(data, 12), 0),
-    }
-
-
-def _library_item_parse(item_data: Any) -> dict[str, Any]:
-    tail = _last(item_data)
-    nested_geo = _key(_key(_key(_key(_key(_key(tail, 129168200), 1), 4), 0), 1), 0)
-    return {
-        "mediaKey": _key(item_data, 0),
-        "timestamp": _key(item_data, 2),
-        "timezoneOffset": _key(item_data, 4),
-        "creationTimestamp": _key(item_data, 5),
-        "dedupKey": _key(item_data, 3),
-        "thumb": _key(_key(item_data, 1), 0),
-        "resWidth": _key(_key(item_data, 1), 1),
-        "resHeight": _key(_key(item_data, 1), 2),
-        "isPartialUpload": _key(_key(item_data, 12), 0) == 20,
-        "isArchived": bool(_key(item_data, 13, False)),
-        "isFavorite": _key(_key(tail, 163238866), 0),
-        "duration": _key(_key(tail, 76647426), 0),
-        "descriptionShort": _key(_key(tail, 396644657), 0),
-        "isLivePhoto": _key(tail, 146008172) is not None,
-        "livePhotoDuration": _key(_key(tail, 146008172), 1),
-        "geoLocation": {
-            "coordinates": _key(_key(_key(tail, 129168200), 1), 0),
-            "name": _key(nested_geo, 0),
-        },
-    }
-
-
-def _locked_folder_item_parse(item_data: Any) -> dict[str, Any]:
-    tail = _last(item_data)
-    return {
-        "mediaKey": _key(item_data, 0),
-        "timestamp": _key(item_data, 2),
-        "creationTimestamp": _key(item_data, 5),
-        "dedupKey": _key(item_data, 3),
-        "duration": _key(_key(tail, 76647426), 0),
-    }
-
-
-def _album_parse(item_data: Any) -> dict[str, Any]:
-    tail = _last(item_data)
-    meta = _key(tail, 72930366)
-    return {
-        "mediaKey": _key(item_data, 0),
-        "ownerActorId": _key(_key(item_data, 6), 0),
-        "title": _key(meta, 1),
-        "thumb": _key(_key(item_data, 1), 0),
-        "itemCount": _key(meta, 3),
-        "creationTimestamp": _key(_key(meta, 2), 4),
-        "modifiedTimestamp": _key(_key(meta, 2), 9),
-        "timestampRange": [_key(_key(meta, 2), 5), _key(_key(meta, 2), 6)],
-        "isShared": bool(_key(meta, 4, False)),
-    }
-
-
-def _album_item_parse(item_data: Any) -> dict[str, Any]:
-    tail = _last(item_data)
-    return {
-        "mediaKey": _key(item_data, 0),
-        "thumb": _key(_key(item_data, 1), 0),
-        "resWidth": _key(_key(item_data, 1), 1),
-        "resHeight": _key(_key(item_data, 1), 2),
-        "timestamp": _key(item_data, 2),
-        "timezoneOffset": _key(item_data, 4),
-        "creationTimestamp": _key(item_data, 5),
-        "dedupKey": _key(item_data, 3),
-        "isLivePhoto": _key(tail, 146008172) is not None,
-        "livePhotoDuration": _key(_key(tail, 146008172), 1),
-        "duration": _key(_key(tail, 76647426), 0),
-    }
-
-
-def _trash_item_parse(item_data: Any) -> dict[str, Any]:
-    tail = _last(item_data)
-    return {
-        "mediaKey": _key(item_data, 0),
-        "thumb": _key(_key(item_data, 1), 0),
-        "resWidth": _key(_key(item_data, 1), 1),
-        "resHeight": _key(_key(item_data, 1), 2),
-        "timestamp": _key(item_data, 2),
-        "timezoneOffset": _key(item_data, 4),
-        "creationTimestamp": _key(item_data, 5),
-        "dedupKey": _key(item_data, 3),
-        "duration": _key(_key(tail, 76647426), 0),
-    }
-
-
-def _bulk_media_info_item_parse(item_data: Any) -> dict[str, Any]:
-    info = _key(item_data, 1)
-    tail = _last(info)
-    takes_up_space = _key(tail, 0)
-    orig_quality = _key(tail, 2)
-    return {
-        "mediaKey": _key(item_data, 0),
-        "descriptionFull": _key(info, 2),
-        "fileName": _key(info, 3),
-        "timestamp": _key(info, 6),
-        "timezoneOffset": _key(info, 7),
-        "creationTimestamp": _key(info, 8),
-        "size": _key(info, 9),
-        "takesUpSpace": None if takes_up_space is None else takes_up_space == 1,
-        "spaceTaken": _key(tail, 1),
-        "isOriginalQuality": None if orig_quality is None else orig_quality == 2,
-    }
-
-
-def _library_timeline_page(data: Any) -> dict[str, Any]:
-    return {
-        "items": _map(_key(data, 0), _library_item_parse),
-        "nextPageId": _key(data, 1),
-        "lastItemTimestamp": int(_key(data, 2, 0) or 0),
-    }
-
-
-def _library_generic_page(data: Any) -> dict[str, Any]:
-    return {
-        "items": _map(_key(data, 0), _library_item_parse),
-        "nextPageId": _key(data, 1),
-    }
-
-
-def _locked_folder_page(data: Any) -> dict[str, Any]:
-    return {
-        "nextPageId": _key(data, 0),
-        "items": _map(_key(data, 1), _locked_folder_item_parse),
-    }
-
-
-def _links_page(data: Any) -> dict[str, Any]:
-    return {
-        "items": _map(
-            _key(data, 0),
-            lambda item: {"mediaKey": _key(item, 6), "linkId": _key(item, 17), "itemCount": _key(item, 3)},
-        ),
-        "nextPageId": _key(data, 1),
-    }
-
-
-def _albums_page(data: Any) -> dict[str, Any]:
-    return {
-        "items": _map(_key(data, 0), _album_parse),
-        "nextPageId": _key(data, 1),
-    }
-
-
-def _album_items_page(data: Any) -> dict[str, Any]:
-    meta = _key(data, 3)
-    return {
-        "items": _map(_key(data, 1), _album_item_parse),
-        "nextPageId": _key(data, 2),
-        "mediaKey": _key(meta, 0),
-        "title": _key(meta, 1),
-        "owner": _actor_parse(_key(meta, 5)),
-        "itemCount": _key(meta, 21),
-        "authKey": _key(meta, 19),
-        "members": _map(_key(meta, 9), _actor_parse),
-    }
-
-
-def _partner_shared_items_page(data: Any) -> dict[str, Any]:
-    return {
-        "nextPageId": _key(data, 0),
-        "items": _map(_key(data, 1), _album_item_parse),
-        "members": _map(_key(data, 2), _actor_parse),
-        "partnerActorId": _key(data, 4),
-        "gaiaId": _key(data, 5),
-    }
-
-
-def _trash_page(data: Any) -> dict[str, Any]:
-    return {
-        "items": _map(_key(data, 0), _trash_item_parse),
-        "nextPageId": _key(data, 1),
-    }
-
-
-def _item_info(data: Any) -> dict[str, Any]:
-    media = _key(data, 0)
-    meta = _key(media, 15)
-    return {
-        "mediaKey": _key(media, 0),
-        "dedupKey": _key(media, 3),
-        "timestamp": _key(media, 2),
-        "timezoneOffset": _key(media, 4),
-        "creationTimestamp": _key(media, 5),
-        "downloadUrl": _key(data, 1),
-        "downloadOriginalUrl": _key(data, 7),
-        "isArchived": _key(media, 13),
-        "isFavorite": _key(_key(meta, 163238866), 0),
-        "duration": _key(_key(meta, 76647426), 0),
-        "descriptionFull": _key(data, 10),
-        "thumb": _key(data, 12),
-    }
-
-
-def _item_info_ext(data: Any) -> dict[str, Any]:
-    item0 = _key(data, 0)
-    owner = _actor_parse(_key(_key(_key(item0, 27), 4), 0) or _key(item0, 28))
-    return {
-        "mediaKey": _key(item0, 0),
-        "dedupKey": _key(item0, 11),
-        "descriptionFull": _key(item0, 1),
-        "fileName": _key(item0, 2),
-        "timestamp": _key(item0, 3),
-        "timezoneOffset": _key(item0, 4),
-        "size": _key(item0, 5),
-        "resWidth": _key(item0, 6),
-        "resHeight": _key(item0, 7),
-        "albums": _map(_key(item0, 19), _album_parse),
-        "owner": owner,
-        "other": _key(item0, 31),
-    }
-
-
-def _bulk_media_info(data: Any) -> list[dict[str, Any]]:
-    return _map(data, _bulk_media_info_item_parse)
-
-
-def _download_token_check(data: Any) -> dict[str, Any]:
-    node = _key(_key(_key(_key(_key(data, 0), 0), 0), 2), 0)
-    return {
-        "fileName": _key(node, 0),
-        "downloadUrl": _key(node, 1),
-        "downloadSize": _key(node, 2),
-        "unzippedSize": _key(node, 3),
-    }
-
-
-def _storage_quota(data: Any) -> dict[str, Any]:
-    q = _key(data, 6)
-    return {
-        "totalUsed": _key(q, 0),
-        "totalAvailable": _key(q, 1),
-        "usedByGPhotos": _key(q, 3),
-    }
-
-
-def _remote_matches(data: Any) -> list[dict[str, Any]]:
-    rows = _key(data, 0)
-
-    def parse_row(row: Any) -> dict[str, Any]:
-        item = _key(row, 1)
-        return {
-            "hash": _key(row, 0),
-            "mediaKey": _key(item, 0),
-            "thumb": _key(_key(item, 1), 0),
-            "resWidth": _key(_key(item, 1), 1),
-            "resHeight": _key(_key(item, 1), 2),
-            "timestamp": _key(item, 2),
-            "dedupKey": _key(item, 3),
-            "timezoneOffset": _key(item, 4),
-            "creationTimestamp": _key(item, 5),
-        }
-
-    return _map(rows, parse_row)
-
-
-PARSER_REGISTRY: dict[str, Callable[[Any], Any]] = {
-    "lcxiM": _library_timeline_page,
-    "EzkLib": _library_generic_page,
-    "nMFwOc": _locked_folder_page,
-    "F2A0H": _links_page,
-    "Z5xsfc": _albums_page,
-    "snAcKc": _album_items_page,
-    "e9T5je": _partner_shared_items_page,
-    "zy0IHe": _trash_page,
-    "VrseUb": _item_info,
-    "fDcn4b": _item_info_ext,
-    "EWgK9e": _bulk_media_info,
-    "dnv2s": _download_token_check,
-    "EzwWhf": _storage_quota,
-    "swbisb": _remote_matches,
+# Field specs: each parser is declared as a mapping of output name -> index path into the RPC payload,
+# then compiled once into a straight-line function that walks every shared path prefix a single time.
+
+
+class _Last:
+    def __repr__(self) -> str:
+        return "LAST"
+
+
+# Path step for the trailing element of a list (the extension map GPTK calls the item "tail").
+LAST = _Last()
+
+
+@dataclass(frozen=True)
+class At:
+    keys: tuple[Any, ...]
+    default: Any = None
+    then: Optional[Callable[[Any], Any]] = None
+
+
+@dataclass(frozen=True)
+class Each:
+    keys: tuple[Any, ...]
+    spec: "FieldSpec"
+
+
+@dataclass(frozen=True)
+class One:
+    keys: tuple[Any, ...]
+    spec: "FieldSpec"
+    # Path used when the primary one resolves to a falsy value.
+    alt: Optional[tuple[Any, ...]] = None
+
+
+# A dict spec builds an object, a list spec builds a list, anything else is a single node.
+FieldSpec = Union[dict[str, Any], list[Any], At, Each, One]
+
+
+def at(*keys: Any, default: Any = None, then: Optional[Callable[[Any], Any]] = None) -> At:
+    return At(keys=keys, default=default, then=then)
+
+
+def each(*keys: Any, spec: FieldSpec) -> Each:
+    return Each(keys=keys, spec=spec)
+
+
+def one(*keys: Any, spec: FieldSpec, alt: Optional[tuple[Any, ...]] = None) -> One:
+    return One(keys=keys, spec=spec, alt=alt)
+
+
+def _projection(fields: Iterable[str]) -> dict[str, Optional[frozenset[str]]]:
+    # "items.mediaKey" keeps only mediaKey inside items; a bare "items" keeps all of it.
+    grouped: dict[str, Optional[set[str]]] = {}
+    for name in fields:
+        head, _, rest = name.partition(".")
+        if not rest or (head in grouped and grouped[head] is None):
+            grouped[head] = None
+        else:
+            grouped.setdefault(head, set()).add(rest)  # type: ignore[union-attr]
+    return {head: None if rest is None else frozenset(rest) for head, rest in grouped.items()}
+
+
+def _select(spec: dict[str, Any], fields: Optional[frozenset[str]], name: str) -> list[tuple[str, Any, Optional[frozenset[str]]]]:
+    if fields is None:
+        return [(field_name, child, None) for field_name, child in spec.items()]
+    projection = _projection(fields)
+    unknown = sorted(set(projection) - set(spec))
+    if unknown:
+        raise ValueError(f"{name} has no field(s): {', '.join(unknown)}")
+    return [(field_name, child, projection[field_name]) for field_name, child in spec.items() if field_name in projection]
+
+
+def _pack(column: list[Any]) -> Any:
+    # Fully populated integer columns become array('q'); columns with gaps or mixed types stay lists.
+    if column and all(value.__class__ is int for value in column):
+        try:
+            return array("q", column)
+        except OverflowError:
+            return column
+    return column
+
+
+class ItemView(Mapping):
+    """Read-only mapping over one raw item; each field is decoded from the nested list when it is read."""
+
+    __slots__ = ("_raw",)
+    _fields: dict[str, Callable[[Any], Any]] = {}
+
+    def __init__(self, raw: Any) -> None:
+        self._raw = raw
+
+    def __getitem__(self, name: str) -> Any:
+        return self._fields[name](self._raw)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._fields
+
+    def get(self, name: str, default: Any = None) -> Any:
+        extract = self._fields.get(name)
+        return default if extract is None else extract(self._raw)
+
+    def to_dict(self) -> dict[str, Any]:
+        raw = self._raw
+        return {name: extract(raw) for name, extract in self._fields.items()}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def item_view(spec: dict[str, Any], fields: Optional[Iterable[str]] = None, *, name: str = "spec") -> type[ItemView]:
+    selected = _select(spec, None if fields is None else frozenset(fields), name)
+    extractors = {field_name: compile_spec(child, sub, name=f"{name}.{field_name}") for field_name, child, sub in selected}
+    return type(f"{name.replace('[]', '')}View", (ItemView,), {"__slots__": (), "__module__": __name__, "_fields": extractors})
+
+
+class _SpecCompiler:
+    def __init__(self, name: str, lazy: bool = False, columnar: bool = False) -> None:
+        self.name = name
+        self.lazy = lazy
+        self.columnar = columnar
+        self.lines: list[str] = []
+        self.indent = "    "
+        self.paths: dict[tuple[Any, ...], str] = {(): "d"}
+        self.namespace: dict[str, Any] = {"_key": _key, "_last": _last, "_map": _map, "_pack": _pack}
+
+    def _bind(self, value: Any) -> str:
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def _step(self, parent: str, key: Any) -> str:
+        if key is LAST:
+            return f"({parent}[-1] if {parent} else None) if {parent}.__class__ is list else _last({parent})"
+        if isinstance(key, int) and not isinstance(key, bool) and key >= 0:
+            return (
+                f"None if {parent} is None"
+                f" else ({parent}[{key}] if len({parent}) > {key} else None) if {parent}.__class__ is list"
+                f" else ({parent}[{key}] if {key} in {parent} else {parent}.get({str(key)!r})) if {parent}.__class__ is dict"
+                f" else _key({parent}, {key})"
+            )
+        return f"_key({parent}, {self._bind(key)})"
+
+    def _path(self, keys: tuple[Any, ...]) -> str:
+        if keys in self.paths:
+            return self.paths[keys]
+        parent = self._path(keys[:-1])
+        var = f"v{len(self.paths)}"
+        self.lines.append(f"{self.indent}{var} = {self._step(parent, keys[-1])}")
+        self.paths[keys] = var
+        return var
+
+    def _expr(self, node: FieldSpec, fields: Optional[frozenset[str]]) -> str:
+        if isinstance(node, dict):
+            entries = [f"{name!r}: {self._expr(child, sub)}" for name, child, sub in _select(node, fields, self.name)]
+            return "{" + ", ".join(entries) + "}"
+        if isinstance(node, list):
+            if fields is not None:
+                raise ValueError(f"{self.name} cannot project a positional list")
+            return "[" + ", ".join(self._expr(child, None) for child in node) + "]"
+        if isinstance(node, At):
+            if fields is not None:
+                raise ValueError(f"{self.name} cannot project into a scalar field")
+            if node.default is None:
+                value = self._path(node.keys)
+            elif node.keys:
+                value = f"_key({self._path(node.keys[:-1])}, {self._bind(node.keys[-1])}, {self._bind(node.default)})"
+            else:
+                value = f"(d if d is not None else {self._bind(node.default)})"
+            return value if node.then is None else f"{self._bind(node.then)}({value})"
+        if isinstance(node, Each):
+            if self.columnar and isinstance(node.spec, dict):
+                fn = self._bind(_SpecCompiler(f"{self.name}[]").build_columns(node.spec, fields))
+                return f"{fn}({self._path(node.keys)})"
+            if self.lazy and isinstance(node.spec, dict):
+                fn = self._bind(item_view(node.spec, fields, name=f"{self.name}[]"))
+            else:
+                fn = self._bind(compile_spec(node.spec, fields, name=f"{self.name}[]", lazy=self.lazy))
+            var = self._path(node.keys)
+            return f"[{fn}(x) for x in {var}] if {var}.__class__ is list else _map({var}, {fn})"
+        if isinstance(node, One):
+            fn = self._bind(compile_spec(node.spec, fields, name=self.name, lazy=self.lazy))
+            value = self._path(node.keys)
+            if node.alt is not None:
+                value = f"{value} or {self._path(node.alt)}"
+            return f"{fn}({value})"
+        raise TypeError(f"Unsupported field spec node: {node!r}")
+
+    def build(self, spec: FieldSpec, fields: Optional[frozenset[str]]) -> Callable[[Any], Any]:
+        result = self._expr(spec, fields)
+        source = "def extract(d):\n" + "".join(line + "\n" for line in self.lines) + f"    return {result}\n"
+        exec(compile(source, f"<gptk_parser:{self.name}>", "exec"), self.namespace)
+        extract = self.namespace["extract"]
+        extract.__qualname__ = extract.__name__ = f"extract_{self.name}"
+        return extract
+
+    def build_columns(self, spec: dict[str, Any], fields: Optional[frozenset[str]]) -> Callable[[Any], Any]:
+        # One pass over the item list appends every field to its own column; no per-item dict is built.
+        self.paths = {(): "x"}
+        self.indent = "        "
+        values = [(name, self._expr(child, sub)) for name, child, sub in _select(spec, fields, self.name)]
+        source = (
+            "def extract(items):\n"
+            "    if not isinstance(items, list):\n"
+            "        items = []\n"
+            + "".join(f"    c{idx} = []\n    a{idx} = c{idx}.append\n" for idx in range(len(values)))
+            + "    for x in items:\n"
+            + "".join(line + "\n" for line in self.lines)
+            + "".join(f"        a{idx}({value})\n" for idx, (_, value) in enumerate(values))
+            + "    return {"
+            + ", ".join(f"{name!r}: _pack(c{idx})" for idx, (name, _) in enumerate(values))
+            + "}\n"
+        )
+        exec(compile(source, f"<gptk_parser:{self.name}:columns>", "exec"), self.namespace)
+        extract = self.namespace["extract"]
+        extract.__qualname__ = extract.__name__ = f"columns_{self.name}"
+        return extract
+
+
+def compile_spec(
+    spec: FieldSpec,
+    fields: Optional[Iterable[str]] = None,
+    *,
+    name: str = "spec",
+    lazy: bool = False,
+    columnar: bool = False,
+) -> Callable[[Any], Any]:
+    # Lazy extractors return an ItemView over each raw list element instead of building its dict.
+    # Columnar extractors return each list of items as {field: column}, with columns in item order.
+    return _SpecCompiler(name, lazy, columnar).build(spec, None if fields is None else frozenset(fields))
+
+
+def _equals(expected: Any) -> Callable[[Any], bool]:
+    return lambda value: value == expected
+
+
+def _equals_or_none(expected: Any) -> Callable[[Any], Optional[bool]]:
+    return lambda value: None if value is None else value == expected
+
+
+def _is_set(value: Any) -> bool:
+    return value is not None
+
+
+def _int_or_zero(value: Any) -> int:
+    return int(value or 0)
+
+
+ACTOR_SPEC: dict[str, Any] = {
+    "actorId": at(0),
+    "gaiaId": at(1),
+    "name": at(11, 0),
+    "gender": at(11, 2),
+    "profilePhotoUrl": at(12, 0),
 }
 
+LIBRARY_ITEM_SPEC: dict[str, Any] = {
+    "mediaKey": at(0),
+    "timestamp": at(2),
+    "timezoneOffset": at(4),
+    "creationTimestamp": at(5),
+    "dedupKey": at(3),
+    "thumb": at(1, 0),
+    "resWidth": at(1, 1),
+    "resHeight": at(1, 2),
+    "isPartialUpload": at(12, 0, then=_equals(20)),
+    "isArchived": at(13, default=False, then=bool),
+    "isFavorite": at(LAST, 163238866, 0),
+    "duration": at(LAST, 76647426, 0),
+    "descriptionShort": at(LAST, 396644657, 0),
+    "isLivePhoto": at(LAST, 146008172, then=_is_set),
+    "livePhotoDuration": at(LAST, 146008172, 1),
+    "geoLocation": {
+        "coordinates": at(LAST, 129168200, 1, 0),
+        "name": at(LAST, 129168200, 1, 4, 0, 1, 0, 0),
+    },
+}
+
+LOCKED_FOLDER_ITEM_SPEC: dict[str, Any] = {
+    "mediaKey": at(0),
+    "timestamp": at(2),
+    "creationTimestamp": at(5),
+    "dedupKey": at(3),
+    "duration": at(LAST, 76647426, 0),
+}
+
+ALBUM_SPEC: dict[str, Any] = {
+    "mediaKey": at(0),
+    "ownerActorId": at(6, 0),
+    "title": at(LAST, 72930366, 1),
+    "thumb": at(1, 0),
+    "itemCount": at(LAST, 72930366, 3),
+    "creationTimestamp": at(LAST, 72930366, 2, 4),
+    "modifiedTimestamp": at(LAST, 72930366, 2, 9),
+    "timestampRange": [at(LAST, 72930366, 2, 5), at(LAST, 72930366, 2, 6)],
+    "isShared": at(LAST, 72930366, 4, default=False, then=bool),
+}
+
+ALBUM_ITEM_SPEC: dict[str, Any] = {
+    "mediaKey": at(0),
+    "thumb": at(1, 0),
+    "resWidth": at(1, 1),
+    "resHeight": at(1, 2),
+    "timestamp": at(2),
+    "timezoneOffset": at(4),
+    "creationTimestamp": at(5),
+    "dedupKey": at(3),
+    "isLivePhoto": at(LAST, 146008172, then=_is_set),
+    "livePhotoDuration": at(LAST, 146008172, 1),
+    "duration": at(LAST, 76647426, 0),
+}
+
+TRASH_ITEM_SPEC: dict[str, Any] = {
+    "mediaKey": at(0),
+    "thumb": at(1, 0),
+    "resWidth": at(1, 1),
+    "resHeight": at(1, 2),
+    "timestamp": at(2),
+    "timezoneOffset": at(4),
+    "creationTimestamp": at(5),
+    "dedupKey": at(3),
+    "duration": at(LAST, 76647426, 0),
+}
+
+BULK_MEDIA_INFO_ITEM_SPEC: dict[str, Any] = {
+    "mediaKey": at(0),
+    "descriptionFull": at(1, 2),
+    "fileName": at(1, 3),
+    "timestamp": at(1, 6),
+    "timezoneOffset": at(1, 7),
+    "creationTimestamp": at(1, 8),
+    "size": at(1, 9),
+    "takesUpSpace": at(1, LAST, 0, then=_equals_or_none(1)),
+    "spaceTaken": at(1, LAST, 1),
+    "isOriginalQuality": at(1, LAST, 2, then=_equals_or_none(2)),
+}
+
+REMOTE_MATCH_SPEC: dict[str, Any] = {
+    "hash": at(0),
+    "mediaKey": at(1, 0),
+    "thumb": at(1, 1, 0),
+    "resWidth": at(1, 1, 1),
+    "resHeight": at(1, 1, 2),
+    "timestamp": at(1, 2),
+    "dedupKey": at(1, 3),
+    "timezoneOffset": at(1, 4),
+    "creationTimestamp": at(1, 5),
+}
+
+PARSER_SPECS: dict[str, FieldSpec] = {
+    "lcxiM": {
+        "items": each(0, spec=LIBRARY_ITEM_SPEC),
+        "nextPageId": at(1),
+        "lastItemTimestamp": at(2, default=0, then=_int_or_zero),
+    },
+    "EzkLib": {
+        "items": each(0, spec=LIBRARY_ITEM_SPEC),
+        "nextPageId": at(1),
+    },
+    "nMFwOc": {
+        "nextPageId": at(0),
+        "items": each(1, spec=LOCKED_FOLDER_ITEM_SPEC),
+    },
+    "F2A0H": {
+        "items": each(0, spec={"mediaKey": at(6), "linkId": at(17), "itemCount": at(3)}),
+        "nextPageId": at(1),
+    },
+    "Z5xsfc": {
+        "items": each(0, spec=ALBUM_SPEC),
+        "nextPageId": at(1),
+    },
+    "snAcKc": {
+        "items": each(1, spec=ALBUM_ITEM_SPEC),
+        "nextPageId": at(2),
+        "mediaKey": at(3, 0),
+        "title": at(3, 1),
+        "owner": one(3, 5, spec=ACTOR_SPEC),
+        "itemCount": at(3, 21),
+        "authKey": at(3, 19),
+        "members": each(3, 9, spec=ACTOR_SPEC),
+    },
+    "e9T5je": {
+        "nextPageId": at(0),
+        "items": each(1, spec=ALBUM_ITEM_SPEC),
+        "members": each(2, spec=ACTOR_SPEC),
+        "partnerActorId": at(4),
+        "gaiaId": at(5),
+    },
+    "zy0IHe": {
+        "items": each(0, spec=TRASH_ITEM_SPEC),
+        "nextPageId": at(1),
+    },
+    "VrseUb": {
+        "mediaKey": at(0, 0),
+        "dedupKey": at(0, 3),
+        "timestamp": at(0, 2),
+        "timezoneOffset": at(0, 4),
+        "creationTimestamp": at(0, 5),
+        "downloadUrl": at(1),
+        "downloadOriginalUrl": at(7),
+        "isArchived": at(0, 13),
+        "isFavorite": at(0, 15, 163238866, 0),
+        "duration": at(0, 15, 76647426, 0),
+        "descriptionFull": at(10),
+        "thumb": at(12),
+    },
+    "fDcn4b": {
+        "mediaKey": at(0, 0),
+        "dedupKey": at(0, 11),
+        "descriptionFull": at(0, 1),
+        "fileName": at(0, 2),
+        "timestamp": at(0, 3),
+        "timezoneOffset": at(0, 4),
+        "size": at(0, 5),
+        "resWidth": at(0, 6),
+        "resHeight": at(0, 7),
+        "albums": each(0, 19, spec=ALBUM_SPEC),
+        "owner": one(0, 27, 4, 0, spec=ACTOR_SPEC, alt=(0, 28)),
+        "other": at(0, 31),
+    },
+    "EWgK9e": each(spec=BULK_MEDIA_INFO_ITEM_SPEC),
+    "dnv2s": {
+        "fileName": at(0, 0, 0, 2, 0, 0),
+        "downloadUrl": at(0, 0, 0, 2, 0, 1),
+        "downloadSize": at(0, 0, 0, 2, 0, 2),
+        "unzippedSize": at(0, 0, 0, 2, 0, 3),
+    },
+    "EzwWhf": {
+        "totalUsed": at(6, 0),
+        "totalAvailable": at(6, 1),
+        "usedByGPhotos": at(6, 3),
+    },
+    "swbisb": each(0, spec=REMOTE_MATCH_SPEC),
+}
+
+
+@lru_cache(maxsize=256)
+def parser_for(
+    rpcid: str,
+    fields: Optional[frozenset[str]] = None,
+    lazy: bool = False,
+    columnar: bool = False,
+) -> Optional[Callable[[Any], Any]]:
+    """Compiled extractor for rpcid, optionally keeping only the named (dotted) fields; None if unknown."""
+    spec = PARSER_SPECS.get(rpcid)
+    if spec is None:
+        return None
+    return compile_spec(spec, fields, name=rpcid, lazy=lazy, columnar=columnar)
 
-def parse_response(rpcid: str, payload: Any) -> Any:
+
+PARSER_REGISTRY: dict[str, Callable[[Any], Any]] = {rpcid: parser_for(rpcid) for rpcid in PARSER_SPECS}
+
+
+def check_fields(rpcid: str, fields: Any) -> None:
+    """Raise ValueError unless fields is None or a list of dotted field paths the rpcid's parser knows."""
+    if fields is None:
+        return
+    if not isinstance(fields, (list, tuple)) or not all(isinstance(name, str) and name for name in fields):
+        raise ValueError("params.fields must be a list of field names")
+    if rpcid not in PARSER_SPECS:
+        raise ValueError(f"params.fields cannot be applied: {rpcid} has no response parser")
+    parser_for(rpcid, frozenset(fields))
+
+
+def parse_response(
+    rpcid: str,
+    payload: Any,
+    fields: Optional[Iterable[str]] = None,
+    lazy: bool = False,
+    columnar: bool = False,
+) -> Any:
     if payload is None:
         return None
-    parser_fn = PARSER_REGISTRY.get(rpcid)
-    if not parser_fn:
-        return payload
     try:
+        if fields is None and not lazy and not columnar:
+            parser_fn = PARSER_REGISTRY.get(rpcid)
+        else:
+            try:
+                parser_fn = parser_for(rpcid, None if fields is None else frozenset(fields), lazy, columnar)
+            except (TypeError, ValueError):
+                # A projection that doesn't fit the spec (callers check_fields up front) falls back to the full parse.
+                parser_fn = PARSER_REGISTRY.get(rpcid)
+        if not parser_fn:
+            return payload
         return parser_fn(payload)
     except Exception:
         # Return raw payload when parser can't decode shape.
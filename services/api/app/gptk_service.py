@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
-from typing import Any
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
 
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
 
-from .auth_store import get_cookie_jar, get_session_state, set_session_state
+from .auth_store import cached_cookie_jar, get_session_state, set_session_state
 from .config import settings
-from .gphotos_rpc import GPhotosRpcClient
-from .gptk_ops import execute_operation
-from .models import Account
+from .database import engine
+from .gphotos_rpc import GPhotosRpcClient, client_registry
+from .gptk_ops import execute_operation, execute_operations_batch
+from .media_info_loader import media_info_loaders
+from .models import Account, CredentialCookies, GPhotosSessionState, RpcThrottleState
+from .rate_limit import rate_limiters
+from .result_cache import result_cache
+from .session_cache import session_cache
 
 
 @dataclass
@@ -20,29 +29,155 @@ class GptkCallResult:
     rpcid: str
 
 
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def load_persisted_session_state(account_id: str) -> Optional[tuple[dict[str, Any], Optional[float]]]:
+    with Session(engine) as db:
+        row = db.execute(select(GPhotosSessionState).where(GPhotosSessionState.account_id == account_id)).scalar_one_or_none()
+        if row is None or not isinstance(row.session_state, dict):
+            return None
+        return row.session_state, _epoch(row.updated_at)
+
+
+session_cache.set_loader(load_persisted_session_state)
+
+
+def load_throttle_state(account_id: str) -> Optional[tuple[float, float, float]]:
+    with engine.connect() as connection:
+        row = connection.execute(
+            select(RpcThrottleState.rate, RpcThrottleState.throttled_until, RpcThrottleState.updated_at).where(
+                RpcThrottleState.account_id == account_id
+            )
+        ).first()
+    return None if row is None else (row.rate, row.throttled_until, row.updated_at)
+
+
+def save_throttle_state(account_id: str, rate: float, throttled_until: float, updated_at: float) -> None:
+    stmt = insert(RpcThrottleState).values(account_id=account_id, rate=rate, throttled_until=throttled_until, updated_at=updated_at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RpcThrottleState.account_id],
+        set_={
+            "rate": stmt.excluded.rate,
+            # A longer Retry-After another process is still honouring is kept.
+            "throttled_until": func.max(RpcThrottleState.throttled_until, stmt.excluded.throttled_until),
+            "updated_at": func.max(RpcThrottleState.updated_at, stmt.excluded.updated_at),
+        },
+    )
+    with engine.begin() as connection:
+        connection.execute(stmt)
+
+
+# The API process (session warmer, /session/refresh, explorer) and the worker pace each account together.
+rate_limiters.set_store(load_throttle_state, save_throttle_state)
+
+
+def _load_media_info(
+    account_id: str, media_keys: list[str], call_batch: Callable[[list[tuple[str, dict[str, Any]]]], list[GptkCallResult]]
+) -> dict[str, Optional[dict[str, Any]]]:
+    # Lookups from concurrent callers on this account are merged into shared get_batch_media_info batches.
+    def fetch(chunks: list[list[str]]) -> list[Any]:
+        results = call_batch([("gptk.get_batch_media_info", {"mediaKeyArray": chunk}) for chunk in chunks])
+        return [result.data for result in results]
+
+    return media_info_loaders.get(account_id).load_many(media_keys, fetch)
+
+
+class DetachedGptk:
+    # Read-only GPTK calls for worker threads: RPCs only, never the DB session. Session state is read from and
+    # refreshed into session_cache; the owning GptkService persists it from its own thread (store_session_state).
+    def __init__(self, client: GPhotosRpcClient, account_id: str, initial_state: dict[str, Any]) -> None:
+        self.client = client
+        self.account_id = account_id
+        self.initial_state = initial_state
+
+    def _state(self) -> dict[str, Any]:
+        return session_cache.get(self.account_id) or self.initial_state
+
+    def _keep(self, state: Any, current_state: dict[str, Any]) -> dict[str, Any]:
+        if isinstance(state, dict) and state:
+            session_cache.update(self.account_id, state)
+            return state
+        return current_state
+
+    def call(self, operation: str, params: dict[str, Any]) -> GptkCallResult:
+        current_state = self._state()
+        result = execute_operation(client=self.client, operation=operation, params=params, session_state=current_state)
+        return GptkCallResult(
+            data=result.get("data"),
+            raw_data=result.get("raw_data"),
+            session_state=self._keep(result.get("session_state"), current_state),
+            rpcid=str(result.get("rpcid")),
+        )
+
+    def call_batch(self, calls: list[tuple[str, dict[str, Any]]]) -> list[GptkCallResult]:
+        current_state = self._state()
+        result = execute_operations_batch(client=self.client, calls=calls, session_state=current_state)
+        session_state = self._keep(result.get("session_state"), current_state)
+        return [
+            GptkCallResult(
+                data=item.get("data"),
+                raw_data=item.get("raw_data"),
+                session_state=session_state,
+                rpcid=str(item.get("rpcid")),
+            )
+            for item in result.get("results") or []
+        ]
+
+    def media_info(self, media_keys: list[str]) -> dict[str, Optional[dict[str, Any]]]:
+        return _load_media_info(self.account_id, media_keys, self.call_batch)
+
+
 class GptkService:
     def __init__(self, session: Session, account: Account) -> None:
         self.session = session
         self.account = account
 
     def _client(self) -> GPhotosRpcClient:
-        cookie_jar = get_cookie_jar(self.session, self.account)
+        cookie_jar = cached_cookie_jar(self.session, self.account)
         if not cookie_jar:
             raise RuntimeError("No cookie credential found for account")
-        return GPhotosRpcClient(
-            cookie_jar=cookie_jar,
-            max_retries=settings.rpc_max_retries,
-            retry_base_delay_ms=settings.rpc_retry_base_delay_ms,
-        )
+        return client_registry.get(self.account.id, cookie_jar)
+
+    def session_state(self) -> dict[str, Any]:
+        state = session_cache.get(self.account.id)
+        if state:
+            return state
+        state_row = self.session.execute(
+            select(GPhotosSessionState).where(GPhotosSessionState.account_id == self.account.id)
+        ).scalar_one_or_none()
+        if state_row is not None and isinstance(state_row.session_state, dict):
+            session_cache.seed(self.account.id, state_row.session_state, _epoch(state_row.updated_at))
+        else:
+            session_cache.seed(self.account.id, get_session_state(self.session, self.account))
+        return session_cache.get(self.account.id)
+
+    def store_session_state(self, state: Any) -> None:
+        if isinstance(state, dict) and state:
+            session_cache.update(self.account.id, state)
+        with session_cache.persist_lock(self.account.id):
+            pending = session_cache.pending_persist(self.account.id)
+            if pending is None:
+                return
+            version, pending_state = pending
+            set_session_state(self.session, self.account, pending_state)
+            self.session.commit()
+            session_cache.mark_persisted(self.account.id, version)
 
     def call(self, operation: str, params: dict[str, Any]) -> GptkCallResult:
+        # Uncached: job results are cached in gptk_adapter. A write made here still invalidates those entries.
         client = self._client()
-        current_state = get_session_state(self.session, self.account)
+        current_state = self.session_state()
+        result_cache.note_operation(self.account.id, operation)
         result = execute_operation(client=client, operation=operation, params=params, session_state=current_state)
+        result_cache.note_operation(self.account.id, operation)
         session_state = result.get("session_state") or current_state
-        if isinstance(session_state, dict):
-            set_session_state(self.session, self.account, session_state)
-            self.session.commit()
+        self.store_session_state(session_state)
         return GptkCallResult(
             data=result.get("data"),
             raw_data=result.get("raw_data"),
@@ -50,9 +185,85 @@ class GptkService:
             rpcid=str(result.get("rpcid")),
         )
 
-    def refresh_session(self, source_path: str = "/") -> dict[str, Any]:
+    def call_batch(self, calls: list[tuple[str, dict[str, Any]]]) -> list[GptkCallResult]:
         client = self._client()
-        state = client.bootstrap_session(source_path=source_path)
-        set_session_state(self.session, self.account, state)
-        self.session.commit()
+        current_state = self.session_state()
+        for operation, _ in calls:
+            result_cache.note_operation(self.account.id, operation)
+        result = execute_operations_batch(client=client, calls=calls, session_state=current_state)
+        for operation, _ in calls:
+            result_cache.note_operation(self.account.id, operation)
+        session_state = result.get("session_state") or current_state
+        self.store_session_state(session_state)
+        return [
+            GptkCallResult(
+                data=item.get("data"),
+                raw_data=item.get("raw_data"),
+                session_state=session_state,
+                rpcid=str(item.get("rpcid")),
+            )
+            for item in result.get("results") or []
+        ]
+
+    def media_info(self, media_keys: list[str]) -> dict[str, Optional[dict[str, Any]]]:
+        return _load_media_info(self.account.id, media_keys, self.call_batch)
+
+    def detached(self) -> DetachedGptk:
+        return DetachedGptk(self._client(), self.account.id, self.session_state())
+
+    def refresh_session(self, source_path: str = "/", force: bool = True) -> dict[str, Any]:
+        client = self._client()
+        state = client.refresh_session_state(source_path=source_path, stale_state=self.session_state(), force=force)
+        self.store_session_state(state)
         return state
+
+
+class SessionWarmer:
+    def __init__(self, interval_seconds: float, max_age_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self.max_age_seconds = max_age_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="session-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as exc:  # noqa: BLE001
+                print(f"[session-warmer] error: {exc}")
+            self._stop.wait(self.interval_seconds)
+
+    def run_once(self) -> list[str]:
+        warmed: list[str] = []
+        with Session(engine) as db:
+            accounts = db.execute(
+                select(Account).join(CredentialCookies, CredentialCookies.account_id == Account.id).where(Account.is_active.is_(True))
+            ).scalars().all()
+            for account in accounts:
+                service = GptkService(db, account)
+                service.session_state()
+                age = session_cache.age_seconds(account.id)
+                # Refresh one warm interval ahead of the max age so no caller ever meets an expired session.
+                if age is not None and age + self.interval_seconds < self.max_age_seconds:
+                    continue
+                try:
+                    service.refresh_session(force=False)
+                    warmed.append(account.id)
+                except Exception as exc:  # noqa: BLE001
+                    print(f"[session-warmer] {account.id}: {exc}")
+        return warmed
+
+
+session_warmer = SessionWarmer(
+    interval_seconds=settings.session_warm_interval_seconds,
+    max_age_seconds=settings.session_max_age_seconds,
+)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from typing import Any, Optional
+
+from .config import settings
+
+
+class HedgeCancelled(Exception):
+    """Raised inside the losing leg of a hedged request once the other leg has answered."""
+
+
+class LatencyWindow:
+    # Rolling window of successful call latencies; the hedge fires once a call outlives the configured percentile.
+    def __init__(self, size: int) -> None:
+        self._samples: deque[float] = deque(maxlen=max(size, 1))
+        self._lock = threading.Lock()
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def record_hedge(self, won: bool) -> None:
+        with self._lock:
+            self.hedged += 1
+            if won:
+                self.hedge_wins += 1
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        rank = min(max(math.ceil(percentile / 100.0 * len(ordered)) - 1, 0), len(ordered) - 1)
+        return ordered[rank]
+
+    def hedge_delay(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < settings.rpc_hedge_min_samples:
+                return None
+        delay = self.percentile(settings.rpc_hedge_percentile)
+        if delay is None:
+            return None
+        return max(delay, settings.rpc_hedge_min_delay_ms / 1000.0)
+
+    def snapshot(self) -> dict[str, Any]:
+        p50 = self.percentile(50)
+        p95 = self.percentile(95)
+        with self._lock:
+            return {
+                "samples": len(self._samples),
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+            }
+
+
+class LatencyRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._windows: dict[tuple[str, str], LatencyWindow] = {}
+
+    def get(self, account_key: str, call_key: str) -> LatencyWindow:
+        with self._lock:
+            window = self._windows.get((account_key, call_key))
+            if window is None:
+                window = LatencyWindow(settings.rpc_hedge_window)
+                self._windows[(account_key, call_key)] = window
+            return window
+
+    def snapshot(self, account_key: str) -> dict[str, Any]:
+        with self._lock:
+            windows = {call_key: window for (key, call_key), window in self._windows.items() if key == account_key}
+        return {call_key: window.snapshot() for call_key, window in sorted(windows.items())}
+
+
+def call_key(rpcids: list[str]) -> str:
+    return "+".join(rpcids)
+
+
+latency_windows = LatencyRegistry()
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import ColumnElement, and_, bindparam, case, func, literal, or_, select, text, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from .models import AlbumIndex, MediaIndex
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".mkv", ".avi", ".webm")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".heic", ".gif")
+
+# Rows per executemany call; each call is one prepared statement replayed over the batch.
+BATCH_SIZE = 2000
+
+# The listing fields upsert_media reads; columnar pages projected to these feed upsert_media_columns.
+MEDIA_FIELDS = (
+    "mediaKey",
+    "dedupKey",
+    "timestamp",
+    "creationTimestamp",
+    "timezoneOffset",
+    "thumb",
+    "isArchived",
+    "isFavorite",
+    "duration",
+)
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def media_type_from_payload(file_name: Optional[str], duration: Any) -> Optional[str]:
+    if duration:
+        return "video"
+    if not file_name:
+        return None
+    lower = file_name.lower()
+    if lower.endswith(VIDEO_EXTENSIONS):
+        return "video"
+    if lower.endswith(IMAGE_EXTENSIONS):
+        return "image"
+    return None
+
+
+def _media_type_sql(file_name: ColumnElement[Any]) -> ColumnElement[Any]:
+    # media_type_from_payload's extension rules for a row without a duration, evaluated by SQLite.
+    lower = func.lower(file_name)
+    return case(
+        (or_(*(lower.like(f"%{ext}") for ext in VIDEO_EXTENSIONS)), literal("video")),
+        (or_(*(lower.like(f"%{ext}") for ext in IMAGE_EXTENSIONS)), literal("image")),
+        else_=None,
+    )
+
+
+def _batches(rows: list[dict[str, Any]]) -> Iterable[list[dict[str, Any]]]:
+    for idx in range(0, len(rows), BATCH_SIZE):
+        yield rows[idx : idx + BATCH_SIZE]
+
+
+def upsert_media(session: Session, account_id: str, items: Iterable[Any], *, source: str, is_trashed: bool) -> int:
+    """INSERT ... ON CONFLICT DO UPDATE for listing items, keeping a stored value wherever the new one is empty."""
+    now = utc_now()
+    rows = [
+        _media_row(account_id, item, source=source, is_trashed=is_trashed, now=now)
+        for item in items
+        if item.get("mediaKey")
+    ]
+    return _upsert_media_rows(session, rows)
+
+
+def upsert_media_columns(
+    session: Session, account_id: str, columns: Mapping[str, Sequence[Any]], *, source: str, is_trashed: bool
+) -> int:
+    """upsert_media for a columnar page ({field: column}): rows are built straight from the MEDIA_FIELDS columns."""
+    now = utc_now()
+    count = len(columns.get("mediaKey") or ())
+    values = [columns.get(name) or [None] * count for name in MEDIA_FIELDS]
+    rows = [
+        _media_row(account_id, dict(zip(MEDIA_FIELDS, row)), source=source, is_trashed=is_trashed, now=now)
+        for row in zip(*values)
+        if row[0]
+    ]
+    return _upsert_media_rows(session, rows)
+
+
+def _media_row(account_id: str, item: Any, *, source: str, is_trashed: bool, now: datetime) -> dict[str, Any]:
+    # `or None` turns every falsy value into NULL, so COALESCE keeps the stored one exactly like `new or old`.
+    return {
+        "account_id": account_id,
+        "media_key": str(item.get("mediaKey")),
+        "dedup_key": item.get("dedupKey") or None,
+        "timestamp_taken": item.get("timestamp") or None,
+        "timestamp_uploaded": item.get("creationTimestamp") or None,
+        "timezone_offset": item.get("timezoneOffset") or None,
+        "thumb_url": item.get("thumb") or None,
+        "is_archived": bool(item.get("isArchived") or False),
+        "is_favorite": bool(item.get("isFavorite") or False),
+        "is_trashed": is_trashed,
+        "source": source,
+        "media_type": "video" if item.get("duration") else None,
+        "album_ids": [],
+        "space_flags": {},
+        "raw_item": item,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _upsert_media_rows(session: Session, rows: list[dict[str, Any]]) -> int:
+    if not rows:
+        return 0
+
+    stmt = insert(MediaIndex.__table__)
+    new = stmt.excluded
+    table = MediaIndex.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.account_id, table.media_key],
+        set_={
+            "dedup_key": func.coalesce(new.dedup_key, table.dedup_key),
+            "timestamp_taken": func.coalesce(new.timestamp_taken, table.timestamp_taken),
+            "timestamp_uploaded": func.coalesce(new.timestamp_uploaded, table.timestamp_uploaded),
+            "timezone_offset": func.coalesce(new.timezone_offset, table.timezone_offset),
+            "thumb_url": func.coalesce(new.thumb_url, table.thumb_url),
+            "is_archived": new.is_archived,
+            "is_favorite": or_(new.is_favorite, table.is_favorite),
+            "is_trashed": new.is_trashed,
+            "source": new.source,
+            "media_type": func.coalesce(new.media_type, _media_type_sql(table.file_name)),
+            "raw_item": new.raw_item,
+            "updated_at": new.updated_at,
+        },
+    )
+    for batch in _batches(rows):
+        session.execute(stmt, batch)
+    return len(rows)
+
+
+def upsert_albums(session: Session, account_id: str, albums: Iterable[Any]) -> int:
+    now = utc_now()
+    rows = [
+        {
+            "account_id": account_id,
+            "media_key": str(album.get("mediaKey")),
+            "title": album.get("title"),
+            "owner_actor_id": album.get("ownerActorId"),
+            "item_count": album.get("itemCount"),
+            "creation_timestamp": album.get("creationTimestamp"),
+            "modified_timestamp": album.get("modifiedTimestamp"),
+            "is_shared": bool(album.get("isShared")),
+            "thumb": album.get("thumb"),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for album in albums
+        if album.get("mediaKey")
+    ]
+    if not rows:
+        return 0
+
+    stmt = insert(AlbumIndex.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AlbumIndex.__table__.c.account_id, AlbumIndex.__table__.c.media_key],
+        set_={
+            name: getattr(stmt.excluded, name)
+            for name in ("title", "owner_actor_id", "item_count", "creation_timestamp", "modified_timestamp", "is_shared", "thumb", "updated_at")
+        },
+    )
+    for batch in _batches(rows):
+        session.execute(stmt, batch)
+    return len(rows)
+
+
+def _key_batches(keys: list[str]) -> Iterable[list[str]]:
+    # IN lists stay under SQLite's bound-parameter limit.
+    for idx in range(0, len(keys), 500):
+        yield keys[idx : idx + 500]
+
+
+def album_member_keys(session: Session, account_id: str, album_key: str) -> set[str]:
+    rows = session.execute(
+        select(MediaIndex.media_key).where(
+            MediaIndex.account_id == account_id,
+            text("EXISTS (SELECT 1 FROM json_each(media_index.album_ids) WHERE json_each.value = :album_key)"),
+        ),
+        {"album_key": album_key},
+    )
+    return {str(media_key) for media_key in rows.scalars()}
+
+
+def add_album_members(session: Session, account_id: str, album_key: str, items: list[Any]) -> int:
+    """Appends album_key to album_ids of the given members, inserting bare rows for media the library has not listed yet."""
+    now = utc_now()
+    by_key = {str(item.get("mediaKey")): item for item in items if item.get("mediaKey")}
+    if not by_key:
+        return 0
+    stmt = insert(MediaIndex.__table__).on_conflict_do_nothing(index_elements=["account_id", "media_key"])
+    rows = [
+        {
+            "account_id": account_id,
+            "media_key": media_key,
+            "source": "library",
+            "is_archived": False,
+            "is_favorite": False,
+            "is_trashed": False,
+            "album_ids": [],
+            "space_flags": {},
+            "raw_item": item,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for media_key, item in by_key.items()
+    ]
+    for batch in _batches(rows):
+        session.execute(stmt, batch)
+
+    table = MediaIndex.__table__.c
+    for keys in _key_batches(list(by_key)):
+        session.execute(
+            update(MediaIndex.__table__)
+            .where(table.account_id == account_id, table.media_key.in_(keys))
+            .values(album_ids=func.json_insert(table.album_ids, "$[#]", album_key), updated_at=now)
+        )
+    return len(by_key)
+
+
+def remove_album_members(session: Session, account_id: str, album_key: str, media_keys: Iterable[str]) -> int:
+    now = utc_now()
+    keys = list(media_keys)
+    table = MediaIndex.__table__.c
+    members = func.json_each(table.album_ids).table_valued("value")
+    remaining = select(func.json_group_array(members.c.value)).where(members.c.value != album_key).scalar_subquery()
+    for batch in _key_batches(keys):
+        session.execute(
+            update(MediaIndex.__table__)
+            .where(table.account_id == account_id, table.media_key.in_(batch))
+            .values(album_ids=remaining, updated_at=now)
+        )
+    return len(keys)
+
+
+def apply_media_info(session: Session, account_id: str, info_by_key: dict[str, Optional[dict[str, Any]]]) -> int:
+    """Batched UPDATE of get_batch_media_info fields onto rows that already exist; unknown keys are skipped."""
+    now = utc_now()
+    rows = [
+        {
+            "b_account_id": account_id,
+            "b_media_key": media_key,
+            "b_file_name": info.get("fileName") or None,
+            "b_size": info.get("size"),
+            "b_timestamp_uploaded": info.get("creationTimestamp") or None,
+            "b_timestamp_taken": info.get("timestamp") or None,
+            "b_space_flags": {
+                "takes_up_space": info.get("takesUpSpace"),
+                "space_taken": info.get("spaceTaken"),
+                "original_quality": info.get("isOriginalQuality"),
+            },
+            "b_updated_at": now,
+        }
+        for media_key, info in info_by_key.items()
+        if info is not None
+    ]
+    if not rows:
+        return 0
+
+    table = MediaIndex.__table__
+    file_name = func.coalesce(bindparam("b_file_name"), table.c.file_name)
+    duration = func.json_extract(table.c.raw_item, "$.duration")
+    stmt = (
+        update(table)
+        .where(and_(table.c.account_id == bindparam("b_account_id"), table.c.media_key == bindparam("b_media_key")))
+        .values(
+            file_name=file_name,
+            size=func.coalesce(bindparam("b_size"), table.c.size),
+            timestamp_uploaded=func.coalesce(bindparam("b_timestamp_uploaded"), table.c.timestamp_uploaded),
+            timestamp_taken=func.coalesce(bindparam("b_timestamp_taken"), table.c.timestamp_taken),
+            space_flags=bindparam("b_space_flags", type_=table.c.space_flags.type),
+            media_type=case(
+                (and_(duration.is_not(None), duration != 0, duration != ""), literal("video")),
+                else_=_media_type_sql(file_name),
+            ),
+            updated_at=bindparam("b_updated_at", type_=table.c.updated_at.type),
+        )
+    )
+    for batch in _batches(rows):
+        session.execute(stmt, batch)
+    return len(rows)
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable, Optional
 
 from sqlalchemy import Select, select
 from sqlalchemy.orm import Session
 
 from .adapters import gp_disguise_adapter, gpmc_adapter, gptk_adapter
-from .auth_store import get_cookie_jar, get_gpmc_auth, get_session_state, set_session_state
+from .auth_store import cached_cookie_jar, get_gpmc_auth
+from .circuit_breaker import CircuitOpenError, circuit_breakers
 from .explorer_service import ExplorerService
+from .gptk_service import GptkService
 from .job_store import add_job_event
 from .models import Account, Job
 from .operation_safety import is_operation_destructive
@@ -27,12 +30,26 @@ def _progress_update(session: Session, job: Job, progress: float, message: str)
     session.commit()
 
 
-def execute_job(session: Session, job_id: str) -> None:
+def _uses_rpc_client(job: Job) -> bool:
+    provider = job.provider
+    if provider == "advanced":
+        provider = job.operation.split(".", 1)[0] if "." in job.operation else "gptk"
+    return provider in {"gptk", "indexer"}
+
+
+def is_async_job(job: Job) -> bool:
+    provider = job.provider
+    if provider == "advanced":
+        provider = job.operation.split(".", 1)[0] if "." in job.operation else "gptk"
+    return provider == "gptk" and gptk_adapter.runs_async(job.operation, job.params or {}, job.dry_run)
+
+
+def _begin_job(session: Session, job_id: str) -> Optional[tuple[Job, Account]]:
     job = session.get(Job, job_id)
     if job is None:
-        return
+        return None
     if job.status not in {"queued", "running"}:
-        return
+        return None
 
     account = session.get(Account, job.account_id)
     if account is None:
@@ -40,7 +57,7 @@ def execute_job(session: Session, job_id: str) -> None:
         job.error = {"message": "account not found"}
         job.finished_at = utc_now()
         session.commit()
-        return
+        return None
 
     if is_operation_destructive(job.operation) and not job.dry_run:
         if not bool((job.params or {}).get("confirmed", False)):
@@ -49,7 +66,7 @@ def execute_job(session: Session, job_id: str) -> None:
             job.finished_at = utc_now()
             add_job_event(session, job, message="Blocked: destructive operation missing confirmed=true", level="error")
             session.commit()
-            return
+            return None
 
     job.status = "running"
     job.started_at = job.started_at or utc_now()
@@ -57,13 +74,87 @@ def execute_job(session: Session, job_id: str) -> None:
     job.progress = max(job.progress, 0.01)
     add_job_event(session, job, message="Job started", progress=job.progress)
     session.commit()
+    return job, account
+
 
+def _job_progress(session: Session, job: Job) -> Callable[[float, str], None]:
     def progress(value: float, message: str) -> None:
         session.refresh(job)
         if job.cancel_requested:
             raise RuntimeError("Job cancelled by user")
         _progress_update(session, job, value, message)
 
+    return progress
+
+
+def _complete_job(session: Session, job: Job, result: dict[str, Any]) -> None:
+    session.refresh(job)
+    if job.cancel_requested:
+        job.status = "cancelled"
+        job.message = "Job cancelled"
+        job.progress = min(job.progress, 1.0)
+        add_job_event(session, job, message="Job cancelled", progress=job.progress, level="warn")
+    else:
+        job.status = "succeeded"
+        job.message = "Job completed"
+        job.progress = 1.0
+        job.result = result
+        add_job_event(session, job, message="Job completed", progress=1.0)
+    job.finished_at = utc_now()
+    job.updated_at = utc_now()
+    session.commit()
+
+
+def _fail_job(session: Session, job: Job, exc: Exception) -> None:
+    session.refresh(job)
+    if isinstance(exc, CircuitOpenError):
+        if exc.reason == "auth":
+            job.status = "requires_credentials"
+            job.error = {"message": str(exc)}
+            job.finished_at = utc_now()
+            add_job_event(session, job, message=str(exc), level="error")
+        else:
+            # Throttled: put the job back; claim_jobs leaves it alone until the circuit half-opens.
+            job.status = "queued"
+            job.message = f"Deferred: {exc}"
+            add_job_event(session, job, message=job.message, level="warn")
+        job.updated_at = utc_now()
+    elif isinstance(exc, RuntimeError):
+        if str(exc) == "Job cancelled by user":
+            job.status = "cancelled"
+            job.message = "Job cancelled"
+            job.error = {"message": "cancelled"}
+            add_job_event(session, job, message="Job cancelled by user", level="warn")
+        else:
+            job.status = "failed"
+            job.error = {"message": str(exc)}
+            add_job_event(session, job, message=str(exc), level="error")
+        job.finished_at = utc_now()
+    else:
+        message = str(exc)
+        if "auth_data" in message.lower() or "cookie" in message.lower():
+            job.status = "requires_credentials"
+        else:
+            job.status = "failed"
+        job.error = {"message": message}
+        job.finished_at = utc_now()
+        job.updated_at = utc_now()
+        add_job_event(session, job, message=message, level="error")
+    session.commit()
+
+
+def execute_job(session: Session, job_id: str) -> None:
+    started = _begin_job(session, job_id)
+    if started is None:
+        return
+    job, account = started
+    progress = _job_progress(session, job)
+
+    def publish(partial: dict[str, Any]) -> None:
+        job.result = partial
+        job.updated_at = utc_now()
+        session.commit()
+
     try:
         result: dict[str, Any]
         provider = job.provider
@@ -90,28 +181,38 @@ def execute_job(session: Session, job_id: str) -> None:
                 progress=progress,
             )
         elif provider == "gptk":
-            cookie_jar = get_cookie_jar(session, account)
-            current_state = get_session_state(session, account)
-            result = gptk_adapter.run(
-                operation=operation,
-                params=params,
-                cookie_jar=cookie_jar,
-                session_state=current_state,
-                _sidecar_base_url=None,
-                dry_run=job.dry_run,
-                progress=progress,
-            )
-            session_state = result.get("session_state")
-            if isinstance(session_state, dict) and session_state:
-                set_session_state(session, account, session_state)
-                account.updated_at = utc_now()
-                session.commit()
+            gptk = GptkService(session, account)
+            cookie_jar = cached_cookie_jar(session, account)
+            current_state = gptk.session_state()
+            if operation.replace("gptk.", "") == "rpc_batch":
+                result = gptk_adapter.run_batch(
+                    params=params,
+                    cookie_jar=cookie_jar,
+                    session_state=current_state,
+                    dry_run=job.dry_run,
+                    progress=progress,
+                    account_id=account.id,
+                    publish=publish,
+                )
+            else:
+                result = gptk_adapter.run(
+                    operation=operation,
+                    params=params,
+                    cookie_jar=cookie_jar,
+                    session_state=current_state,
+                    _sidecar_base_url=None,
+                    dry_run=job.dry_run,
+                    progress=progress,
+                    account_id=account.id,
+                )
+            gptk.store_session_state(result.get("session_state"))
         elif provider == "indexer":
             explorer = ExplorerService(session, account)
             result = explorer.refresh_index(
                 max_items=int(params.get("max_items", 3000)),
                 include_album_members=bool(params.get("include_album_members", False)),
                 force_full=bool(params.get("force_full", False)),
+                incremental=bool(params.get("incremental", True)),
                 progress=progress,
             )
         elif provider == "pipeline":
@@ -120,46 +221,41 @@ def execute_job(session: Session, job_id: str) -> None:
         else:
             raise ValueError(f"Unknown provider: {job.provider}")
 
-        session.refresh(job)
-        if job.cancel_requested:
-            job.status = "cancelled"
-            job.message = "Job cancelled"
-            job.progress = min(job.progress, 1.0)
-            add_job_event(session, job, message="Job cancelled", progress=job.progress, level="warn")
-        else:
-            job.status = "succeeded"
-            job.message = "Job completed"
-            job.progress = 1.0
-            job.result = result
-            add_job_event(session, job, message="Job completed", progress=1.0)
-        job.finished_at = utc_now()
-        job.updated_at = utc_now()
-        session.commit()
-    except RuntimeError as exc:
-        session.refresh(job)
-        if str(exc) == "Job cancelled by user":
-            job.status = "cancelled"
-            job.message = "Job cancelled"
-            job.error = {"message": "cancelled"}
-            add_job_event(session, job, message="Job cancelled by user", level="warn")
-        else:
-            job.status = "failed"
-            job.error = {"message": str(exc)}
-            add_job_event(session, job, message=str(exc), level="error")
-        job.finished_at = utc_now()
-        session.commit()
+        _complete_job(session, job, result)
     except Exception as exc:  # noqa: BLE001
-        session.refresh(job)
-        message = str(exc)
-        if "auth_data" in message.lower() or "cookie" in message.lower():
-            job.status = "requires_credentials"
-        else:
-            job.status = "failed"
-        job.error = {"message": message}
-        job.finished_at = utc_now()
-        job.updated_at = utc_now()
-        add_job_event(session, job, message=message, level="error")
-        session.commit()
+        _fail_job(session, job, exc)
+
+
+async def execute_job_async(session: Session, job_id: str) -> None:
+    # For jobs where is_async_job holds. Only the RPC is awaited on the event loop, so one loop keeps many of
+    # these in flight. Every DB read and commit for the job (and any lazy load of its expired rows) runs in a
+    # thread: while another job holds the SQLite write lock, only this job waits, not the whole loop.
+    started = await asyncio.to_thread(_begin_job, session, job_id)
+    if started is None:
+        return
+    job, account = started
+    update_progress = _job_progress(session, job)
+
+    async def progress(value: float, message: str) -> None:
+        await asyncio.to_thread(update_progress, value, message)
+
+    def prepare() -> tuple[GptkService, dict[str, Any]]:
+        gptk = GptkService(session, account)
+        return gptk, {
+            "operation": job.operation,
+            "params": dict(job.params or {}),
+            "cookie_jar": cached_cookie_jar(session, account),
+            "session_state": gptk.session_state(),
+            "account_id": account.id,
+        }
+
+    try:
+        gptk, call = await asyncio.to_thread(prepare)
+        result = await gptk_adapter.run_async(**call, progress=progress)
+        await asyncio.to_thread(gptk.store_session_state, result.get("session_state"))
+        await asyncio.to_thread(_complete_job, session, job, result)
+    except Exception as exc:  # noqa: BLE001
+        await asyncio.to_thread(_fail_job, session, job, exc)
 
 
 def claim_next_job(session: Session) -> Job | None:
@@ -200,6 +296,8 @@ def claim_jobs(session: Session, limit: int, max_per_account: int, in_flight_acc
         local = local_account_counts.get(queued.account_id, 0)
         if in_flight + local >= max_per_account:
             continue
+        if _uses_rpc_client(queued) and circuit_breakers.get(queued.account_id).blocks("throttle"):
+            continue
 
         queued.status = "running"
         queued.started_at = queued.started_at or utc_now()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from array import array
+from collections.abc import Mapping
+from typing import Any, Callable, Union
+
+from .config import settings
+
+JsonInput = Union[str, bytes, bytearray, memoryview]
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import ujson
+except ImportError:  # optional speedup
+    ujson = None  # type: ignore[assignment]
+
+
+def _default(value: Any) -> Any:
+    # Lazy item views and packed columns from gptk_parser serialize as the dict / list they stand for.
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, array):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(value: Any) -> str:
+    # Compact separators match JSON.stringify, which is what the web client sends for f.req payloads.
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=_default)
+
+
+def _stdlib_loads(data: JsonInput) -> Any:
+    if isinstance(data, memoryview):
+        data = bytes(data)
+    return json.loads(data)
+
+
+def _orjson_dumps(value: Any) -> str:
+    try:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    except TypeError:
+        # orjson rejects integers beyond 64 bits and unknown types; the stdlib handles the former.
+        return _stdlib_dumps(value)
+
+
+def _orjson_loads(data: JsonInput) -> Any:
+    return orjson.loads(data)
+
+
+def _ujson_dumps(value: Any) -> str:
+    try:
+        return ujson.dumps(value, ensure_ascii=False, escape_forward_slashes=False)
+    except (TypeError, OverflowError):
+        return _stdlib_dumps(value)
+
+
+def _ujson_loads(data: JsonInput) -> Any:
+    if isinstance(data, (bytearray, memoryview)):
+        data = bytes(data)
+    return ujson.loads(data)
+
+
+_BACKENDS: dict[str, tuple[Callable[[Any], str], Callable[[JsonInput], Any]]] = {"stdlib": (_stdlib_dumps, _stdlib_loads)}
+if orjson is not None:
+    _BACKENDS["orjson"] = (_orjson_dumps, _orjson_loads)
+if ujson is not None:
+    _BACKENDS["ujson"] = (_ujson_dumps, _ujson_loads)
+
+
+def _select_backend(preferred: str) -> str:
+    if preferred in _BACKENDS:
+        return preferred
+    for name in ("orjson", "ujson"):
+        if name in _BACKENDS:
+            return name
+    return "stdlib"
+
+
+BACKEND = _select_backend(settings.json_backend)
+dumps, loads = _BACKENDS[BACKEND]
+
+
+def available_backends() -> list[str]:
+    return list(_BACKENDS)
+
+
+def codec(name: str) -> tuple[Callable[[Any], str], Callable[[JsonInput], Any]]:
+    return _BACKENDS[name]
@@ -9,6 +9,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
 from .database import initialize_database
+from .gptk_service import session_warmer
 from .routes import accounts_router, health_router, jobs_router, operations_router
 from .routes_v2 import (
     v2_accounts_router,
@@ -34,6 +35,12 @@ app.add_middleware(
 @app.on_event("startup")
 def on_startup() -> None:
     initialize_database()
+    session_warmer.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    session_warmer.stop()
 
 
 app.include_router(health_router)
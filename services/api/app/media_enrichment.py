@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Optional
+
+from .circuit_breaker import CircuitOpenError
+from .config import settings
+from .rate_limit import throttle_backoff_seconds
+from .refresh_pipeline import Emit
+
+# Sends one batchexecute of get_batch_media_info calls and returns the parsed rows of every call.
+GroupFetch = Callable[[list[list[str]]], list[Any]]
+
+
+class MediaEnricher:
+    # Pulls get_batch_media_info for listed keys with up to `concurrency` batchexecute requests in flight. Each
+    # request carries batches_per_request chunks of batch_size keys. A request that still fails after the client's
+    # own retries is retried whole up to `retries` more times with backoff; an open circuit is not retried.
+    # Rows are emitted as "media_info" messages from the calling thread.
+    def __init__(self, fetch: GroupFetch, *, concurrency: int, retries: int, batch_size: int, batches_per_request: int) -> None:
+        self.fetch = fetch
+        self.concurrency = max(concurrency, 1)
+        self.retries = max(retries, 0)
+        self.batch_size = max(batch_size, 1)
+        self.group_size = self.batch_size * max(batches_per_request, 1)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.skipped_keys = 0
+        self.requested_keys = 0
+        self.found_keys = 0
+        self.requests = 0
+        self.retried_requests = 0
+        self.failed_keys = 0
+
+    def note_skipped(self, count: int) -> None:
+        with self._lock:
+            self.skipped_keys += count
+
+    def run(self, key_batches: Iterable[list[str]], emit: Emit) -> None:
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="media-info")
+        inflight: set[Future[Optional[dict[str, Any]]]] = set()
+
+        def collect(timeout: Optional[float]) -> None:
+            done, _ = wait(inflight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                inflight.discard(future)
+                info_by_key = future.result()
+                if info_by_key:
+                    emit("media_info", info_by_key)
+
+        pending: list[str] = []
+        try:
+            for keys in key_batches:
+                pending.extend(keys)
+                while len(pending) >= self.group_size:
+                    group, pending = pending[: self.group_size], pending[self.group_size :]
+                    while len(inflight) >= self.concurrency:
+                        collect(None)
+                    inflight.add(executor.submit(self._fetch_group, group))
+                if inflight:
+                    collect(0)
+            if pending:
+                inflight.add(executor.submit(self._fetch_group, pending))
+            while inflight:
+                collect(None)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_group(self, keys: list[str]) -> Optional[dict[str, Any]]:
+        chunks = [keys[idx : idx + self.batch_size] for idx in range(0, len(keys), self.batch_size)]
+        with self._lock:
+            self.requested_keys += len(keys)
+        for attempt in range(1, self.retries + 2):
+            with self._lock:
+                self.requests += 1
+                self.retried_requests += attempt > 1
+            try:
+                results = self.fetch(chunks)
+            except CircuitOpenError:
+                break
+            except Exception:
+                if attempt > self.retries:
+                    break
+                time.sleep(throttle_backoff_seconds(attempt, settings.rpc_retry_base_delay_ms, None))
+                continue
+            found = {
+                str(row["mediaKey"]): row
+                for rows in results
+                for row in (rows if isinstance(rows, list) else [])
+                if isinstance(row, dict) and row.get("mediaKey")
+            }
+            with self._lock:
+                self.found_keys += len(found)
+            return found
+        with self._lock:
+            self.failed_keys += len(keys)
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            return {
+                "requested_keys": self.requested_keys,
+                "skipped_keys": self.skipped_keys,
+                "found_keys": self.found_keys,
+                "failed_keys": self.failed_keys,
+                "requests": self.requests,
+                "retried_requests": self.retried_requests,
+                "keys_per_second": round(self.requested_keys / elapsed, 1) if elapsed > 0 else 0.0,
+            }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (
+            f"Pulled metadata for {stats['requested_keys']} items ({stats['keys_per_second']:.0f}/s), "
+            f"skipped {stats['skipped_keys']} already known, {stats['failed_keys']} failed"
+        )
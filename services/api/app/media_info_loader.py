@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Iterable, Optional
+
+from .config import settings
+
+# Fetches parsed get_batch_media_info rows for each chunk of media keys, one result list per chunk.
+BatchFetch = Callable[[list[list[str]]], list[Any]]
+
+
+class MediaInfoLoader:
+    # DataLoader-style coalescing: the first caller to queue keys becomes the dispatcher, waits one window so
+    # concurrent callers can add theirs, then fetches every distinct queued key and fans results back out.
+    def __init__(self, window_seconds: float, batch_size: int, batches_per_request: int) -> None:
+        self.window_seconds = window_seconds
+        self.batch_size = max(batch_size, 1)
+        self.batches_per_request = max(batches_per_request, 1)
+        self._lock = threading.Lock()
+        self._pending: dict[str, Future[Optional[dict[str, Any]]]] = {}
+        self._inflight: dict[str, Future[Optional[dict[str, Any]]]] = {}
+        self._dispatching = False
+        self.requested_keys = 0
+        self.coalesced_keys = 0
+        self.fetched_keys = 0
+        self.dispatches = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    def load_many(self, media_keys: Iterable[str], fetch: BatchFetch) -> dict[str, Optional[dict[str, Any]]]:
+        futures: dict[str, Future[Optional[dict[str, Any]]]] = {}
+        lead = False
+        with self._lock:
+            for media_key in dict.fromkeys(media_keys):
+                self.requested_keys += 1
+                future = self._pending.get(media_key) or self._inflight.get(media_key)
+                if future is None:
+                    future = Future()
+                    self._pending[media_key] = future
+                else:
+                    self.coalesced_keys += 1
+                futures[media_key] = future
+            if self._pending and not self._dispatching:
+                self._dispatching = lead = True
+
+        if lead:
+            self._dispatch(fetch)
+        return {media_key: future.result() for media_key, future in futures.items()}
+
+    def _dispatch(self, fetch: BatchFetch) -> None:
+        while True:
+            time.sleep(self.window_seconds)
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                if not batch:
+                    self._dispatching = False
+                    return
+                self._inflight.update(batch)
+                self.dispatches += 1
+
+            keys = list(batch)
+            chunks = [keys[idx : idx + self.batch_size] for idx in range(0, len(keys), self.batch_size)]
+            try:
+                found: dict[str, Any] = {}
+                for start in range(0, len(chunks), self.batches_per_request):
+                    for rows in fetch(chunks[start : start + self.batches_per_request]):
+                        for row in rows if isinstance(rows, list) else []:
+                            if isinstance(row, dict) and row.get("mediaKey"):
+                                found[str(row["mediaKey"])] = row
+                for media_key, future in batch.items():
+                    future.set_result(found.get(media_key))
+            except BaseException as exc:  # noqa: BLE001 - every waiter must be released, including on cancellation
+                for future in batch.values():
+                    if not future.done():
+                        future.set_exception(exc)
+            finally:
+                with self._lock:
+                    for media_key in batch:
+                        self._inflight.pop(media_key, None)
+                    self.fetched_keys += len(keys)
+                    self.batches += len(chunks)
+                    self.largest_batch = max(self.largest_batch, max(len(chunk) for chunk in chunks))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requested_keys": self.requested_keys,
+                "coalesced_keys": self.coalesced_keys,
+                "fetched_keys": self.fetched_keys,
+                "dispatches": self.dispatches,
+                "batches": self.batches,
+                "avg_batch_size": round(self.fetched_keys / self.batches, 1) if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+            }
+
+
+class MediaInfoLoaderRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loaders: dict[str, MediaInfoLoader] = {}
+
+    def get(self, account_key: str) -> MediaInfoLoader:
+        with self._lock:
+            loader = self._loaders.get(account_key)
+            if loader is None:
+                loader = MediaInfoLoader(
+                    window_seconds=settings.media_info_window_ms / 1000.0,
+                    batch_size=settings.media_info_batch_size,
+                    batches_per_request=settings.media_info_batches_per_request,
+                )
+                self._loaders[account_key] = loader
+            return loader
+
+    def stats(self, account_key: str) -> dict[str, Any]:
+        return self.get(account_key).stats()
+
+
+media_info_loaders = MediaInfoLoaderRegistry()
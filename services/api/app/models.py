@@ -87,6 +87,10 @@ class AlbumIndex(Base):
     modified_timestamp: Mapped[Optional[int]] = mapped_column(nullable=True)
     is_shared: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     thumb: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # modifiedTimestamp and itemCount as of the last member sync; an album whose listing still matches is not re-paged.
+    members_modified_timestamp: Mapped[Optional[int]] = mapped_column(nullable=True)
+    members_item_count: Mapped[Optional[int]] = mapped_column(nullable=True)
+    members_synced_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False, index=True)
@@ -122,6 +126,33 @@ class MediaIndex(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False, index=True)
 
 
+class IndexSyncState(Base):
+    __tablename__ = "index_sync_state"
+
+    account_id: Mapped[str] = mapped_column(String(36), ForeignKey("accounts.id"), primary_key=True)
+
+    # Newest upload (creationTimestamp) already in media_index; delta refreshes stop paging once they pass it.
+    library_watermark: Mapped[Optional[int]] = mapped_column(nullable=True)
+    # Digest of each source's first page from the last refresh, compared by the change probe.
+    fingerprints: Mapped[Any] = mapped_column(JSON, default=dict, nullable=False)
+    last_full_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_delta_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False)
+
+
+class RpcThrottleState(Base):
+    __tablename__ = "rpc_throttle_state"
+
+    # Last throttle any process saw for the account, read by every process's rate limiter. Times are epoch
+    # seconds so processes compare them without timezone handling.
+    account_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    rate: Mapped[float] = mapped_column(Float, nullable=False)
+    throttled_until: Mapped[float] = mapped_column(Float, nullable=False)
+    updated_at: Mapped[float] = mapped_column(Float, nullable=False)
+
+
 class PreviewAction(Base):
     __tablename__ = "preview_actions"
 
@@ -85,6 +85,22 @@ def catalog_entries() -> list[dict[str, Any]]:
             "destructive": False,
             "notes": ["Use when operation is not covered by presets."],
         },
+        {
+            "provider": "gptk",
+            "operation": "gptk.rpc_batch",
+            "description": "Advanced: execute many arbitrary GPTK RPCs in one job.",
+            "params_template": {
+                "calls": [{"rpcid": "EzwWhf", "requestData": [], "sourcePath": "/"}],
+                "concurrency": 3,
+                "packSize": 10,
+                "forceBootstrap": False,
+            },
+            "destructive": False,
+            "notes": [
+                "Calls sharing a sourcePath are packed up to packSize per batchexecute request.",
+                "Per-entry results and errors are written to the job result as requests finish.",
+            ],
+        },
     ]
 
     entries.extend(gptk_catalog_entries())
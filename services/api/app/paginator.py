@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+
+# Fetches one page by pageId (None for the first) and returns a GptkCallResult. It may run on the
+# prefetch thread, so it must not touch the consumer's DB session.
+PageFetch = Callable[[Optional[str]], Any]
+
+
+@dataclass
+class Page:
+    # A list of items, or a {field: column} dict when the page was decoded columnar.
+    items: Any
+    next_page_id: Optional[str]
+    result: Any
+
+
+def page_size(items: Any) -> int:
+    if isinstance(items, dict):
+        return len(next(iter(items.values()), ()))
+    return len(items) if isinstance(items, list) else 0
+
+
+def _trim(items: Any, limit: int) -> Any:
+    if isinstance(items, dict):
+        return {name: column[:limit] for name, column in items.items()}
+    return items[:limit]
+
+
+def _page(result: Any) -> Page:
+    data = result.data
+    if not isinstance(data, dict):
+        return Page(items=[], next_page_id=None, result=result)
+    items = data.get("items")
+    return Page(items=items if isinstance(items, (list, dict)) else [], next_page_id=data.get("nextPageId"), result=result)
+
+
+def paginate(
+    fetch: PageFetch,
+    *,
+    max_items: Optional[int] = None,
+    prefetch: bool = True,
+    page_id: Optional[str] = None,
+) -> Iterator[Page]:
+    """Yield pages until one is empty, has no nextPageId, or max_items is reached (the last page is trimmed to fit).
+
+    With prefetch, page N+1 is requested on a background thread before page N is handed to the consumer, so the
+    RPC round trip overlaps with whatever the consumer does with page N.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch") if prefetch else None
+    pending: Optional[Future[Any]] = None
+    remaining = max_items
+    try:
+        result = fetch(page_id)
+        while True:
+            page = _page(result)
+            size = page_size(page.items)
+            if not size:
+                return
+            if remaining is not None:
+                if size > remaining:
+                    page.items = _trim(page.items, remaining)
+                    size = remaining
+                remaining -= size
+            more = bool(page.next_page_id) and (remaining is None or remaining > 0)
+            if more and executor is not None:
+                pending = executor.submit(fetch, page.next_page_id)
+            yield page
+            if not more:
+                return
+            result = pending.result() if pending is not None else fetch(page.next_page_id)
+            pending = None
+    finally:
+        # A consumer that stops early leaves at most one prefetched page behind; it is dropped, not awaited.
+        if pending is not None:
+            pending.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
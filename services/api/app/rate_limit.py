@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
+
+from .config import settings
+
+# Throttle state shared between processes (API and worker) through storage. The loader returns
+# (rate, throttled_until, updated_at) for an account and the saver records the same; times are epoch seconds.
+ThrottleLoader = Callable[[str], Optional[tuple[float, float, float]]]
+ThrottleSaver = Callable[[str, float, float, float], None]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def is_throttle_status(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+def throttle_backoff_seconds(attempt: int, base_delay_ms: int, retry_after: Optional[float]) -> float:
+    ceiling = min(base_delay_ms * (2 ** max(attempt - 1, 0)), settings.rpc_backoff_max_ms) / 1000.0
+    delay = random.uniform(ceiling / 2, ceiling)
+    return max(delay, retry_after or 0.0)
+
+
+class SharedThrottle:
+    # Links the per-process buckets of one account: a throttle seen anywhere is saved, and every bucket reads the
+    # saved state at most once per interval, adopting a lower rate and any Retry-After cooldown still running.
+    # Saves go through one background thread so neither a worker thread nor the event loop waits on storage.
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.loader: Optional[ThrottleLoader] = None
+        self.saver: Optional[ThrottleSaver] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0 and self.loader is not None
+
+    def load(self, key: str) -> Optional[tuple[float, float, float]]:
+        if self.loader is None:
+            return None
+        try:
+            return self.loader(key)
+        except Exception:  # noqa: BLE001 - storage trouble must not stop RPCs; the local bucket still applies
+            return None
+
+    def save(self, key: str, rate: float, throttled_until: float, updated_at: float) -> None:
+        if self.saver is None or self.interval <= 0:
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-share")
+            executor = self._executor
+        executor.submit(self._save, key, rate, throttled_until, updated_at)
+
+    def _save(self, key: str, rate: float, throttled_until: float, updated_at: float) -> None:
+        try:
+            self.saver(key, rate, throttled_until, updated_at)  # type: ignore[misc]
+        except Exception:  # noqa: BLE001
+            pass
+
+
+class AdaptiveRateLimiter:
+    # Token bucket whose refill rate follows AIMD: +increase_step req/s per success, *decrease_factor per throttle.
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: float,
+        increase_step: float,
+        decrease_factor: float,
+        key: str = "",
+        shared: Optional[SharedThrottle] = None,
+    ) -> None:
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.burst = max(burst, 1.0)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+        self.key = key
+        self.shared = shared
+        self._shared_checked = 0.0
+        # Saved throttles older than the longest backoff say nothing about the current rate.
+        self._shared_seen = time.time() - settings.rpc_backoff_max_ms / 1000.0
+        self.successes = 0
+        self.throttles = 0
+        self.shared_throttles = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1.0
+            wait = max(self._cooldown_until - now, 0.0)
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            self.waited_seconds += wait
+            return wait
+
+    def _shared_due(self) -> bool:
+        if self.shared is None or not self.shared.enabled:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._shared_checked < self.shared.interval:
+                return False
+            self._shared_checked = now
+            return True
+
+    def _sync_shared(self) -> None:
+        row = self.shared.load(self.key) if self.shared is not None else None
+        if row is None:
+            return
+        rate, throttled_until, updated_at = row
+        with self._lock:
+            if updated_at <= self._shared_seen:
+                return
+            self._shared_seen = updated_at
+            self.shared_throttles += 1
+            self.rate = min(self.rate, max(self.min_rate, rate))
+            remaining = throttled_until - time.time()
+            if remaining > 0:
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + remaining)
+
+    def acquire(self) -> None:
+        if self._shared_due():
+            self._sync_shared()
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        if self._shared_due():
+            await asyncio.to_thread(self._sync_shared)
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._cooldown_until or self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.throttles += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._cooldown_until = max(self._cooldown_until, now + retry_after)
+            rate = self.rate
+            updated_at = time.time()
+            throttled_until = updated_at + max(self._cooldown_until - now, 0.0)
+            # This bucket already applied its own throttle; reading it back must not count it as a peer's.
+            self._shared_seen = max(self._shared_seen, updated_at)
+        if self.shared is not None:
+            self.shared.save(self.key, rate, throttled_until, updated_at)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "rate_per_second": round(self.rate, 3),
+                "tokens": round(self._tokens, 3),
+                "cooldown_seconds": round(max(self._cooldown_until - now, 0.0), 3),
+                "successes": self.successes,
+                "throttles": self.throttles,
+                "shared_throttles": self.shared_throttles,
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
+
+
+class RateLimiterRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._limiters: dict[str, AdaptiveRateLimiter] = {}
+        self.shared = SharedThrottle(settings.rpc_rate_share_seconds)
+
+    def set_store(self, loader: Optional[ThrottleLoader], saver: Optional[ThrottleSaver]) -> None:
+        self.shared.loader = loader
+        self.shared.saver = saver
+
+    def get(self, account_key: str) -> AdaptiveRateLimiter:
+        with self._lock:
+            limiter = self._limiters.get(account_key)
+            if limiter is None:
+                limiter = AdaptiveRateLimiter(
+                    rate=settings.rpc_rate_initial,
+                    min_rate=settings.rpc_rate_min,
+                    max_rate=settings.rpc_rate_max,
+                    burst=settings.rpc_rate_burst,
+                    increase_step=settings.rpc_rate_increase_step,
+                    decrease_factor=settings.rpc_rate_decrease_factor,
+                    key=account_key,
+                    shared=self.shared,
+                )
+                self._limiters[account_key] = limiter
+            return limiter
+
+    def snapshot(self, account_key: str) -> dict[str, Any]:
+        return self.get(account_key).snapshot()
+
+
+rate_limiters = RateLimiterRegistry()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Callable
+
+# Producers hand (kind, payload) messages to emit, which blocks while the queue is full.
+Emit = Callable[[str, Any], None]
+# Writes one message's payload on the writer thread and returns how many rows it touched.
+Handler = Callable[[Any], int]
+
+_DONE = "_done"
+_FAILED = "_failed"
+
+
+class _Stopped(Exception):
+    pass
+
+
+class WritePipeline:
+    # Concurrent producers feeding a single writer. Producers fetch on their own threads and emit messages into a
+    # bounded queue; the thread that calls drain() is the only one that touches the database. It commits once
+    # commit_rows rows are pending or the queue runs dry, so network and SQLite work overlap. Messages from one
+    # producer are written in the order it emitted them.
+    def __init__(self, max_pending: int, commit_rows: int) -> None:
+        self.commit_rows = max(commit_rows, 1)
+        self._queue: queue.Queue[tuple[str, Any]] = queue.Queue(maxsize=max(max_pending, 1))
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._running = 0
+        self.messages = 0
+        self.rows = 0
+        self.commits = 0
+        self.max_depth = 0
+
+    def start(self, name: str, produce: Callable[[Emit], None]) -> None:
+        # Safe to call from a running producer: the child is counted before the parent can report done.
+        with self._lock:
+            self._running += 1
+        threading.Thread(target=self._produce, args=(produce,), name=f"refresh-{name}", daemon=True).start()
+
+    def _put(self, message: tuple[str, Any]) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(message, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Stopped()
+
+    def emit(self, kind: str, payload: Any) -> None:
+        self._put((kind, payload))
+
+    def _produce(self, produce: Callable[[Emit], None]) -> None:
+        try:
+            produce(self.emit)
+            self._put((_DONE, None))
+        except _Stopped:
+            pass
+        except BaseException as exc:  # noqa: BLE001 - surfaced on the writer thread
+            try:
+                self._put((_FAILED, exc))
+            except _Stopped:
+                pass
+
+    def drain(self, handlers: dict[str, Handler], commit: Callable[[], None]) -> None:
+        pending = 0
+        try:
+            while True:
+                with self._lock:
+                    if self._running == 0:
+                        break
+                self.max_depth = max(self.max_depth, self._queue.qsize())
+                kind, payload = self._queue.get()
+                if kind == _DONE:
+                    with self._lock:
+                        self._running -= 1
+                    continue
+                if kind == _FAILED:
+                    raise payload
+                self.messages += 1
+                pending += handlers[kind](payload)
+                if pending >= self.commit_rows or self._queue.empty():
+                    commit()
+                    self.commits += 1
+                    self.rows += pending
+                    pending = 0
+            commit()
+            self.commits += 1
+            self.rows += pending
+        finally:
+            # Producers blocked on a full queue give up; one mid-RPC stops at its next emit.
+            self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def stats(self) -> dict[str, int]:
+        return {"messages": self.messages, "rows": self.rows, "commits": self.commits, "max_queue_depth": self.max_depth}
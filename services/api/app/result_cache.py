@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .adapters.gptk_methods import METHODS
+from .config import settings
+from .jsoncodec import dumps
+from .operation_safety import is_operation_destructive
+
+# Params that shape parsing or session handling but not the RPC response, so they stay out of the key.
+_UNKEYED_PARAMS = {"fields", "lazy", "columnar", "sourcePath", "forceBootstrap", "chunkSize"}
+_COUNTERS = ("hits", "misses", "stores", "evictions", "expirations", "invalidations")
+
+
+@dataclass
+class _CachedResult:
+    raw: Any
+    size: int
+    expires_at: float
+
+
+def _short(operation: str) -> str:
+    return operation.replace("gptk.", "").strip()
+
+
+def cache_key(operation: str, params: dict[str, Any]) -> Optional[str]:
+    method = METHODS.get(_short(operation))
+    if method is None or method.cache_ttl_seconds <= 0 or params.get("forceBootstrap"):
+        return None
+    merged = {**method.params_template, **params}
+    normalized = {name: value for name, value in merged.items() if value is not None and name not in _UNKEYED_PARAMS}
+    return f"{method.operation}:{json.dumps(normalized, sort_keys=True, separators=(',', ':'), default=str)}"
+
+
+def writes(operation: str) -> bool:
+    # rpc_execute can send anything, so it counts as a write alongside every method not marked read_only.
+    method = METHODS.get(_short(operation))
+    return is_operation_destructive(operation) or method is None or not method.read_only
+
+
+class GptkResultCache:
+    # Read-through cache of raw RPC payloads for read-only methods that declare cache_ttl_seconds. Entries are
+    # keyed by (account, operation, params), evicted least-recently-used once their serialized size passes
+    # max_bytes, and dropped for an account whenever a write runs against it. Callers parse on every hit, so
+    # field projections and lazy/columnar decoding share one entry.
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], _CachedResult] = OrderedDict()
+        self._bytes = 0
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def _count(self, account_key: str, name: str, amount: int = 1) -> None:
+        counters = self._counters.setdefault(account_key, dict.fromkeys(_COUNTERS, 0))
+        counters[name] += amount
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, account_key: str, operation: str, params: dict[str, Any]) -> Optional[Any]:
+        key = cache_key(operation, params)
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get((account_key, key))
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._drop((account_key, key))
+                self._count(account_key, "expirations")
+                entry = None
+            if entry is None:
+                self._count(account_key, "misses")
+                return None
+            self._entries.move_to_end((account_key, key))
+            self._count(account_key, "hits")
+            return entry.raw
+
+    def put(self, account_key: str, operation: str, params: dict[str, Any], raw: Any) -> None:
+        key = cache_key(operation, params)
+        if key is None or raw is None:
+            return
+        size = len(dumps(raw)) + len(key)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + METHODS[_short(operation)].cache_ttl_seconds
+        with self._lock:
+            if (account_key, key) in self._entries:
+                self._drop((account_key, key))
+            self._entries[(account_key, key)] = _CachedResult(raw=raw, size=size, expires_at=expires_at)
+            self._bytes += size
+            self._count(account_key, "stores")
+            while self._bytes > self.max_bytes:
+                evicted_key = next(iter(self._entries))
+                self._drop(evicted_key)
+                self._count(evicted_key[0], "evictions")
+
+    def invalidate(self, account_key: str) -> int:
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == account_key]
+            for key in stale:
+                self._drop(key)
+            if stale:
+                self._count(account_key, "invalidations", len(stale))
+            return len(stale)
+
+    def note_operation(self, account_key: str, operation: str) -> None:
+        if writes(operation):
+            self.invalidate(account_key)
+
+    def stats(self, account_key: str) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters.get(account_key) or dict.fromkeys(_COUNTERS, 0))
+            entries = [entry for key, entry in self._entries.items() if key[0] == account_key]
+            lookups = counters["hits"] + counters["misses"]
+            return {
+                **counters,
+                "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(entries),
+                "bytes": sum(entry.size for entry in entries),
+                "total_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+result_cache = GptkResultCache(max_bytes=settings.result_cache_max_bytes)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import json
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -10,6 +9,7 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from .. import jsoncodec
 from ..config import settings
 from ..database import engine, get_session
 from ..models import Account, Job
@@ -83,7 +83,7 @@ async def stream_jobs(
                 for row in rows:
                     cursor = row.updated_at
                     payload = job_to_out(row).model_dump(mode="json")
-                    yield f"data: {json.dumps(payload)}\n\n"
+                    yield f"data: {jsoncodec.dumps(payload)}\n\n"
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
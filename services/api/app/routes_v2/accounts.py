@@ -1,15 +1,24 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Any
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from ..auth_store import set_cookie_jar, set_gpmc_auth
+from ..circuit_breaker import circuit_breakers
+from ..credential_cache import credential_cache
 from ..cookies import parse_cookie_string, parse_netscape_cookie_file
 from ..database import get_session
+from ..gphotos_rpc import client_registry
 from ..gptk_service import GptkService
+from ..hedging import latency_windows
+from ..media_info_loader import media_info_loaders
+from ..rate_limit import rate_limiters
+from ..result_cache import result_cache
+from ..session_cache import session_cache
 from ..models import Account
 from ..schemas import (
     AccountCreate,
@@ -117,3 +126,19 @@ def refresh_session(
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
     return SessionRefreshResponse(account_id=account_id, session_state=state)
+
+
+@router.get("/{account_id}/rpc/stats")
+def get_rpc_stats(account_id: str, session: Session = Depends(get_session)) -> dict[str, Any]:
+    _require_account(session, account_id)
+    return {
+        "account_id": account_id,
+        "connections": client_registry.stats(account_id),
+        "credentials": credential_cache.stats(account_id),
+        "session": session_cache.stats(account_id),
+        "rate_limit": rate_limiters.snapshot(account_id),
+        "circuit": circuit_breakers.snapshot(account_id),
+        "latency": latency_windows.snapshot(account_id),
+        "media_info": media_info_loaders.stats(account_id),
+        "result_cache": result_cache.stats(account_id),
+    }
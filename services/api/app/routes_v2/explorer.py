@@ -111,6 +111,7 @@ def refresh_index(payload: ExplorerIndexRefreshRequest, session: Session = Depen
             "max_items": payload.max_items,
             "include_album_members": payload.include_album_members,
             "force_full": payload.force_full,
+            "incremental": payload.incremental,
             "confirmed": True,
         },
         dry_run=False,
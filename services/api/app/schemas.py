@@ -163,6 +163,7 @@ class ExplorerIndexRefreshRequest(BaseModel):
     max_items: int = Field(default=3000, ge=100, le=50000)
     include_album_members: bool = False
     force_full: bool = False
+    incremental: bool = True
 
 
 class ActionPreviewRequest(BaseModel):
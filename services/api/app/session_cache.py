@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+# Returns (state, obtained_at epoch seconds) for an account from shared storage, or None.
+SessionLoader = Callable[[str], Optional[tuple[dict[str, Any], Optional[float]]]]
+
+
+@dataclass
+class _SessionEntry:
+    state: dict[str, Any] = field(default_factory=dict)
+    version: int = 0
+    persisted_version: int = 0
+    obtained_at: Optional[float] = None
+    bootstraps: int = 0
+    coalesced: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    persist_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class SessionStateCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, _SessionEntry] = {}
+        self._loader: Optional[SessionLoader] = None
+
+    def set_loader(self, loader: Optional[SessionLoader]) -> None:
+        self._loader = loader
+
+    def _entry(self, key: str) -> _SessionEntry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _SessionEntry()
+                self._entries[key] = entry
+            return entry
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, key: str) -> dict[str, Any]:
+        return dict(self._entry(key).state)
+
+    def seed(self, key: str, state: dict[str, Any], obtained_at: Optional[float] = None) -> None:
+        entry = self._entry(key)
+        with entry.lock:
+            if entry.version or not state:
+                return
+            entry.state = dict(state)
+            entry.version = entry.persisted_version = 1
+            entry.obtained_at = obtained_at
+
+    def update(self, key: str, state: dict[str, Any]) -> int:
+        entry = self._entry(key)
+        with entry.lock:
+            if state and state != entry.state:
+                entry.state = dict(state)
+                entry.version += 1
+                entry.obtained_at = time.time()
+            return entry.version
+
+    def bootstrap(
+        self,
+        key: str,
+        fetch: Callable[[], dict[str, Any]],
+        stale_state: Optional[dict[str, Any]] = None,
+        force: bool = False,
+    ) -> dict[str, Any]:
+        entry = self._entry(key)
+        with entry.lock:
+            if not force and entry.state.get("fSid") and entry.state != (stale_state or {}):
+                # Another caller refreshed while this one waited for the lock.
+                entry.coalesced += 1
+                return dict(entry.state)
+
+            if not force and self._loader is not None:
+                loaded = self._loader(key)
+                if loaded is not None:
+                    state, obtained_at = loaded
+                    if state.get("fSid") and state != entry.state and state != (stale_state or {}):
+                        # Another process already persisted a fresher session.
+                        entry.state = dict(state)
+                        entry.version += 1
+                        entry.persisted_version = entry.version
+                        entry.obtained_at = obtained_at
+                        entry.coalesced += 1
+                        return dict(entry.state)
+
+            state = fetch()
+            entry.state = dict(state)
+            entry.version += 1
+            entry.obtained_at = time.time()
+            entry.bootstraps += 1
+            return dict(state)
+
+    def pending_persist(self, key: str) -> Optional[tuple[int, dict[str, Any]]]:
+        entry = self._entry(key)
+        with entry.lock:
+            if entry.version == entry.persisted_version or not entry.state:
+                return None
+            return entry.version, dict(entry.state)
+
+    def persist_lock(self, key: str) -> threading.Lock:
+        # Held around writing an account's state to storage, so concurrent callers don't both insert its first row.
+        return self._entry(key).persist_lock
+
+    def mark_persisted(self, key: str, version: int) -> None:
+        entry = self._entry(key)
+        with entry.lock:
+            entry.persisted_version = max(entry.persisted_version, version)
+
+    def age_seconds(self, key: str) -> Optional[float]:
+        entry = self._entry(key)
+        if not entry.state.get("fSid") or entry.obtained_at is None:
+            return None
+        return max(time.time() - entry.obtained_at, 0.0)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self, key: str) -> dict[str, Any]:
+        entry = self._entry(key)
+        age = self.age_seconds(key)
+        return {
+            "version": entry.version,
+            "persisted_version": entry.persisted_version,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "bootstraps": entry.bootstraps,
+            "coalesced_bootstraps": entry.coalesced,
+        }
+
+
+session_cache = SessionStateCache()
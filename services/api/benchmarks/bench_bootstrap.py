@@ -0,0 +1,63 @@
+"""Compare the six-regex bootstrap extraction on a full page with the streaming single-pass WizValueScanner.
+
+Run from services/api: python -m benchmarks.bench_bootstrap [--size-kib 600] [--wiz-offset-kib 40] [--rounds 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from typing import Any, Optional
+
+from app.gphotos_rpc import STREAM_CHUNK_SIZE, RpcSession, WizValueScanner, session_from_chunks
+
+from .bench_wrb_stream import _chunked, _report
+from .payloads import bootstrap_page
+
+
+def _legacy_extract(html: str, key: str) -> Optional[str]:
+    match = re.search(rf'"{re.escape(key)}":"([^\"]+)"', html)
+    if not match:
+        return None
+    return match.group(1).replace("\\u003d", "=").replace("\\u0026", "&").replace("\\/", "/")
+
+
+def _legacy_session(chunks: list[bytes]) -> dict[str, Any]:
+    # What bootstrap_session did before: read the whole body, decode it, then scan it once per key.
+    html = b"".join(chunks).decode("utf-8")
+    return RpcSession(
+        account=_legacy_extract(html, "oPEP7c"),
+        f_sid=_legacy_extract(html, "FdrFJe") or "",
+        bl=_legacy_extract(html, "cfb2h") or "",
+        path=_legacy_extract(html, "eptZe") or "/_/PhotosUi/",
+        at=_legacy_extract(html, "SNlM0e") or "",
+        rapt=_legacy_extract(html, "Dbw5Ud"),
+    ).as_dict()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-kib", type=int, default=600)
+    parser.add_argument("--wiz-offset-kib", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    chunks = _chunked(bootstrap_page(args.size_kib, args.wiz_offset_kib).encode("utf-8"))
+    assert _legacy_session(chunks) == session_from_chunks(chunks)
+
+    scanner = WizValueScanner()
+    for chunk in chunks:
+        if scanner.feed(chunk):
+            break
+    total = sum(len(chunk) for chunk in chunks)
+    print(f"read {scanner.bytes_scanned / 1024:.0f} of {total / 1024:.0f} KiB before stopping ({STREAM_CHUNK_SIZE // 1024} KiB chunks)")
+
+    _report(
+        "bootstrap extraction",
+        [("six re.search scans", lambda: _legacy_session(chunks)), ("WizValueScanner", lambda: session_from_chunks(chunks))],
+        args.rounds,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Rows/sec for media_index writes: the per-row ORM path refresh_index used before, against index_writer's executemany upserts.
+
+Run from services/api: python -m benchmarks.bench_index_writer [--sizes 10000,100000,1000000] [--orm-max 100000]
+
+Each size runs on a fresh SQLite file: an insert pass (every row new), an upsert pass (every row conflicts) and a
+media-info pass (batched UPDATE). The ORM path is skipped above --orm-max, where it would dominate the run time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import jsoncodec
+from app.index_writer import apply_media_info, media_type_from_payload, upsert_media
+from app.models import Account, Base, MediaIndex
+
+ACCOUNT_ID = "bench-account"
+
+
+def _items(count: int, generation: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "mediaKey": f"AF1Qip{idx:012d}",
+            "dedupKey": f"dedup{idx:012d}",
+            "timestamp": 1_600_000_000_000 + idx,
+            "timezoneOffset": 3_600_000,
+            "creationTimestamp": 1_700_000_000_000 + idx + generation,
+            "thumb": f"https://lh3.googleusercontent.com/pw/thumb{idx}",
+            "isArchived": idx % 17 == 0,
+            "isFavorite": idx % 11 == 0,
+            "duration": 12_000 if idx % 9 == 0 else None,
+        }
+        for idx in range(count)
+    ]
+
+
+def _infos(items: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    return {
+        item["mediaKey"]: {"mediaKey": item["mediaKey"], "fileName": f"IMG_{idx}.jpg", "size": 2_000_000 + idx, "takesUpSpace": True}
+        for idx, item in enumerate(items)
+    }
+
+
+def _orm_upsert(session: Session, items: list[dict[str, Any]]) -> None:
+    # The loop refresh_index ran before index_writer: one SELECT and one INSERT/UPDATE per row.
+    for item in items:
+        row = session.get(MediaIndex, {"account_id": ACCOUNT_ID, "media_key": item["mediaKey"]})
+        if row is None:
+            row = MediaIndex(account_id=ACCOUNT_ID, media_key=item["mediaKey"])
+            session.add(row)
+        row.dedup_key = item.get("dedupKey") or row.dedup_key
+        row.timestamp_taken = item.get("timestamp") or row.timestamp_taken
+        row.timestamp_uploaded = item.get("creationTimestamp") or row.timestamp_uploaded
+        row.timezone_offset = item.get("timezoneOffset") or row.timezone_offset
+        row.thumb_url = item.get("thumb") or row.thumb_url
+        row.is_archived = bool(item.get("isArchived") or False)
+        row.is_favorite = bool(item.get("isFavorite") or row.is_favorite)
+        row.is_trashed = False
+        row.source = "library"
+        row.media_type = media_type_from_payload(row.file_name, item.get("duration"))
+        row.raw_item = item
+    session.commit()
+
+
+def _bulk_upsert(session: Session, items: list[dict[str, Any]]) -> None:
+    upsert_media(session, ACCOUNT_ID, items, source="library", is_trashed=False)
+    session.commit()
+
+
+def _bulk_media_info(session: Session, infos: dict[str, dict[str, Any]]) -> None:
+    apply_media_info(session, ACCOUNT_ID, infos)
+    session.commit()
+
+
+def _engine(path: Path) -> Engine:
+    engine = create_engine(f"sqlite:///{path}", json_serializer=jsoncodec.dumps, json_deserializer=jsoncodec.loads)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Account(id=ACCOUNT_ID, label="bench"))
+        session.commit()
+    return engine
+
+
+def _rate(engine: Engine, count: int, write: Callable[[Session], None]) -> float:
+    with Session(engine) as session:
+        started = time.perf_counter()
+        write(session)
+        return count / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--orm-max", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"  {'rows':>9}  {'path':>10}  {'insert rows/s':>14}  {'upsert rows/s':>14}  {'media info rows/s':>18}")
+    for count in (int(size) for size in args.sizes.split(",")):
+        first, second = _items(count, 0), _items(count, 1)
+        infos = _infos(first)
+        paths: list[tuple[str, Callable[[Session, list[dict[str, Any]]], None]]] = [("bulk", _bulk_upsert)]
+        if count <= args.orm_max:
+            paths.insert(0, ("orm", _orm_upsert))
+        for name, upsert in paths:
+            with tempfile.TemporaryDirectory() as tmp:
+                engine = _engine(Path(tmp) / "bench.db")
+                inserted = _rate(engine, count, lambda session: upsert(session, first))  # noqa: B023
+                updated = _rate(engine, count, lambda session: upsert(session, second))  # noqa: B023
+                enriched = _rate(engine, count, lambda session: _bulk_media_info(session, infos)) if name == "bulk" else None  # noqa: B023
+                engine.dispose()
+            enriched_text = f"{enriched:>18,.0f}" if enriched is not None else f"{'-':>18}"
+            print(f"  {count:>9,}  {name:>10}  {inserted:>14,.0f}  {updated:>14,.0f}  {enriched_text}")
+
+
+if __name__ == "__main__":
+    main()
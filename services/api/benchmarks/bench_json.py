@@ -0,0 +1,68 @@
+"""Per-page JSON cost of the RPC decode/encode path and the JSON columns for each available codec backend.
+
+Run from services/api: python -m benchmarks.bench_json [--items 500] [--rounds 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Any, Callable
+
+from app import jsoncodec
+from app.gphotos_rpc import batch_envelopes, build_batchexecute_request, iter_wrb_frames
+from app.gptk_parser import parse_response
+
+from .bench_wrb_stream import _chunked, _measure
+from .payloads import library_page, wrb_response_body
+
+SESSION = {"fSid": "123", "bl": "boq_photosuiserver", "path": "/_/PhotosUi/", "at": "token:1"}
+
+
+def _baseline() -> tuple[Callable[[Any], str], Callable[[Any], Any]]:
+    # What the code did before the codec layer: stdlib with its default separators.
+    return json.dumps, json.loads
+
+
+def _with_codec(dumps: Callable[[Any], str], loads: Callable[[Any], Any], fn: Callable[[], Any]) -> Callable[[], Any]:
+    def run() -> Any:
+        saved = jsoncodec.dumps, jsoncodec.loads
+        jsoncodec.dumps, jsoncodec.loads = dumps, loads
+        try:
+            return fn()
+        finally:
+            jsoncodec.dumps, jsoncodec.loads = saved
+
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    page = library_page(args.items)
+    chunks = _chunked(wrb_response_body([("EzkLib", "generic", page)]).encode("utf-8"))
+    parsed = parse_response("EzkLib", page)
+    stored = json.dumps(parsed)
+    calls = [("EzkLib", ["", [[4, "ra", 0, 0]], None])] * 4
+
+    cases: list[tuple[str, Callable[[], Any]]] = [
+        ("decode wrb page", lambda: next(iter_wrb_frames(chunks))[1]),
+        ("encode f.req x4", lambda: build_batchexecute_request(SESSION, batch_envelopes(calls), "/")),
+        ("JSON column write", lambda: jsoncodec.dumps(parsed)),
+        ("JSON column read", lambda: jsoncodec.loads(stored)),
+    ]
+    backends = [("stdlib (before)", *_baseline())] + [(name, *jsoncodec.codec(name)) for name in jsoncodec.available_backends()]
+
+    size_kib = sum(len(chunk) for chunk in chunks) / 1024
+    print(f"{args.items} items, {size_kib:.0f} KiB body; active backend: {jsoncodec.BACKEND}")
+    print(f"  {'':>18}" + "".join(f"{name:>18}" for name, _, _ in backends))
+    for label, fn in cases:
+        row = [_measure(_with_codec(dumps, loads, fn), args.rounds)[0] for _, dumps, loads in backends]
+        print(f"  {label:>18}" + "".join(f"{elapsed * 1000:15.2f} ms" for elapsed in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare the hand-written gptk_parser walks with the compiled field-spec extractors: full, projected, lazy and columnar.
+
+Run from services/api: python -m benchmarks.bench_parser [--items 500] [--rounds 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from app import jsoncodec
+from app.gptk_parser import PARSER_REGISTRY, parse_response
+
+from . import legacy_gptk_parser as legacy
+from .bench_wrb_stream import _report
+from .payloads import library_page
+
+INDEXER_FIELDS = ("items.mediaKey", "nextPageId")
+NO_GEO_FIELDS = (
+    "items.mediaKey",
+    "items.timestamp",
+    "items.timezoneOffset",
+    "items.creationTimestamp",
+    "items.dedupKey",
+    "items.thumb",
+    "items.isArchived",
+    "items.isFavorite",
+    "items.duration",
+    "nextPageId",
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    page = library_page(args.items)
+    assert set(PARSER_REGISTRY) == set(legacy.PARSER_REGISTRY)
+    for rpcid in PARSER_REGISTRY:
+        assert parse_response(rpcid, page) == legacy.parse_response(rpcid, page), rpcid
+        assert jsoncodec.loads(jsoncodec.dumps(parse_response(rpcid, page, lazy=True))) == parse_response(rpcid, page), rpcid
+
+    columns = parse_response("EzkLib", page, NO_GEO_FIELDS, columnar=True)["items"]
+    rows = parse_response("EzkLib", page, NO_GEO_FIELDS)["items"]
+    assert [dict(zip(columns, values)) for values in zip(*columns.values())] == rows
+
+    _report(
+        f"EzkLib page: {args.items} items",
+        [
+            ("nested _key walks", lambda: legacy.parse_response("EzkLib", page)),
+            ("compiled, all fields", lambda: parse_response("EzkLib", page)),
+            ("compiled, no geo", lambda: parse_response("EzkLib", page, NO_GEO_FIELDS)),
+            ("compiled, media keys", lambda: parse_response("EzkLib", page, INDEXER_FIELDS)),
+            ("lazy views", lambda: parse_response("EzkLib", page, lazy=True)),
+            ("lazy views, read key", lambda: [item["mediaKey"] for item in parse_response("EzkLib", page, lazy=True)["items"]]),
+            ("columnar, no geo", lambda: parse_response("EzkLib", page, NO_GEO_FIELDS, columnar=True)),
+        ],
+        args.rounds,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Items/sec and bytes allocated for parse_wrb_payload and parse_response on every parsed rpcid, checked against a baseline.
+
+Run from services/api: python -m benchmarks.bench_parser_suite [--rounds 30] [--threshold 0.3] [--update-baseline]
+
+parser_baseline.json holds items/sec per rpcid and stage plus a digest of each parsed output. The run exits
+non-zero when throughput falls more than --threshold below the baseline or any parsed output changes.
+Throughput baselines are machine-specific: record them with --update-baseline on a quiet machine that runs the
+check, and re-record after an intended change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from app.gphotos_rpc import parse_wrb_payload
+from app.gptk_parser import PARSER_REGISTRY, parse_response
+
+from .payloads import rpc_payloads, wrb_response_body
+
+BASELINE_PATH = Path(__file__).with_name("parser_baseline.json")
+SAMPLE_SECONDS = 0.005
+
+
+def _best_seconds(fn: Callable[[], Any], rounds: int) -> float:
+    # Small payloads parse in microseconds, so each sample repeats the call until it spans a few milliseconds.
+    started = time.perf_counter()
+    fn()
+    repeat = max(1, int(SAMPLE_SECONDS / max(time.perf_counter() - started, 1e-7)))
+    best = float("inf")
+    # A full collection costs tens of ms with the app imported, so collect once and keep the collector out of the samples.
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            best = min(best, (time.perf_counter() - started) / repeat)
+    finally:
+        gc.enable()
+    return best
+
+
+def _allocated_bytes(fn: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def _digest(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def run(rounds: int) -> dict[str, dict[str, Any]]:
+    payloads = rpc_payloads()
+    missing = sorted(set(PARSER_REGISTRY) - set(payloads))
+    if missing:
+        raise SystemExit(f"no benchmark payload for: {', '.join(missing)}")
+
+    results: dict[str, dict[str, Any]] = {}
+    for rpcid, (count, payload) in payloads.items():
+        body = wrb_response_body([(rpcid, "generic", payload)])
+        assert parse_wrb_payload(body) == payload, rpcid
+        parsed = parse_response(rpcid, payload)
+        assert parsed is not payload, f"{rpcid} parser fell back to the raw payload"
+
+        stages: dict[str, Callable[[], Any]] = {
+            "parse_wrb_payload": lambda: parse_wrb_payload(body),  # noqa: B023
+            "parse_response": lambda: parse_response(rpcid, payload),  # noqa: B023
+        }
+        entry: dict[str, Any] = {"items": count, "body_bytes": len(body.encode("utf-8")), "output_sha256": _digest(parsed)}
+        for stage, fn in stages.items():
+            entry[stage] = {
+                "items_per_sec": round(count / _best_seconds(fn, rounds)),
+                "allocated_bytes": _allocated_bytes(fn),
+            }
+        results[rpcid] = entry
+    return results
+
+
+def regressions(results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], threshold: float) -> list[str]:
+    problems: list[str] = []
+    for rpcid, entry in results.items():
+        recorded = baseline.get(rpcid)
+        if recorded is None:
+            problems.append(f"{rpcid}: not in baseline")
+            continue
+        if entry["output_sha256"] != recorded.get("output_sha256"):
+            problems.append(f"{rpcid}: parsed output changed")
+        for stage in ("parse_wrb_payload", "parse_response"):
+            expected = (recorded.get(stage) or {}).get("items_per_sec")
+            measured = entry[stage]["items_per_sec"]
+            if expected and measured < expected * (1 - threshold):
+                problems.append(f"{rpcid} {stage}: {measured:,} items/s vs baseline {expected:,} (-{1 - measured / expected:.0%})")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed fractional drop in items/sec")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.rounds)
+    print(f"  {'rpcid':>8} {'items':>6} {'body':>9}   {'wrb items/s':>12} {'wrb alloc':>10}   {'parse items/s':>13} {'parse alloc':>11}")
+    for rpcid, entry in results.items():
+        wrb, parsed = entry["parse_wrb_payload"], entry["parse_response"]
+        print(
+            f"  {rpcid:>8} {entry['items']:>6} {entry['body_bytes'] / 1024:>5.0f} KiB"
+            f"   {wrb['items_per_sec']:>12,} {wrb['allocated_bytes'] / 1024:>6.0f} KiB"
+            f"   {parsed['items_per_sec']:>13,} {parsed['allocated_bytes'] / 1024:>7.0f} KiB"
+        )
+
+    if args.update_baseline:
+        BASELINE_PATH.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {BASELINE_PATH.name}")
+        return
+    if not BASELINE_PATH.exists():
+        raise SystemExit(f"{BASELINE_PATH.name} missing; record one with --update-baseline")
+
+    problems = regressions(results, json.loads(BASELINE_PATH.read_text(encoding="utf-8")), args.threshold)
+    if problems:
+        print("regressions:", *problems, sep="\n  ")
+        sys.exit(1)
+    print(f"no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare parse_wrb_payload on a full body with the streaming WrbFrameDecoder.
+
+Run from services/api: python -m benchmarks.bench_wrb_stream [--items 500] [--frames 4] [--rounds 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from app.gphotos_rpc import STREAM_CHUNK_SIZE, iter_wrb_frames, parse_wrb_frames, parse_wrb_payload
+
+from .payloads import library_page, wrb_response_body
+
+
+def _measure(fn: Callable[[], Any], rounds: int) -> tuple[float, int]:
+    fn()
+    timings = []
+    for _ in range(rounds):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    # Transient memory: peak while parsing minus what the parsed result itself keeps alive.
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return min(timings), peak - retained
+
+
+def _chunked(body: bytes) -> list[bytes]:
+    return [body[idx : idx + STREAM_CHUNK_SIZE] for idx in range(0, len(body), STREAM_CHUNK_SIZE)]
+
+
+def _report(title: str, cases: list[tuple[str, Callable[[], Any]]], rounds: int) -> None:
+    print(title)
+    for name, fn in cases:
+        elapsed, transient = _measure(fn, rounds)
+        print(f"  {name:>22}: {elapsed * 1000:8.2f} ms  transient {transient / 1024:8.0f} KiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--frames", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    # Legacy paths mirror requests: response.content joins every chunk and response.text decodes it all.
+    single = _chunked(wrb_response_body([("EzkLib", "generic", library_page(args.items))]).encode("utf-8"))
+    legacy_single = lambda: parse_wrb_payload(b"".join(single).decode("utf-8"))  # noqa: E731
+    streaming_single = lambda: next(iter_wrb_frames(single))[1]  # noqa: E731
+    assert legacy_single() == streaming_single()
+
+    batch = _chunked(
+        wrb_response_body(
+            [("EzkLib", str(index), library_page(args.items, seed=index)) for index in range(1, args.frames + 1)]
+        ).encode("utf-8")
+    )
+    legacy_batch = lambda: parse_wrb_frames(b"".join(batch).decode("utf-8"))  # noqa: E731
+    streaming_batch = lambda: dict(iter_wrb_frames(batch))  # noqa: E731
+    assert legacy_batch() == streaming_batch()
+
+    size_kib = sum(len(chunk) for chunk in single) / 1024
+    _report(
+        f"single frame: {args.items} items, {size_kib:.0f} KiB body",
+        [("parse_wrb_payload", legacy_single), ("WrbFrameDecoder", streaming_single)],
+        args.rounds,
+    )
+    size_kib = sum(len(chunk) for chunk in batch) / 1024
+    _report(
+        f"batched: {args.frames} frames x {args.items} items, {size_kib:.0f} KiB body",
+        [("full body + frames", legacy_batch), ("WrbFrameDecoder", streaming_batch)],
+        args.rounds,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import random
+from typing import Any
+
+
+def _media_key(rng: random.Random, prefix: str = "AF1Qip") -> str:
+    return prefix + "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_") for _ in range(38))
+
+
+def library_item(rng: random.Random, index: int) -> list[Any]:
+    timestamp = 1_600_000_000_000 + index * 37_000
+    tail: dict[str, Any] = {"163238866": [rng.random() < 0.1]}
+    if rng.random() < 0.15:
+        tail["76647426"] = [rng.randint(1_000, 120_000)]
+    if rng.random() < 0.3:
+        tail["129168200"] = [None, [[rng.uniform(-90, 90), rng.uniform(-180, 180)], None, None, None, [[None, ["Somewhere"]]]]]
+    return [
+        _media_key(rng),
+        [f"https://lh3.googleusercontent.com/pw/{_media_key(rng, 'AP')}", 4032, 3024, None, None, None, None, None, [1]],
+        timestamp,
+        _media_key(rng, "d"),
+        25_200_000,
+        timestamp + 86_400_000,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        [1],
+        rng.random() < 0.05,
+        None,
+        tail,
+    ]
+
+
+def library_page(size: int = 500, seed: int = 7) -> list[Any]:
+    rng = random.Random(seed)
+    return [[library_item(rng, index) for index in range(size)], _media_key(rng, "page"), 1_600_000_000_000]
+
+
+def actor(rng: random.Random) -> list[Any]:
+    gaia_id = str(rng.randint(10**20, 10**21))
+    return [
+        _media_key(rng, "actor"),
+        gaia_id,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        ["Someone", None, rng.choice([1, 2])],
+        [f"https://lh3.googleusercontent.com/a/{_media_key(rng, 'ACg8oc')}"],
+    ]
+
+
+def album(rng: random.Random, index: int) -> list[Any]:
+    created = 1_600_000_000_000 + index * 3_600_000
+    meta = [
+        None,
+        f"Album {index}",
+        [None, None, None, None, created, created - 86_400_000, created, None, None, created + 60_000],
+        rng.randint(1, 2_000),
+        rng.random() < 0.2,
+    ]
+    return [
+        _media_key(rng),
+        [f"https://lh3.googleusercontent.com/pw/{_media_key(rng, 'AP')}", 512, 512],
+        None,
+        None,
+        None,
+        None,
+        [_media_key(rng, "actor")],
+        {"72930366": meta},
+    ]
+
+
+def batch_media_info_item(rng: random.Random, index: int) -> list[Any]:
+    timestamp = 1_600_000_000_000 + index * 37_000
+    info = [
+        None,
+        None,
+        "A description" if rng.random() < 0.1 else None,
+        f"IMG_{index:05d}.jpg",
+        None,
+        None,
+        timestamp,
+        25_200_000,
+        timestamp + 86_400_000,
+        rng.randint(500_000, 8_000_000),
+        None,
+        [rng.choice([0, 1]), rng.randint(0, 8_000_000), rng.choice([1, 2])],
+    ]
+    return [_media_key(rng), info]
+
+
+def rpc_payloads(seed: int = 7) -> dict[str, tuple[int, Any]]:
+    """Realistic-size payload per parsed rpcid, as (item count, payload): 500-item library pages, 120-item batch info, 100-album pages."""
+    rng = random.Random(seed)
+    library = library_page(500, seed=seed)
+    items = library[0]
+    albums = [album(rng, index) for index in range(100)]
+    members = [actor(rng) for _ in range(8)]
+    album_meta = [_media_key(rng), "Shared album", None, None, None, members[0], None, None, None, members] + [None] * 9
+    album_meta += [_media_key(rng, "auth"), None, len(items)]
+    links = [[None] * 3 + [rng.randint(1, 300), None, None, _media_key(rng)] + [None] * 10 + [_media_key(rng, "link")] for _ in range(100)]
+    media = items[0][:15] + [items[0][-1]]
+    item_info = [media, "https://video.example/dl", None, None, None, None, None, "https://video.example/orig", None, None, "Full", None, "https://lh3/thumb"]
+    item0 = [
+        items[0][0], "Full", "IMG_00001.jpg", items[0][2], items[0][4], 3_000_000, 4032, 3024, None, None, None, items[0][3],
+    ] + [None] * 7 + [albums[:5]] + [None] * 7 + [[None, None, None, None, [members[0]]], members[1], None, None, {"other": 1}]
+    return {
+        "lcxiM": (500, library),
+        "EzkLib": (500, library),
+        "nMFwOc": (500, [library[1], items]),
+        "F2A0H": (100, [links, _media_key(rng, "page")]),
+        "Z5xsfc": (100, [albums, _media_key(rng, "page")]),
+        "snAcKc": (500, [None, items, _media_key(rng, "page"), album_meta]),
+        "e9T5je": (500, [_media_key(rng, "page"), items, members, None, _media_key(rng, "actor"), members[0][1]]),
+        "zy0IHe": (500, [items, _media_key(rng, "page")]),
+        "VrseUb": (1, item_info),
+        "fDcn4b": (1, [item0]),
+        "EWgK9e": (120, [batch_media_info_item(rng, index) for index in range(120)]),
+        "dnv2s": (1, [[[[None, None, [["photos.zip", "https://takeout.example/dl", 123_456_789, 234_567_890]]]]]]),
+        "EzwWhf": (1, [None] * 6 + [[16_106_127_360, 16_106_127_360, None, 5_368_709_120]]),
+        "swbisb": (500, [[[_media_key(rng, "hash"), item[:6]] for item in items]]),
+    }
+
+
+def wrb_response_body(frames: list[tuple[str, str, Any]]) -> str:
+    lines = [")]}'", ""]
+    for rpcid, identifier, payload in frames:
+        chunk = json.dumps([["wrb.fr", rpcid, json.dumps(payload), None, None, None, identifier]])
+        lines.extend([str(len(chunk)), chunk])
+    trailer = json.dumps([["di", 312], ["af.httprm", 311, "-1234567890", 17]])
+    lines.extend([str(len(trailer)), trailer, ""])
+    return "\n".join(lines)
+
+
+def bootstrap_page(size_kib: int = 600, wiz_offset_kib: int = 40, seed: int = 11) -> str:
+    """Shape of a photos.google.com page: inline head scripts, WIZ_global_data, then large AF_initDataCallback blobs."""
+    rng = random.Random(seed)
+
+    def filler_script(target: int) -> str:
+        return "<script nonce=\"n\">" + "".join(rng.choice("abcdefghijklmnopqrstuvwxyz(){};=.,") for _ in range(target)) + "</script>"
+
+    wiz = {
+        "DpimGf": False,
+        "EP1ykd": ["/_/*"],
+        "FdrFJe": str(rng.randint(-(2**62), 2**62)),
+        "Im6cmf": "/_/PhotosUi",
+        "SNlM0e": _media_key(rng, "AF2bZyi") + ":1700000000000",
+        "cfb2h": "boq_photosuiserver_20240101.00_p0",
+        "eptZe": "/_/PhotosUi/",
+        "oPEP7c": "someone@example.com",
+        "Dbw5Ud": _media_key(rng, "rapt"),
+        "qwAQke": "PhotosUi",
+        "w2btAe": "%.@.\"108765432101234567890\",\"108765432101234567890\",\"0\",null,null,null,1]",
+    }
+    head = "<!doctype html><html lang=\"en\"><head><meta charset=\"utf-8\">" + filler_script(wiz_offset_kib * 1024)
+    wiz_script = "<script data-id=\"_gd\" nonce=\"n\">window.WIZ_global_data = " + json.dumps(wiz, separators=(",", ":")).replace("=", "\\u003d") + ";</script>"
+    body = ["</head><body>"]
+    remaining = size_kib * 1024 - len(head) - len(wiz_script)
+    while remaining > 0:
+        blob = json.dumps(library_page(50, seed=rng.randint(0, 1_000_000)))
+        body.append(f"<script nonce=\"n\">AF_initDataCallback({{key: 'ds:{len(body)}', data:{blob}}});</script>")
+        remaining -= len(body[-1])
+    body.append("</body></html>")
+    return head + wiz_script + "".join(body)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
+import threading
 import time
 from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
@@ -14,11 +16,14 @@ if API_DIR.as_posix() not in sys.path:
     sys.path.insert(0, API_DIR.as_posix())
 
 from app.database import engine, initialize_database  # noqa: E402
-from app.job_executor import claim_jobs, execute_job  # noqa: E402
+from app.gptk_service import session_warmer  # noqa: E402
+from app.job_executor import claim_jobs, execute_job, execute_job_async, is_async_job  # noqa: E402
 
 POLL_SECONDS = float(os.getenv("LM_WORKER_POLL_SECONDS", "1.0"))
 MAX_WORKERS = int(os.getenv("LM_WORKER_MAX_WORKERS", "4"))
 MAX_PER_ACCOUNT = int(os.getenv("LM_WORKER_MAX_PER_ACCOUNT", "1"))
+# Single-RPC GPTK jobs run as tasks on one event loop thread instead of taking a pool slot each.
+MAX_ASYNC_JOBS = int(os.getenv("LM_WORKER_MAX_ASYNC_JOBS", "32"))
 
 
 def _run_job(job_id: str) -> None:
@@ -26,11 +31,25 @@ def _run_job(job_id: str) -> None:
         execute_job(session, job_id)
 
 
+async def _run_job_async(job_id: str) -> None:
+    with Session(engine) as session:
+        await execute_job_async(session, job_id)
+
+
+def _start_event_loop() -> asyncio.AbstractEventLoop:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="worker-async-jobs", daemon=True).start()
+    return loop
+
+
 def main() -> None:
     initialize_database()
-    print(f"[worker] started max_workers={MAX_WORKERS}, max_per_account={MAX_PER_ACCOUNT}")
+    session_warmer.start()
+    loop = _start_event_loop()
+    print(f"[worker] started max_workers={MAX_WORKERS}, max_async_jobs={MAX_ASYNC_JOBS}, max_per_account={MAX_PER_ACCOUNT}")
 
     in_flight: dict[str, tuple[str, Future[None]]] = {}
+    async_jobs: set[str] = set()
 
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
         while True:
@@ -38,12 +57,14 @@ def main() -> None:
                 finished_ids = [job_id for job_id, (_, future) in in_flight.items() if future.done()]
                 for job_id in finished_ids:
                     account_id, future = in_flight.pop(job_id)
+                    async_jobs.discard(job_id)
                     try:
                         future.result()
                     except Exception as exc:  # noqa: BLE001
                         print(f"[worker] job {job_id} ({account_id}) crashed: {exc}")
 
-                available_slots = MAX_WORKERS - len(in_flight)
+                # A claimed job that needs a thread while the pool is busy waits in the pool's queue.
+                available_slots = (MAX_WORKERS - (len(in_flight) - len(async_jobs))) + (MAX_ASYNC_JOBS - len(async_jobs))
                 if available_slots > 0:
                     in_flight_accounts: dict[str, int] = {}
                     for _, (account_id, _) in in_flight.items():
@@ -59,7 +80,11 @@ def main() -> None:
 
                     for job in claimed:
                         print(f"[worker] executing {job.id} ({job.account_id}, {job.provider}:{job.operation})")
-                        future = pool.submit(_run_job, job.id)
+                        if is_async_job(job) and len(async_jobs) < MAX_ASYNC_JOBS:
+                            future = asyncio.run_coroutine_threadsafe(_run_job_async(job.id), loop)
+                            async_jobs.add(job.id)
+                        else:
+                            future = pool.submit(_run_job, job.id)
                         in_flight[job.id] = (job.account_id, future)
 
                 time.sleep(POLL_SECONDS)